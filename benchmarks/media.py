@@ -0,0 +1,89 @@
+"""
+Deterministic synthetic inputs for the benchmarks, generated locally with ffmpeg lavfi sources.
+
+Every file is cached under benchmarks/.media/ by its parameters, so repeated benchmark runs
+reuse identical inputs and only the operation under test is timed.
+"""
+import os
+import subprocess
+
+MEDIA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".media")
+
+# Bit-exact muxing/encoding so the same parameters always give the same bytes
+BITEXACT = ['-fflags', '+bitexact', '-flags:v', '+bitexact', '-flags:a', '+bitexact', '-map_metadata', '-1']
+
+
+def _generate(name, cmd_args):
+    """Runs ffmpeg to create MEDIA_DIR/name unless it already exists. Returns the path."""
+    os.makedirs(MEDIA_DIR, exist_ok=True)
+    path = os.path.join(MEDIA_DIR, name)
+    if not os.path.exists(path):
+        tmp_path = path + ".part" + os.path.splitext(path)[1]
+        result = subprocess.run(['ffmpeg', '-y', '-v', 'error'] + cmd_args + BITEXACT + [tmp_path],
+                                capture_output=True, text=True)
+        if result.returncode != 0:
+            raise RuntimeError(f"Could not generate {name}: {result.stderr[-1000:]}")
+        os.replace(tmp_path, path)
+    return path
+
+
+def make_video(duration, width, height, fps=30, audio=True):
+    """testsrc2 pattern (plus a 440 Hz tone) encoded as H.264/AAC MP4."""
+    name = f"video_{width}x{height}_{fps}fps_{duration}s{'_a' if audio else ''}.mp4"
+    args = ['-f', 'lavfi', '-i', f'testsrc2=size={width}x{height}:rate={fps}:duration={duration}']
+    if audio:
+        args += ['-f', 'lavfi', '-i', f'sine=frequency=440:sample_rate=48000:duration={duration}']
+    args += ['-c:v', 'libx264', '-preset', 'veryfast', '-crf', '23', '-pix_fmt', 'yuv420p', '-g', str(fps * 2)]
+    args += ['-c:a', 'aac', '-b:a', '128k'] if audio else ['-an']
+    return _generate(name, args)
+
+
+def make_speech(duration, sample_rate=24000):
+    """Stand-in for TTS output: a mono tone at the Gemini TTS sample rate, as AAC .m4a."""
+    name = f"speech_{sample_rate}_{duration}s.m4a"
+    return _generate(name, ['-f', 'lavfi', '-i', f'sine=frequency=220:sample_rate={sample_rate}:duration={duration}',
+                            '-ac', '1', '-c:a', 'aac', '-b:a', '128k'])
+
+
+def make_music(duration):
+    name = f"music_{duration}s.mp3"
+    return _generate(name, ['-f', 'lavfi', '-i', f'sine=frequency=330:sample_rate=44100:duration={duration}',
+                            '-ac', '2', '-c:a', 'libmp3lame', '-b:a', '128k'])
+
+
+def make_images(count, width, height):
+    """A folder of count distinct JPEG frames (successive seconds of testsrc2)."""
+    folder = os.path.join(MEDIA_DIR, f"images_{count}_{width}x{height}")
+    if not (os.path.isdir(folder) and len(os.listdir(folder)) == count):
+        os.makedirs(folder, exist_ok=True)
+        for i in range(count):
+            _generate(os.path.join(os.path.basename(folder), f"image_{i:03d}.jpg"),
+                      ['-f', 'lavfi', '-i', f'testsrc2=size={width}x{height}:rate=1:duration={count}',
+                       '-vf', f'select=eq(n\\,{i})', '-frames:v', '1', '-q:v', '3'])
+    return folder
+
+
+def make_logo(width=400, height=200):
+    """Semi-transparent RGBA PNG logo."""
+    return _generate(f"logo_{width}x{height}.png",
+                     ['-f', 'lavfi', '-i', f'color=c=red@0.6:size={width}x{height},format=rgba',
+                      '-frames:v', '1'])
+
+
+def make_srt(duration, interval=2.0):
+    """SRT with one numbered line every interval seconds."""
+    from core.subtitles import save_srt
+
+    os.makedirs(MEDIA_DIR, exist_ok=True)
+    path = os.path.join(MEDIA_DIR, f"subs_{duration}s_{interval}.srt")
+    if not os.path.exists(path):
+        subtitles = []
+        start = 0.0
+        index = 1
+        while start < duration:
+            end = min(duration, start + interval - 0.1)
+            subtitles.append({"start": start, "end": end, "text": f"Benchmark line {index}"})
+            start += interval
+            index += 1
+        save_srt(subtitles, path)
+    return path
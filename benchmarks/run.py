@@ -0,0 +1,322 @@
+"""
+Benchmark suite for core/video.py operations on deterministic synthetic media.
+
+  python benchmarks/run.py                              # all cases, small + vertical profiles
+  python benchmarks/run.py --profiles hd --repeat 5 --only burn_subtitles,overlay_logo
+  python benchmarks/run.py --output new.json --baseline old.json   # run, then flag regressions
+  python benchmarks/run.py --results new.json --baseline old.json  # compare two saved runs
+  python benchmarks/run.py --pipeline                   # also the full TTS -> translate -> render
+                                                        # pipeline against the local Gemini stub
+
+Inputs come from benchmarks/media.py (cached in benchmarks/.media/); outputs are written to a
+temporary folder and deleted. Each case reports median/min/mean/stdev wall time and the CPU time
+of child processes (ffmpeg). Exit code 1 means a regression was found.
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import statistics
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks import media
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+PROFILES = {
+    "small": {"width": 640, "height": 360, "duration": 5},
+    "vertical": {"width": 1080, "height": 1920, "duration": 10},
+    "hd": {"width": 1920, "height": 1080, "duration": 20},
+}
+DEFAULT_PROFILES = ["small", "vertical"]
+
+FONT_SETTINGS = {'Fontname': 'Arial', 'Fontsize': '16', 'PrimaryColour': '#FFFFFF'}
+
+# A case is slower than its baseline when both limits are exceeded
+REGRESSION_THRESHOLD = 0.10
+REGRESSION_MIN_SECONDS = 0.05
+
+
+# --- Cases: each returns a function(work_dir) that performs one run and returns its output path ---
+
+def case_merge_trim(p):
+    from core.video import merge_audio_video
+    video = media.make_video(p["duration"], p["width"], p["height"])
+    speech = media.make_speech(max(1, p["duration"] - 1))
+    return lambda work: merge_audio_video(video, speech, os.path.join(work, "merge_trim.mp4"), mode="trim")
+
+
+def case_merge_loop(p):
+    from core.video import merge_audio_video
+    video = media.make_video(p["duration"], p["width"], p["height"])
+    speech = media.make_speech(p["duration"] * 2)
+    return lambda work: merge_audio_video(video, speech, os.path.join(work, "merge_loop.mp4"), mode="trim")
+
+
+def case_merge_bg_music(p):
+    from core.video import merge_audio_video
+    video = media.make_video(p["duration"], p["width"], p["height"])
+    speech = media.make_speech(p["duration"])
+    music = media.make_music(p["duration"])
+    return lambda work: merge_audio_video(video, speech, os.path.join(work, "merge_music.mp4"),
+                                         mode="bg_music", music_path=music)
+
+
+def case_burn_subtitles(p):
+    from core.video import burn_subtitles
+    video = media.make_video(p["duration"], p["width"], p["height"])
+    srt = media.make_srt(p["duration"])
+    return lambda work: burn_subtitles(video, srt, FONT_SETTINGS, os.path.join(work, "burn.mp4"), margin_v=20)
+
+
+def case_burn_subtitles_pillow(p):
+    from core.video import burn_subtitles
+    video = media.make_video(p["duration"], p["width"], p["height"])
+    srt = media.make_srt(p["duration"])
+    return lambda work: burn_subtitles(video, srt, FONT_SETTINGS, os.path.join(work, "burn_pillow.mp4"),
+                                       margin_v=20, renderer="pillow")
+
+
+def case_create_slideshow_video(p):
+    from core.video import create_slideshow_video
+    images = media.make_images(max(3, p["duration"] // 2), p["width"], p["height"])
+    return lambda work: create_slideshow_video(images, p["duration"], os.path.join(work, "slideshow.mp4"))
+
+
+def case_overlay_logo(p):
+    from core.video import overlay_logo
+    video = media.make_video(p["duration"], p["width"], p["height"])
+    logo = media.make_logo()
+    return lambda work: overlay_logo(video, logo, os.path.join(work, "logo.mp4"),
+                                     position={"x": 50, "y": 50}, logo_scale=0.15)
+
+
+def case_insert_multiple_overlays(p):
+    from core.video import insert_multiple_overlays
+    video = media.make_video(p["duration"], p["width"], p["height"])
+    # Swapped orientation, so the overlays are letterboxed like real inserts
+    images = media.make_images(2, p["height"], p["width"])
+    schedule = [{"path": os.path.join(images, name), "start": start, "duration": 1.5}
+                for name, start in zip(sorted(os.listdir(images)), (1.0, p["duration"] / 2))]
+    return lambda work: insert_multiple_overlays(video, schedule, os.path.join(work, "overlays.mp4"), fade_duration=0.3)
+
+
+def case_concatenate_videos(p):
+    from core.video import concatenate_videos
+    video = media.make_video(p["duration"], p["width"], p["height"])
+    return lambda work: concatenate_videos([video] * 3, os.path.join(work, "concat.mp4"))
+
+
+CASES = {
+    "merge_audio_video.trim": case_merge_trim,
+    "merge_audio_video.loop": case_merge_loop,
+    "merge_audio_video.bg_music": case_merge_bg_music,
+    "burn_subtitles": case_burn_subtitles,
+    "burn_subtitles.pillow": case_burn_subtitles_pillow,
+    "create_slideshow_video": case_create_slideshow_video,
+    "overlay_logo": case_overlay_logo,
+    "insert_multiple_overlays": case_insert_multiple_overlays,
+    "concatenate_videos": case_concatenate_videos,
+}
+
+
+def case_pipeline(p, whisper=False):
+    """
+    One language of an export: TTS -> (Whisper) -> translation -> merge -> burn -> logo,
+    with the Gemini calls served by the local stub (see run_pipeline_cases).
+    """
+    import core.translation
+    from core.tts import generate_audio
+    from core.translation import translate_texts
+    from core.subtitles import generate_subtitles, save_srt
+    from core.video import merge_audio_video, burn_subtitles, overlay_logo
+
+    video = media.make_video(p["duration"], p["width"], p["height"])
+    logo = media.make_logo()
+    srt = media.make_srt(p["duration"])
+    script = "This is a synthetic benchmark script for the offline pipeline. " * max(1, p["duration"] // 4)
+
+    def run(work):
+        core.translation._translation_cache.clear()
+        speech = generate_audio(script, "en", os.path.join(work, "speech.m4a"), api_key="stub")
+        if not speech:
+            return None
+        subtitles = srt
+        if whisper:
+            subtitles = save_srt(generate_subtitles(speech, language="en"), os.path.join(work, "speech.srt"))
+        translate_texts("Benchmark title", ["th", "ja", "ko"], "stub")
+        merged = merge_audio_video(video, speech, os.path.join(work, "merged.mp4"), mode="trim")
+        burned = merged and burn_subtitles(merged, subtitles, FONT_SETTINGS, os.path.join(work, "burned.mp4"))
+        return burned and overlay_logo(burned, logo, os.path.join(work, "final.mp4"))
+
+    return run
+
+
+# --- Measurement ---
+
+def children_cpu():
+    if resource is None:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+def measure(run, repeat, warmup):
+    """Runs run(work_dir) warmup + repeat times; returns the case summary dict."""
+    walls, cpus, ok = [], [], True
+    for i in range(warmup + repeat):
+        work = tempfile.mkdtemp(prefix="bench_")
+        try:
+            cpu_start = children_cpu()
+            start = time.perf_counter()
+            output = run(work)
+            wall = time.perf_counter() - start
+            cpu_end = children_cpu()
+            if not output or not os.path.exists(output) or os.path.getsize(output) == 0:
+                ok = False
+            if i >= warmup:
+                walls.append(wall)
+                if cpu_start is not None:
+                    cpus.append(cpu_end - cpu_start)
+        finally:
+            shutil.rmtree(work, ignore_errors=True)
+    return {
+        "ok": ok,
+        "runs_s": walls,
+        "median_s": statistics.median(walls),
+        "min_s": min(walls),
+        "mean_s": statistics.mean(walls),
+        "stdev_s": statistics.stdev(walls) if len(walls) > 1 else 0.0,
+        "children_cpu_s": statistics.median(cpus) if cpus else None,
+    }
+
+
+def environment():
+    def command_output(cmd):
+        try:
+            return subprocess.run(cmd, capture_output=True, text=True, cwd=ROOT).stdout.strip().splitlines()[0]
+        except (OSError, IndexError):
+            return None
+
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "ffmpeg": command_output(['ffmpeg', '-version']),
+        "commit": command_output(['git', 'rev-parse', '--short', 'HEAD']),
+    }
+
+
+def run_cases(names, profiles, repeat, warmup, extra_cases=None):
+    results = {}
+    cases = [(name, CASES[name]) for name in names] + list((extra_cases or {}).items())
+    for profile in profiles:
+        for name, factory in cases:
+            key = f"{name}/{profile}"
+            try:
+                run = factory(PROFILES[profile])
+                results[key] = measure(run, repeat, warmup)
+            except Exception as e:
+                results[key] = {"ok": False, "error": str(e)}
+            summary = results[key]
+            if "median_s" in summary:
+                print(f"{key:45s} {summary['median_s']:8.3f}s  (min {summary['min_s']:.3f}, "
+                      f"stdev {summary['stdev_s']:.3f}){'' if summary['ok'] else '  FAILED'}")
+            else:
+                print(f"{key:45s}  ERROR: {summary['error']}")
+    return results
+
+
+def run_pipeline_cases(profiles, repeat, warmup, whisper):
+    from benchmarks.stub_gemini import start_stub_server
+
+    server, base_url = start_stub_server()
+    previous = os.environ.get("GEMINI_API_BASE_URL")
+    os.environ["GEMINI_API_BASE_URL"] = base_url
+    try:
+        return run_cases([], profiles, repeat, warmup,
+                         extra_cases={"pipeline": lambda p: case_pipeline(p, whisper=whisper)})
+    finally:
+        server.shutdown()
+        if previous is None:
+            os.environ.pop("GEMINI_API_BASE_URL", None)
+        else:
+            os.environ["GEMINI_API_BASE_URL"] = previous
+
+
+# --- Comparison ---
+
+def compare(baseline, current, threshold, min_seconds):
+    """Prints per-case changes; returns the list of regressed case keys."""
+    regressions = []
+    print(f"\n{'case':45s} {'baseline':>9s} {'current':>9s} {'change':>8s}")
+    for key, result in sorted(current["cases"].items()):
+        base = baseline["cases"].get(key)
+        if not base or "median_s" not in base or "median_s" not in result:
+            continue
+        change = result["median_s"] / base["median_s"] - 1 if base["median_s"] else 0.0
+        regressed = (change > threshold and result["median_s"] - base["median_s"] > min_seconds) or \
+                    (base.get("ok") and not result.get("ok"))
+        flag = "  REGRESSION" if regressed else ""
+        print(f"{key:45s} {base['median_s']:8.3f}s {result['median_s']:8.3f}s {change:+7.1%}{flag}")
+        if regressed:
+            regressions.append(key)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--only', help='comma-separated case names (default: all)')
+    parser.add_argument('--profiles', default=",".join(DEFAULT_PROFILES),
+                        help=f"comma-separated input profiles: {', '.join(PROFILES)}")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--warmup', type=int, default=1)
+    parser.add_argument('--pipeline', action='store_true', help='also benchmark the offline end-to-end pipeline')
+    parser.add_argument('--whisper', action='store_true', help='include Whisper in the pipeline (needs the model cached)')
+    parser.add_argument('--output', help='write results JSON here')
+    parser.add_argument('--results', help='load results from this file instead of running')
+    parser.add_argument('--baseline', help='results JSON to compare against')
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD)
+    args = parser.parse_args()
+
+    if args.results:
+        with open(args.results, 'r', encoding='utf-8') as f:
+            current = json.load(f)
+    else:
+        names = args.only.split(',') if args.only else list(CASES)
+        unknown = [name for name in names if name not in CASES]
+        if unknown:
+            parser.error(f"unknown case(s): {', '.join(unknown)}; available: {', '.join(CASES)}")
+        profiles = args.profiles.split(',')
+        current = {"environment": environment(), "repeat": args.repeat,
+                   "cases": run_cases(names, profiles, args.repeat, args.warmup)}
+        if args.pipeline:
+            current["cases"].update(run_pipeline_cases(profiles, args.repeat, args.warmup, args.whisper))
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                json.dump(current, f, indent=4)
+            print(f"\nResults written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(baseline, current, args.threshold, REGRESSION_MIN_SECONDS)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) over {args.threshold:.0%}")
+            sys.exit(1)
+        print("\nNo regressions")
+
+
+if __name__ == "__main__":
+    main()
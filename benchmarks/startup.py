@@ -0,0 +1,88 @@
+"""
+Startup benchmark for the editor.
+
+Reports:
+  - the slowest imports of `import gui` (cumulative, from python -X importtime)
+  - time to first window: import gui, build VideoEditorApp, draw the first frame
+
+Each measurement runs in a fresh interpreter so module caches do not hide import cost.
+Run from the repository root:  python benchmarks/startup.py [--runs 5] [--top 15]
+"""
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+FIRST_WINDOW_SCRIPT = """
+import json, time
+t0 = time.perf_counter()
+import gui
+t1 = time.perf_counter()
+app = gui.VideoEditorApp()
+t2 = time.perf_counter()
+app.update()
+t3 = time.perf_counter()
+app.destroy()
+print(json.dumps({"import": t1 - t0, "construct": t2 - t1, "first_frame": t3 - t2, "total": t3 - t0}))
+"""
+
+
+def import_times(top):
+    """Runs `python -X importtime -c "import gui"` and returns [(cumulative_us, self_us, module)] slowest first."""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import gui'],
+                            cwd=ROOT, capture_output=True, text=True)
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        parts = line[len('import time:'):].split('|')
+        if len(parts) != 3:
+            continue
+        try:
+            rows.append((int(parts[1]), int(parts[0]), parts[2].rstrip()))
+        except ValueError:
+            continue
+    if result.returncode != 0:
+        print(f"import gui failed:\n{result.stderr[-2000:]}")
+    rows.sort(reverse=True)
+    return rows[:top]
+
+
+def first_window_time():
+    """Returns the timing dict of one FIRST_WINDOW_SCRIPT run, or None (e.g. no display)."""
+    result = subprocess.run([sys.executable, '-c', FIRST_WINDOW_SCRIPT], cwd=ROOT, capture_output=True, text=True)
+    if result.returncode != 0:
+        print(f"First window measurement failed:\n{result.stderr[-1000:]}")
+        return None
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5, help='first-window runs (median is reported)')
+    parser.add_argument('--top', type=int, default=15, help='number of slowest imports to list')
+    args = parser.parse_args()
+
+    print("Slowest imports of `import gui` (cumulative / self, ms):")
+    for cumulative, self_time, module in import_times(args.top):
+        print(f"  {cumulative / 1000:8.1f} {self_time / 1000:8.1f}  {module}")
+
+    runs = []
+    for _ in range(args.runs):
+        timing = first_window_time()
+        if timing is None:
+            break
+        runs.append(timing)
+
+    if runs:
+        print(f"\nTime to first window (median of {len(runs)} runs, ms):")
+        for key in ("import", "construct", "first_frame", "total"):
+            print(f"  {key:12s} {statistics.median(r[key] for r in runs) * 1000:8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+"""
+Local stand-in for the Gemini and Veo REST endpoints, for offline benchmarks and load tests.
+
+Endpoints (under /v1beta):
+  POST models/<model>:generateContent     TTS (responseModalities AUDIO) -> 16-bit mono 24 kHz PCM tone,
+                                          about --tts-seconds-per-char seconds per input character;
+                                          text -> "[stub] <text>", or a JSON object per language code
+                                          when responseMimeType is application/json
+  POST models/<model>:predictLongRunning  Veo generation/extension -> {"name": "operations/<id>"}
+  GET  operations/<id>                    done after --operation-seconds, with a download URI
+  GET  files/<id>:download                --video-bytes of data (or the bytes of --video-file)
+  GET  models                             model list (API key check)
+  GET  /stub/stats                        request, throttle and error counts
+
+Every request first waits --latency (+ up to --jitter) seconds. It is then answered with 429
+(Retry-After) when over --rpm or with probability --throttle-rate, and with 500 with probability
+--error-rate.
+
+  python benchmarks/stub_gemini.py --port 8765 --latency 0.3 --rpm 60 --error-rate 0.02
+  GEMINI_API_BASE_URL=http://127.0.0.1:8765/v1beta python main.py
+"""
+import re
+import sys
+import json
+import math
+import time
+import base64
+import random
+import struct
+import argparse
+import threading
+from collections import Counter, deque
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+TTS_SAMPLE_RATE = 24000
+
+
+class StubConfig:
+    def __init__(self, latency=0.0, jitter=0.0, error_rate=0.0, throttle_rate=0.0, rpm=None,
+                 retry_after=1, tts_seconds_per_char=0.06, operation_seconds=2.0,
+                 video_bytes=1024 * 1024, video_file=None, seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.rpm = rpm
+        self.retry_after = retry_after
+        self.tts_seconds_per_char = tts_seconds_per_char
+        self.operation_seconds = operation_seconds
+        self.video_bytes = video_bytes
+        self.video_file = video_file
+        self.seed = seed
+
+
+def tone_pcm(seconds, rate=TTS_SAMPLE_RATE, period=100):
+    """A 240 Hz tone (one period repeated) as 16-bit little-endian PCM."""
+    cycle = b"".join(struct.pack('<h', int(8000 * math.sin(2 * math.pi * i / period))) for i in range(period))
+    samples = int(seconds * rate)
+    return (cycle * (samples // period + 1))[:samples * 2]
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, config):
+        super().__init__(address, StubHandler)
+        self.config = config
+        self.random = random.Random(config.seed)
+        self.lock = threading.Lock()
+        self.stats = Counter()
+        self.recent = deque()  # request times within the last minute, for --rpm
+        self.operations = {}   # id -> start time
+        self._video = None
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1beta"
+
+    def video_payload(self):
+        if self._video is None:
+            if self.config.video_file:
+                with open(self.config.video_file, 'rb') as f:
+                    self._video = f.read()
+            else:
+                self._video = bytes(self.config.video_bytes)
+        return self._video
+
+    def admit(self):
+        """Applies latency, throttling and injected errors. Returns None or (status, message)."""
+        config = self.config
+        with self.lock:
+            delay = config.latency + self.random.uniform(0, config.jitter)
+            roll_throttle, roll_error = self.random.random(), self.random.random()
+            now = time.monotonic()
+            while self.recent and now - self.recent[0] > 60:
+                self.recent.popleft()
+            over_quota = config.rpm is not None and len(self.recent) >= config.rpm
+            if not over_quota:
+                self.recent.append(now)
+        time.sleep(delay)
+        if over_quota or roll_throttle < config.throttle_rate:
+            return 429, "Resource has been exhausted (stub throttling)"
+        if roll_error < config.error_rate:
+            return 500, "Internal error (stub fault injection)"
+        return None
+
+    def count(self, key):
+        with self.lock:
+            self.stats[key] += 1
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, data, content_type, headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_json(self, status, body, headers=None):
+        self._send(status, json.dumps(body).encode('utf8'), "application/json", headers)
+
+    def _admit(self, endpoint):
+        self.server.count(f"requests:{endpoint}")
+        failure = self.server.admit()
+        if failure is None:
+            return True
+        status, message = failure
+        self.server.count(f"status_{status}")
+        headers = {"Retry-After": str(self.server.config.retry_after)} if status == 429 else None
+        self._send_json(status, {"error": {"code": status, "message": message}}, headers)
+        return False
+
+    def do_GET(self):
+        path = self.path.split('?')[0]
+        if path == '/stub/stats':
+            self._send_json(200, dict(self.server.stats))
+        elif path.rstrip('/').endswith('/models'):
+            if self._admit("models"):
+                self._send_json(200, {"models": [{"name": "models/stub"}]})
+        elif '/operations/' in path:
+            if self._admit("operations"):
+                self._send_json(200, self._operation(path.rsplit('/', 1)[1]))
+        elif path.endswith(':download'):
+            if self._admit("download"):
+                self._send(200, self.server.video_payload(), "video/mp4")
+        else:
+            self._send_json(404, {"error": {"code": 404, "message": "not found"}})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        path = self.path.split('?')[0]
+        if path.endswith(':generateContent'):
+            if self._admit("generateContent"):
+                self._send_json(200, generate_content(payload, self.server.config))
+        elif path.endswith(':predictLongRunning'):
+            if self._admit("predictLongRunning"):
+                with self.server.lock:
+                    operation_id = f"op-{len(self.server.operations) + 1}"
+                    self.server.operations[operation_id] = time.monotonic()
+                self._send_json(200, {"name": f"operations/{operation_id}"})
+        else:
+            self._send_json(404, {"error": {"code": 404, "message": "not found"}})
+
+    def _operation(self, operation_id):
+        started = self.server.operations.get(operation_id)
+        if started is None or time.monotonic() - started < self.server.config.operation_seconds:
+            return {"name": f"operations/{operation_id}", "done": False}
+        uri = f"{self.server.base_url}/files/{operation_id}:download?alt=media"
+        return {
+            "name": f"operations/{operation_id}",
+            "done": True,
+            "response": {"generateVideoResponse": {"generatedSamples": [{"video": {"uri": uri}}]}}
+        }
+
+
+def generate_content(payload, config):
+    """The response body for one generateContent request."""
+    prompt = payload["contents"][0]["parts"][0]["text"]
+    generation_config = payload.get("generationConfig", {})
+
+    if "AUDIO" in generation_config.get("responseModalities", []):
+        pcm = tone_pcm(max(0.5, len(prompt) * config.tts_seconds_per_char))
+        part = {"inlineData": {"mimeType": f"audio/L16;rate={TTS_SAMPLE_RATE}",
+                               "data": base64.b64encode(pcm).decode('ascii')}}
+    elif generation_config.get("responseMimeType") == "application/json":
+        # Batch translation prompt: "... into each of these languages: en, th. ..."
+        match = re.search(r'languages: ([^.]+)\.', prompt)
+        codes = [c.strip() for c in match.group(1).split(',')] if match else []
+        text = prompt.rsplit('Text: ', 1)[-1]
+        part = {"text": json.dumps({code: f"[{code}] {text}" for code in codes})}
+    else:
+        part = {"text": f"[stub] {prompt.rsplit('Text: ', 1)[-1]}"}
+
+    return {"candidates": [{"content": {"parts": [part]}}]}
+
+
+def start_stub_server(host="127.0.0.1", port=0, config=None):
+    """Starts the stub on a background thread. Returns (server, base_url); stop with server.shutdown()."""
+    server = StubServer((host, port), config or StubConfig())
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, server.base_url
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default="127.0.0.1")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds added to every request')
+    parser.add_argument('--jitter', type=float, default=0.0, help='extra random latency, 0..jitter seconds')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='probability of a 500 response')
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help='probability of a 429 response')
+    parser.add_argument('--rpm', type=int, help='requests per minute before answering 429')
+    parser.add_argument('--retry-after', type=int, default=1, help='Retry-After seconds sent with 429')
+    parser.add_argument('--tts-seconds-per-char', type=float, default=0.06, help='TTS audio length per character')
+    parser.add_argument('--operation-seconds', type=float, default=2.0, help='time until a Veo operation is done')
+    parser.add_argument('--video-bytes', type=int, default=1024 * 1024, help='size of downloaded videos')
+    parser.add_argument('--video-file', help='serve this file as the downloaded video')
+    parser.add_argument('--seed', type=int, help='seed for latency/error randomness')
+    args = parser.parse_args()
+
+    config = StubConfig(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                        throttle_rate=args.throttle_rate, rpm=args.rpm, retry_after=args.retry_after,
+                        tts_seconds_per_char=args.tts_seconds_per_char, operation_seconds=args.operation_seconds,
+                        video_bytes=args.video_bytes, video_file=args.video_file, seed=args.seed)
+    server, base_url = start_stub_server(args.host, args.port, config)
+    print(f"Gemini stub listening on {base_url}")
+    print(f"Use it with: GEMINI_API_BASE_URL={base_url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+        print(json.dumps(dict(server.stats), indent=2))
+        sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Sizes the long-form Whisper pool (generate_subtitles_long) for this machine.
+
+Transcribes one recording with several workers x cpu_threads layouts and prints the throughput
+in audio seconds per wall second for each. Put the best layout in config.json as
+"whisper_workers" / "whisper_cpu_threads".
+
+Needs real speech (VAD drops the synthetic benchmark tones) and the model in the local cache.
+Run from the repository root:
+  python benchmarks/whisper_workers.py talk.mp4 [--model base] [--layouts 1x8,2x4,4x2]
+"""
+import os
+import sys
+import json
+import argparse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def default_layouts():
+    cpus = os.cpu_count() or 1
+    layouts = []
+    workers = 1
+    while workers <= cpus:
+        layouts.append((workers, max(1, cpus // workers)))
+        workers *= 2
+    return layouts
+
+
+def main():
+    from core.instrumentation import Tracer
+    from core.subtitles import generate_subtitles_long, get_whisper_model
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('input', help='audio or video file with speech')
+    parser.add_argument('--model', default="base")
+    parser.add_argument('--language', help='skip language detection (e.g. en)')
+    parser.add_argument('--layouts', help='comma-separated WORKERSxTHREADS (default: 1, 2, 4... workers over all cores)')
+    parser.add_argument('--output', help='write the results as JSON')
+    args = parser.parse_args()
+
+    layouts = default_layouts()
+    if args.layouts:
+        layouts = [tuple(int(n) for n in layout.split('x')) for layout in args.layouts.split(',')]
+
+    results = []
+    for workers, cpu_threads in layouts:
+        # Model loading is not part of the throughput
+        get_whisper_model(args.model, cpu_threads=cpu_threads, num_workers=workers)
+        tracer = Tracer("whisper_workers")
+        with tracer.activate():
+            subtitles = generate_subtitles_long(args.input, language=args.language, model_size=args.model,
+                                                workers=workers, cpu_threads=cpu_threads)
+        span = next(s for s in tracer.report()["spans"] if s["name"] == "whisper.long_form")
+        results.append({"workers": workers, "cpu_threads": cpu_threads, "segments": len(subtitles),
+                        "wall_s": span["wall_s"], **span["attrs"]})
+
+    print(f"\n{'layout':>8}  {'wall s':>8}  {'audio-s/s':>9}  segments")
+    best = max(results, key=lambda r: r.get("audio_seconds_per_second", 0))
+    for r in results:
+        marker = "  <- best" if r is best else ""
+        print(f"{r['workers']:>3}x{r['cpu_threads']:<4}  {r['wall_s']:8.1f}  "
+              f"{r.get('audio_seconds_per_second', 0):9.1f}  {r['segments']}{marker}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=4)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+import os
+import json
+import time
+import platform
+import threading
+import subprocess
+import contextvars
+from contextlib import contextmanager
+from core.instrumentation import span
+
+# Named x264 settings. "social-final" is what every render used before profiles existed.
+ENCODING_PROFILES = {
+    "draft": {"preset": "veryfast", "crf": 26},
+    "social-final": {"preset": "medium", "crf": 18},
+    "archive": {"preset": "slow", "crf": 16},
+}
+DEFAULT_PROFILE = "social-final"
+# Resolved from the measured preset speeds of this host, see auto_profile()
+AUTO_PROFILE = "auto"
+
+# x264 presets from fastest to best compression; auto picks the last one fast enough
+X264_PRESETS = ["ultrafast", "superfast", "veryfast", "faster", "fast", "medium", "slow", "slower"]
+# Auto mode: encoded seconds of 1080x1920 video per wall second that a preset has to reach
+AUTO_TARGET_REALTIME = 1.0
+AUTO_CRF = 18
+
+# Per-host preset speeds; measured once, then reused across sessions
+BENCHMARK_FILE = "encoder_benchmark.json"
+BENCHMARK_SECONDS = 2
+BENCHMARK_SIZE = "1080x1920"
+BENCHMARK_FPS = 30
+
+_benchmark_lock = threading.Lock()
+_benchmark = None
+
+
+def _host_key():
+    return f"{platform.node()}_{platform.machine()}_{os.cpu_count()}"
+
+
+def _time_preset(preset, seconds=BENCHMARK_SECONDS, size=BENCHMARK_SIZE, fps=BENCHMARK_FPS):
+    """Encoded seconds per wall second for preset on a synthetic clip (None if ffmpeg fails)."""
+    cmd = [
+        'ffmpeg', '-hide_banner', '-nostdin', '-f', 'lavfi',
+        '-i', f'testsrc2=size={size}:rate={fps}', '-t', str(seconds),
+        '-c:v', 'libx264', '-preset', preset, '-crf', str(AUTO_CRF), '-pix_fmt', 'yuv420p',
+        '-f', 'null', '-'
+    ]
+    start = time.perf_counter()
+    result = subprocess.run(cmd, capture_output=True)
+    elapsed = time.perf_counter() - start
+    if result.returncode != 0:
+        print(f"Encoder benchmark for {preset} failed: {result.stderr.decode('utf-8', 'ignore')[-300:]}")
+        return None
+    return seconds / elapsed
+
+
+def benchmark_presets(presets=None, refresh=False):
+    """
+    Real-time factor (encoded seconds per wall second) of each x264 preset on this host.
+    Stored in BENCHMARK_FILE per host, so the encodes run only the first time (or with refresh).
+    """
+    global _benchmark
+    presets = presets or X264_PRESETS
+    with _benchmark_lock:
+        if _benchmark is None:
+            try:
+                with open(BENCHMARK_FILE, 'r', encoding='utf-8') as f:
+                    _benchmark = json.load(f)
+            except (OSError, ValueError):
+                _benchmark = {}
+
+        results = {} if refresh else dict(_benchmark.get(_host_key(), {}))
+        missing = [p for p in presets if p not in results]
+        if missing:
+            with span("encoder_benchmark", presets=len(missing)):
+                for preset in missing:
+                    speed = _time_preset(preset)
+                    if speed is not None:
+                        results[preset] = round(speed, 3)
+                        print(f"Encoder benchmark: {preset} {speed:.2f}x real time")
+            _benchmark[_host_key()] = results
+            try:
+                with open(BENCHMARK_FILE, 'w', encoding='utf-8') as f:
+                    json.dump(_benchmark, f, indent=4)
+            except OSError as e:
+                print(f"Could not save encoder benchmark: {e}")
+        return {p: results[p] for p in presets if p in results}
+
+
+def auto_profile(target_realtime=None):
+    """
+    The best-compressing preset that still encodes at target_realtime (config "encoding_target_realtime",
+    default AUTO_TARGET_REALTIME) or faster, at AUTO_CRF. Falls back to the fastest measured preset.
+    """
+    from core.utils import load_config
+
+    if target_realtime is None:
+        target_realtime = load_config().get("encoding_target_realtime", AUTO_TARGET_REALTIME)
+    speeds = benchmark_presets()
+    if not speeds:
+        return dict(ENCODING_PROFILES[DEFAULT_PROFILE])
+    fast_enough = [p for p in X264_PRESETS if speeds.get(p, 0) >= target_realtime]
+    preset = fast_enough[-1] if fast_enough else max(speeds, key=speeds.get)
+    return {"preset": preset, "crf": AUTO_CRF}
+
+
+def resolve_profile(profile=None, **overrides):
+    """
+    x264 settings dict ({"preset", "crf"} plus any extra keys) for a profile name, "auto",
+    a settings dict, or None (config "encoding_profile", default DEFAULT_PROFILE), with overrides applied.
+    """
+    if profile is None:
+        from core.utils import load_config
+
+        profile = load_config().get("encoding_profile", DEFAULT_PROFILE)
+    if isinstance(profile, dict):
+        settings = dict(profile)
+    elif profile == AUTO_PROFILE:
+        settings = auto_profile()
+    elif profile in ENCODING_PROFILES:
+        settings = dict(ENCODING_PROFILES[profile])
+    else:
+        print(f"Unknown encoding profile '{profile}', using {DEFAULT_PROFILE}")
+        settings = dict(ENCODING_PROFILES[DEFAULT_PROFILE])
+    settings.update({k: v for k, v in overrides.items() if v is not None})
+    return settings
+
+
+# Resolved settings of the encoding_profile block running in the current context
+_current_profile = contextvars.ContextVar("encoding_profile", default=None)
+
+
+@contextmanager
+def encoding_profile(profile=None, **overrides):
+    """
+    Makes every x264 encode inside the block (in this thread, and in pool workers started with
+    ffmpeg_runner.submit_in_context) use profile, e.g. `with encoding_profile("draft", crf=30):`.
+    "auto" is resolved (and benchmarked if needed) once, on entry.
+    """
+    token = _current_profile.set(resolve_profile(profile, **overrides))
+    try:
+        yield _current_profile.get()
+    finally:
+        _current_profile.reset(token)
+
+
+def current_profile():
+    """Settings of the active encoding_profile block, or of the configured default profile."""
+    settings = _current_profile.get()
+    return settings if settings is not None else resolve_profile()
+
+
+def x264_args(**overrides):
+    """ffmpeg output arguments for an H.264 encode with the current profile."""
+    settings = dict(current_profile(), **{k: v for k, v in overrides.items() if v is not None})
+    args = ['-c:v', 'libx264', '-preset', settings["preset"], '-crf', str(settings["crf"])]
+    if settings.get("tune"):
+        args += ['-tune', settings["tune"]]
+    return args
+
+
+def x264_kwargs(**overrides):
+    """x264_args() as ffmpeg-python output() keyword arguments."""
+    args = x264_args(**overrides)
+    return {"vcodec": args[1], **{args[i].lstrip('-'): args[i + 1] for i in range(2, len(args), 2)}}
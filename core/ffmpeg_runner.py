@@ -0,0 +1,336 @@
+import os
+import re
+import sys
+import signal
+import threading
+import subprocess
+import contextvars
+from collections import deque
+from contextlib import contextmanager
+from core.instrumentation import span, count
+
+# Lines of ffmpeg stderr kept for error messages; earlier output is discarded as it streams
+STDERR_TAIL_LINES = 200
+
+# Seconds between SIGTERM and SIGKILL when a cancelled ffmpeg does not exit
+KILL_GRACE_SECONDS = 3.0
+
+_DURATION_RE = re.compile(r'Duration:\s*(\d+):(\d+):(\d+(?:\.\d+)?)')
+
+
+class CancelToken:
+    """Cooperative cancellation flag shared between the GUI and a worker thread."""
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    def wait(self, timeout):
+        """Blocks up to timeout seconds; returns True once cancelled."""
+        return self._event.wait(timeout)
+
+
+class FFmpegResult:
+    """Outcome of run_ffmpeg: returncode, the stderr tail (str) and whether it was cancelled."""
+
+    def __init__(self, returncode, stderr, cancelled=False):
+        self.returncode = returncode
+        self.stderr = stderr
+        self.cancelled = cancelled
+
+    def __repr__(self):
+        return f"FFmpegResult(returncode={self.returncode}, cancelled={self.cancelled})"
+
+
+class FFmpegError(RuntimeError):
+    """Raised by iter_ffmpeg_output when ffmpeg fails or is cancelled; stderr holds the stderr tail."""
+
+    def __init__(self, message, stderr="", cancelled=False):
+        super().__init__(message)
+        self.stderr = stderr
+        self.cancelled = cancelled
+
+
+# (cancel_token, progress_callback) of the job running in the current context; see ffmpeg_job()
+_current_job = contextvars.ContextVar("ffmpeg_job", default=(None, None))
+
+
+@contextmanager
+def ffmpeg_job(cancel=None, progress=None):
+    """
+    Makes every run_ffmpeg call inside the block (in this thread, and in pool workers started
+    with submit_in_context) use cancel and progress unless the call passes its own.
+    Lets long multi-step renders be cancelled without threading a token through every function.
+    """
+    token = _current_job.set((cancel, progress))
+    try:
+        yield
+    finally:
+        _current_job.reset(token)
+
+
+def current_cancel_token():
+    return _current_job.get()[0]
+
+
+def is_cancelled():
+    """True if the current ffmpeg_job has been cancelled."""
+    cancel = current_cancel_token()
+    return cancel is not None and cancel.cancelled
+
+
+def submit_in_context(executor, fn, *args, **kwargs):
+    """executor.submit() that carries the current ffmpeg_job over to the worker thread."""
+    return executor.submit(contextvars.copy_context().run, fn, *args, **kwargs)
+
+
+def _guess_outputs(cmd):
+    """The output file of a typical ffmpeg command line is its last argument."""
+    last = cmd[-1] if cmd else ''
+    if not last or last.startswith('-') or last.startswith('pipe:'):
+        return []
+    return [last]
+
+
+def _duration_from_cmd(cmd):
+    for i in range(len(cmd) - 2, 0, -1):
+        if cmd[i] == '-t':
+            try:
+                return float(cmd[i + 1])
+            except ValueError:
+                return None
+    return None
+
+
+def _kill_process_group(proc):
+    try:
+        if sys.platform == 'win32':
+            subprocess.run(['taskkill', '/F', '/T', '/PID', str(proc.pid)], capture_output=True)
+        else:
+            os.killpg(proc.pid, signal.SIGTERM)
+            try:
+                proc.wait(timeout=KILL_GRACE_SECONDS)
+            except subprocess.TimeoutExpired:
+                os.killpg(proc.pid, signal.SIGKILL)
+    except (ProcessLookupError, OSError):
+        pass
+
+
+def _popen_args():
+    """Starts ffmpeg in its own process group so cancellation can stop it and its children."""
+    if sys.platform == 'win32':
+        return {'creationflags': subprocess.CREATE_NEW_PROCESS_GROUP}
+    return {'start_new_session': True}
+
+
+def _remove_outputs(paths):
+    for path in paths:
+        try:
+            if path and os.path.isfile(path):
+                os.remove(path)
+        except OSError:
+            pass
+
+
+def run_ffmpeg(cmd, duration=None, progress=None, cancel=None, outputs=None, input=None,
+               stderr_lines=STDERR_TAIL_LINES):
+    """
+    Runs an ffmpeg command line, streaming -progress pipe:1 instead of buffering all output.
+
+    duration: expected output length in seconds for percent; defaults to the last -t of cmd,
+              then to the first input's Duration reported by ffmpeg.
+    progress: callback(dict) with 'percent' (None if the duration is unknown), 'time', 'frame',
+              'fps' and 'speed', called from the reader thread about twice a second.
+    cancel:   CancelToken; when cancelled the whole ffmpeg process group is terminated.
+    outputs:  files removed when the run fails or is cancelled (default: the last argument).
+    input:    bytes written to ffmpeg's stdin.
+    progress and cancel default to those of the enclosing ffmpeg_job().
+
+    Only the last stderr_lines lines of stderr are kept.
+    Returns an FFmpegResult (returncode, stderr, cancelled).
+    """
+    output = os.path.basename(cmd[-1]) if cmd else ''
+    with span("ffmpeg", output=output):
+        count("ffmpeg_runs")
+        return _run_ffmpeg(cmd, duration, progress, cancel, outputs, input, stderr_lines)
+
+
+def _run_ffmpeg(cmd, duration, progress, cancel, outputs, input, stderr_lines):
+    job_cancel, job_progress = _current_job.get()
+    cancel = cancel or job_cancel
+    progress = progress or job_progress
+    outputs = _guess_outputs(cmd) if outputs is None else outputs
+
+    if cancel is not None and cancel.cancelled:
+        return FFmpegResult(-1, "Cancelled", cancelled=True)
+
+    full_cmd = list(cmd)
+    reports_progress = 'pipe:1' not in full_cmd and '-' != full_cmd[-1]
+    if reports_progress:
+        full_cmd[1:1] = ['-progress', 'pipe:1', '-nostats']
+
+    proc = subprocess.Popen(
+        full_cmd,
+        stdin=subprocess.PIPE if input is not None else subprocess.DEVNULL,
+        stdout=subprocess.PIPE if reports_progress else subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        **_popen_args()
+    )
+
+    stderr_tail = deque(maxlen=stderr_lines)
+    expected = {"duration": duration or _duration_from_cmd(cmd)}
+
+    def read_stderr():
+        for raw in proc.stderr:
+            line = raw.decode('utf8', errors='replace').rstrip()
+            stderr_tail.append(line)
+            if expected["duration"] is None:
+                match = _DURATION_RE.search(line)
+                if match:
+                    h, m, s = match.groups()
+                    expected["duration"] = int(h) * 3600 + int(m) * 60 + float(s)
+
+    def write_stdin():
+        try:
+            proc.stdin.write(input)
+        except (BrokenPipeError, OSError):
+            pass
+        finally:
+            try:
+                proc.stdin.close()
+            except OSError:
+                pass
+
+    killed = []
+
+    def watch_cancel():
+        while proc.poll() is None:
+            if cancel.wait(0.2):
+                killed.append(True)
+                _kill_process_group(proc)
+                return
+
+    threads = [threading.Thread(target=read_stderr, daemon=True)]
+    if input is not None:
+        threads.append(threading.Thread(target=write_stdin, daemon=True))
+    if cancel is not None:
+        threads.append(threading.Thread(target=watch_cancel, daemon=True))
+    for thread in threads:
+        thread.start()
+
+    if reports_progress:
+        stats = {}
+        for raw in proc.stdout:
+            key, _, value = raw.decode('utf8', errors='replace').strip().partition('=')
+            stats[key] = value
+            if key == 'progress' and progress is not None:
+                try:
+                    progress(_progress_info(stats, expected["duration"]))
+                except Exception as e:
+                    print(f"FFmpeg progress callback error: {e}")
+
+    proc.wait()
+    for thread in threads:
+        thread.join(timeout=5)
+
+    cancelled = bool(killed)
+    if cancelled or proc.returncode != 0:
+        _remove_outputs(outputs)
+    stderr = "\n".join(stderr_tail)
+    if cancelled:
+        stderr = "Cancelled\n" + stderr
+    return FFmpegResult(proc.returncode if not cancelled else -1, stderr, cancelled=cancelled)
+
+
+def _progress_info(stats, duration):
+    """Converts one -progress block into the dict passed to progress callbacks."""
+    def number(key, suffix=''):
+        try:
+            return float(stats.get(key, '').rstrip(suffix))
+        except ValueError:
+            return None
+
+    # out_time_us is in microseconds; older builds only report out_time_ms (also microseconds)
+    time_us = number('out_time_us')
+    if time_us is None:
+        time_us = number('out_time_ms')
+    seconds = max(0.0, time_us / 1e6) if time_us is not None else None
+
+    percent = None
+    if stats.get('progress') == 'end':
+        percent = 100.0
+    elif duration and seconds is not None:
+        percent = min(100.0, 100.0 * seconds / duration)
+
+    frame = number('frame')
+    return {
+        "percent": percent,
+        "time": seconds,
+        "frame": int(frame) if frame is not None else None,
+        "fps": number('fps'),
+        "speed": number('speed', 'x'),
+        "done": stats.get('progress') == 'end'
+    }
+
+
+def iter_ffmpeg_output(cmd, chunk_size=1 << 16, cancel=None, stderr_lines=STDERR_TAIL_LINES):
+    """
+    Runs an ffmpeg command that writes to pipe:1 and yields its stdout in chunks of up to chunk_size bytes,
+    so decoded media can be consumed without an intermediate file.
+    Closing the generator early stops ffmpeg. cancel defaults to that of the enclosing ffmpeg_job().
+    Raises FFmpegError (with the stderr tail) when ffmpeg fails or is cancelled.
+    """
+    cancel = cancel or current_cancel_token()
+    if cancel is not None and cancel.cancelled:
+        raise FFmpegError("Cancelled", cancelled=True)
+
+    # No span() here: a span left open across yields would leak into the consumer's context,
+    # callers trace the whole decode instead
+    count("ffmpeg_runs")
+    proc = subprocess.Popen(cmd, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                            **_popen_args())
+    stderr_tail = deque(maxlen=stderr_lines)
+
+    def read_stderr():
+        for raw in proc.stderr:
+            stderr_tail.append(raw.decode('utf8', errors='replace').rstrip())
+
+    stderr_thread = threading.Thread(target=read_stderr, daemon=True)
+    stderr_thread.start()
+    try:
+        while True:
+            if cancel is not None and cancel.cancelled:
+                raise FFmpegError("Cancelled", "\n".join(stderr_tail), cancelled=True)
+            chunk = proc.stdout.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+        proc.wait()
+        stderr_thread.join(timeout=5)
+        if proc.returncode != 0:
+            stderr = "\n".join(stderr_tail)
+            raise FFmpegError(f"ffmpeg exited with code {proc.returncode}: {stderr[-500:]}", stderr)
+    finally:
+        if proc.poll() is None:
+            _kill_process_group(proc)
+        proc.stdout.close()
+
+
+def run_stream(stream, **kwargs):
+    """
+    Runs an ffmpeg-python output stream through run_ffmpeg.
+    Raises ffmpeg.Error (stderr tail as bytes) on failure or cancellation, like stream.run().
+    """
+    import ffmpeg
+
+    cmd = ffmpeg.compile(stream)
+    result = run_ffmpeg(cmd, **kwargs)
+    if result.returncode != 0:
+        raise ffmpeg.Error('ffmpeg', b'', result.stderr.encode('utf8'))
+    return result
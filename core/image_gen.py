@@ -1,5 +1,84 @@
 from PIL import Image, ImageDraw, ImageFont
 import os
+import subprocess
+from functools import lru_cache
+
+_font_path_cache = {}
+
+def resolve_font_path(family):
+    """
+    Resolves a font family name (e.g. "Arial") to a font file using fc-match.
+    Results are cached per family. Falls back to "<family>.ttf", which Pillow
+    searches for in the platform font directories.
+    """
+    if not family:
+        family = "Arial"
+    if family in _font_path_cache:
+        return _font_path_cache[family]
+
+    path = None
+    try:
+        result = subprocess.run(['fc-match', '-f', '%{file}', family], capture_output=True, text=True)
+        if result.returncode == 0 and result.stdout.strip():
+            path = result.stdout.strip()
+    except Exception:
+        pass
+
+    if not path:
+        path = family if family.lower().endswith(('.ttf', '.ttc', '.otf')) else f"{family}.ttf"
+    _font_path_cache[family] = path
+    return path
+
+@lru_cache(maxsize=64)
+def load_font(font_path, font_size):
+    """
+    Loads a TrueType font, falling back to Arial and then Pillow's default font.
+    Fonts are cached per (font_path, font_size), so repeated covers/subtitles reuse the parsed face.
+    """
+    try:
+        return ImageFont.truetype(font_path, font_size)
+    except IOError:
+        # Fallback to default
+        try:
+            return ImageFont.truetype("Arial.ttf", font_size)
+        except:
+            return ImageFont.load_default()
+
+@lru_cache(maxsize=8192)
+def word_width(font, word):
+    """Advance width of word in font, memoised (fonts come from the load_font cache, so they are stable keys)."""
+    return font.getlength(word)
+
+def wrap_text(text, font, max_width):
+    """
+    Greedy word wrap. Returns the list of lines that fit within max_width.
+    Line widths are running sums of memoised word advances, so wrapping is linear in the
+    number of words instead of re-measuring the growing line for every word.
+    """
+    lines = []
+    space = word_width(font, ' ')
+    current_line = []
+    current_width = 0
+    
+    for word in text.split():
+        w = word_width(font, word)
+        test_width = current_width + space + w if current_line else w
+        if test_width <= max_width:
+            current_line.append(word)
+            current_width = test_width
+        else:
+            if current_line:
+                lines.append(' '.join(current_line))
+                current_line = [word]
+                current_width = w
+            else:
+                # Word itself is too long, force split or just add it
+                lines.append(word)
+                current_line = []
+                current_width = 0
+    if current_line:
+        lines.append(' '.join(current_line))
+    return lines
 
 def draw_text_on_image(image_path, text, output_path, style):
     """
@@ -18,141 +97,247 @@ def draw_text_on_image(image_path, text, output_path, style):
             # Convert to RGBA for transparency support if needed
             img = img.convert("RGBA")
             
-            draw = ImageDraw.Draw(img)
-            
-            # Load Font
-            font_size = style.get("font_size", 50)
-            font_path = style.get("font_path", "Arial") # Default to Arial if not found
+            img = render_text_on_image(img, text, style)
             
-            try:
-                font = ImageFont.truetype(font_path, font_size)
-            except IOError:
-                # Fallback to default
-                try:
-                    font = ImageFont.truetype("Arial.ttf", font_size)
-                except:
-                    font = ImageFont.load_default()
-            
-            # Text Wrapping Logic
-            img_width, img_height = img.size
-            max_width = img_width - 40 # Margin
-            
-            lines = []
-            words = text.split()
-            current_line = []
-            
-            for word in words:
-                test_line = ' '.join(current_line + [word])
-                bbox = draw.textbbox((0, 0), test_line, font=font)
-                w = bbox[2] - bbox[0]
-                if w <= max_width:
-                    current_line.append(word)
-                else:
-                    if current_line:
-                        lines.append(' '.join(current_line))
-                        current_line = [word]
-                    else:
-                        # Word itself is too long, force split or just add it
-                        lines.append(word)
-                        current_line = []
-            if current_line:
-                lines.append(' '.join(current_line))
-            
-            # Calculate total height of block
-            line_heights = []
-            total_text_height = 0
-            for line in lines:
-                bbox = draw.textbbox((0, 0), line, font=font)
-                h = bbox[3] - bbox[1]
-                # Add some line spacing
-                h += font_size * 0.2
-                line_heights.append(h)
-                total_text_height += h
+            # Save
+            img = img.convert("RGB") # Convert back to RGB for JPG
+            img.save(output_path)
+            return output_path
             
-            # Remove last spacing
-            if line_heights:
-                total_text_height -= (font_size * 0.2)
+    except Exception as e:
+        print(f"Image Gen Error: {e}")
+        return None
 
-            # Position Block
-            pos = style.get("position", "center")
-            anchor = style.get("anchor", None)
-            
-            # Determine starting Y based on anchor/position
-            # If anchor is 'mm' (center), pos is center of block
-            # If anchor is None (top-left), pos is top-left of block
+
+def render_text_on_image(img, text, style):
+    """
+    Draws text onto img (an RGBA PIL Image, modified in place) with the draw_text_on_image style.
+    Returns img.
+    """
+    draw = ImageDraw.Draw(img)
+    
+    # Load Font
+    font_size = style.get("font_size", 50)
+    font_path = style.get("font_path", "Arial") # Default to Arial if not found
+    
+    font = load_font(font_path, font_size)
+    
+    # Text Wrapping Logic
+    img_width, img_height = img.size
+    max_width = img_width - 40 # Margin
+    
+    lines = wrap_text(text, font, max_width)
+    
+    # Measure each line once; heights and widths below reuse these boxes
+    boxes = [draw.textbbox((0, 0), line, font=font) for line in lines]
+    
+    # Calculate total height of block
+    line_heights = []
+    total_text_height = 0
+    for bbox in boxes:
+        h = bbox[3] - bbox[1]
+        # Add some line spacing
+        h += font_size * 0.2
+        line_heights.append(h)
+        total_text_height += h
+    
+    # Remove last spacing
+    if line_heights:
+        total_text_height -= (font_size * 0.2)
+
+    # Position Block
+    pos = style.get("position", "center")
+    anchor = style.get("anchor", None)
+    
+    # Determine starting Y based on anchor/position
+    # If anchor is 'mm' (center), pos is center of block
+    # If anchor is None (top-left), pos is top-left of block
+    
+    if pos == "center":
+        start_x = img_width / 2
+        start_y = (img_height - total_text_height) / 2
+        draw_anchor = "mm" # Force center alignment for lines
+    else:
+        start_x, start_y = pos
+        draw_anchor = anchor
+    
+    # If anchor is 'mm', start_y is the center of the BLOCK.
+    # We need to calculate the top of the block to draw lines downwards.
+    if draw_anchor == "mm":
+        current_y = start_y - (total_text_height / 2)
+        # Also x is center of the BLOCK.
+        # To align LEFT, we need the left edge of the block.
+        # We need the max width of the lines to find the left edge.
+        max_line_width = max((bbox[2] - bbox[0] for bbox in boxes), default=0)
+        
+        # Left edge relative to center start_x
+        block_left_x = start_x - (max_line_width / 2)
+        line_x = block_left_x
+    else:
+        # Assume top-left or similar. 
+        # If anchor is None, it means top-left.
+        current_y = start_y
+        line_x = start_x
+        
+    # Colors
+    text_color = style.get("color", "#FFFFFF")
+    border_color = style.get("border_color", "#000000")
+    border_width = style.get("border_width", 2)
+    
+    # Draw Each Line
+    for i, line in enumerate(lines):
+        h = line_heights[i]
+        
+        if draw_anchor == "mm":
+            # We are drawing left-aligned lines, but the block is centered.
+            # We calculated line_x as the left edge.
+            # We should use anchor="lm" (Left-Middle) for each line to align them to line_x.
+            # And we need the Y center of the line slot.
             
-            if pos == "center":
-                start_x = img_width / 2
-                start_y = (img_height - total_text_height) / 2
-                draw_anchor = "mm" # Force center alignment for lines
-            else:
-                start_x, start_y = pos
-                draw_anchor = anchor
+            line_content_h = h - (font_size * 0.2)
+            draw_y = current_y + (line_content_h / 2)
             
-            # If anchor is 'mm', start_y is the center of the BLOCK.
-            # We need to calculate the top of the block to draw lines downwards.
-            if draw_anchor == "mm":
-                current_y = start_y - (total_text_height / 2)
-                # Also x is center of the BLOCK.
-                # To align LEFT, we need the left edge of the block.
-                # We need the max width of the lines to find the left edge.
-                max_line_width = 0
-                for line in lines:
-                    bbox = draw.textbbox((0, 0), line, font=font)
-                    w = bbox[2] - bbox[0]
-                    if w > max_line_width:
-                        max_line_width = w
-                
-                # Left edge relative to center start_x
-                block_left_x = start_x - (max_line_width / 2)
-                line_x = block_left_x
+            if border_width > 0:
+                draw.text((line_x, draw_y), line, font=font, fill=text_color, stroke_width=border_width, stroke_fill=border_color, anchor="lm")
             else:
-                # Assume top-left or similar. 
-                # If anchor is None, it means top-left.
-                current_y = start_y
-                line_x = start_x
-                
-            # Colors
-            text_color = style.get("color", "#FFFFFF")
-            border_color = style.get("border_color", "#000000")
-            border_width = style.get("border_width", 2)
-            
-            # Draw Each Line
-            for i, line in enumerate(lines):
-                h = line_heights[i]
+                draw.text((line_x, draw_y), line, font=font, fill=text_color, anchor="lm")
                 
-                if draw_anchor == "mm":
-                    # We are drawing left-aligned lines, but the block is centered.
-                    # We calculated line_x as the left edge.
-                    # We should use anchor="lm" (Left-Middle) for each line to align them to line_x.
-                    # And we need the Y center of the line slot.
-                    
-                    line_content_h = h - (font_size * 0.2)
-                    draw_y = current_y + (line_content_h / 2)
-                    
-                    if border_width > 0:
-                        draw.text((line_x, draw_y), line, font=font, fill=text_color, stroke_width=border_width, stroke_fill=border_color, anchor="lm")
-                    else:
-                        draw.text((line_x, draw_y), line, font=font, fill=text_color, anchor="lm")
-                        
-                    current_y += h
-                else:
-                    # Left aligned (default)
-                    # We draw at line_x, current_y
-                    # anchor=None means top-left (la)
-                    
-                    if border_width > 0:
-                        draw.text((line_x, current_y), line, font=font, fill=text_color, stroke_width=border_width, stroke_fill=border_color, anchor=draw_anchor)
-                    else:
-                        draw.text((line_x, current_y), line, font=font, fill=text_color, anchor=draw_anchor)
-                    
-                    current_y += h
+            current_y += h
+        else:
+            # Left aligned (default)
+            # We draw at line_x, current_y
+            # anchor=None means top-left (la)
             
-            # Save
-            img = img.convert("RGB") # Convert back to RGB for JPG
-            img.save(output_path)
-            return output_path
+            if border_width > 0:
+                draw.text((line_x, current_y), line, font=font, fill=text_color, stroke_width=border_width, stroke_fill=border_color, anchor=draw_anchor)
+            else:
+                draw.text((line_x, current_y), line, font=font, fill=text_color, anchor=draw_anchor)
             
+            current_y += h
+    
+    return img
+
+
+# Output formats for draw_text_on_images, keyed by file extension
+COVER_FORMATS = {
+    ".jpg": "JPEG",
+    ".jpeg": "JPEG",
+    ".webp": "WEBP",
+    ".png": "PNG",
+}
+
+
+def save_cover(img, output_path, quality=90):
+    """Saves an RGBA cover as JPEG/WebP (with quality) or PNG, picked by output_path's extension."""
+    fmt = COVER_FORMATS.get(os.path.splitext(output_path)[1].lower(), "JPEG")
+    if fmt == "PNG":
+        img.save(output_path, fmt)
+    else:
+        img.convert("RGB").save(output_path, fmt, quality=quality)
+    return output_path
+
+
+def draw_text_on_images(image_path, texts, output_paths, style, quality=90, max_workers=None):
+    """
+    Batch version of draw_text_on_image: renders one cover per key of texts onto the same base image.
+    The base is decoded once; each cover is drawn on a copy in a thread pool
+    (Pillow releases the GIL while drawing and encoding).
+    
+    texts: {key: text}, e.g. {"English": "...", "Japanese": "..."}
+    output_paths: {key: path}; .jpg/.jpeg/.webp use quality, .png is lossless
+    Returns {key: output_path or None}.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    
+    try:
+        with Image.open(image_path) as base:
+            base = base.convert("RGBA")
     except Exception as e:
         print(f"Image Gen Error: {e}")
-        return None
+        return {key: None for key in texts}
+    
+    def render(key):
+        try:
+            img = render_text_on_image(base.copy(), texts[key], style)
+            return key, save_cover(img, output_paths[key], quality=quality)
+        except Exception as e:
+            print(f"Image Gen Error ({key}): {e}")
+            return key, None
+    
+    workers = max(1, min(len(texts), max_workers or os.cpu_count() or 1))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return dict(executor.map(render, list(texts)))
+
+
+def render_subtitle_sprite(text, style, canvas_width):
+    """
+    Renders one subtitle event into a transparent RGBA sprite, centered horizontally
+    and wrapped to the canvas width (like libass Alignment=2).
+    style: {
+        "font_path": str,
+        "font_size": int,
+        "color": str (hex),
+        "border_width": int (outline thickness, 0 = none),
+        "border_color": str (hex),
+        "shadow": int (shadow offset in px, 0 = none),
+        "bg_color": (r, g, b, a) tuple or None (opaque box behind the text),
+        "margin_h": int (left/right margin used for wrapping)
+    }
+    Returns a PIL Image of size (canvas_width, text_block_height).
+    """
+    font_size = style.get("font_size", 48)
+    font = load_font(style.get("font_path", "Arial"), font_size)
+    border_width = style.get("border_width", 0)
+    shadow = style.get("shadow", 0)
+    bg_color = style.get("bg_color")
+    pad = max(border_width, shadow)
+
+    measure = ImageDraw.Draw(Image.new("RGBA", (1, 1)))
+    max_width = canvas_width - 2 * style.get("margin_h", 20)
+    lines = wrap_text(text, font, max_width) or [""]
+
+    line_spacing = font_size * 0.2
+    boxes = [measure.textbbox((0, 0), line, font=font, stroke_width=border_width) for line in lines]
+    line_height = max(font_size, max(b[3] - b[1] for b in boxes))
+    block_height = int(line_height * len(lines) + line_spacing * (len(lines) - 1)) + 2 * pad
+
+    sprite = Image.new("RGBA", (canvas_width, max(1, block_height)), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(sprite)
+
+    y = pad
+    for line, bbox in zip(lines, boxes):
+        w = bbox[2] - bbox[0]
+        x = (canvas_width - w) / 2
+        center_y = y + line_height / 2
+        if bg_color:
+            draw.rectangle([x - pad, y - pad, x + w + pad, y + line_height + pad], fill=bg_color)
+        if shadow and not bg_color:
+            draw.text((canvas_width / 2 + shadow, center_y + shadow), line, font=font, fill=(0, 0, 0, 128),
+                      stroke_width=border_width, stroke_fill=(0, 0, 0, 128), anchor="mm")
+        if border_width > 0 and not bg_color:
+            draw.text((canvas_width / 2, center_y), line, font=font, fill=style.get("color", "#FFFFFF"),
+                      stroke_width=border_width, stroke_fill=style.get("border_color", "#000000"), anchor="mm")
+        else:
+            draw.text((canvas_width / 2, center_y), line, font=font, fill=style.get("color", "#FFFFFF"), anchor="mm")
+        y += line_height + line_spacing
+
+    return sprite
+
+
+@lru_cache(maxsize=16)
+def scale_logo(logo_path, width):
+    """Loads logo_path as RGBA scaled to width (aspect kept, Lanczos like overlay_logo). Cached per (path, width)."""
+    with Image.open(logo_path) as logo:
+        logo = logo.convert("RGBA")
+    height = max(1, round(logo.height * width / logo.width))
+    return logo.resize((max(1, width), height), Image.Resampling.LANCZOS)
+
+
+def composite_logo(background, logo, x, y):
+    """
+    Alpha-composites logo onto background with its top-left corner at (x, y), like ffmpeg's overlay.
+    Positions partly or fully outside the frame are clipped. Returns a new RGBA image.
+    """
+    layer = Image.new("RGBA", background.size, (0, 0, 0, 0))
+    layer.paste(logo, (int(x), int(y)))
+    return Image.alpha_composite(background.convert("RGBA"), layer)
@@ -0,0 +1,210 @@
+import os
+import sys
+import json
+import time
+import threading
+import functools
+import contextvars
+from collections import defaultdict
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# ru_maxrss is reported in kilobytes on Linux and in bytes on macOS
+_MAXRSS_UNIT = 1 if sys.platform == 'darwin' else 1024
+
+
+def _proc_io():
+    """(read_bytes, write_bytes) of this process from /proc/self/io, or (None, None).
+    Reaped child processes (ffmpeg, ffprobe) are included once they exit."""
+    try:
+        with open('/proc/self/io', 'r') as f:
+            values = dict(line.split(':', 1) for line in f if ':' in line)
+        return int(values['read_bytes']), int(values['write_bytes'])
+    except (OSError, KeyError, ValueError):
+        return None, None
+
+
+def _snapshot():
+    snap = {"wall": time.perf_counter(), "cpu": time.process_time(), "children_cpu": None,
+            "peak_rss": None, "children_peak_rss": None}
+    if resource is not None:
+        children = resource.getrusage(resource.RUSAGE_CHILDREN)
+        own = resource.getrusage(resource.RUSAGE_SELF)
+        snap["children_cpu"] = children.ru_utime + children.ru_stime
+        snap["peak_rss"] = own.ru_maxrss * _MAXRSS_UNIT
+        snap["children_peak_rss"] = children.ru_maxrss * _MAXRSS_UNIT
+    snap["read_bytes"], snap["write_bytes"] = _proc_io()
+    return snap
+
+
+def _delta(end, start, key):
+    if end[key] is None or start[key] is None:
+        return None
+    return end[key] - start[key]
+
+
+class Span:
+    """One timed stage. Resource figures are process-wide deltas, so spans running
+    concurrently on different threads each include the other's usage."""
+
+    def __init__(self, span_id, name, parent, attrs):
+        self.id = span_id
+        self.name = name
+        self.parent = parent
+        self.attrs = dict(attrs)
+        self.thread = threading.get_ident()
+        self.counters = defaultdict(int)
+        self.start = _snapshot()
+        self.metrics = {}
+
+    def finish(self):
+        end = _snapshot()
+        self.metrics = {
+            "wall_s": end["wall"] - self.start["wall"],
+            "cpu_s": end["cpu"] - self.start["cpu"],
+            "children_cpu_s": _delta(end, self.start, "children_cpu"),
+            "peak_rss_bytes": end["peak_rss"],
+            "children_peak_rss_bytes": end["children_peak_rss"],
+            "read_bytes": _delta(end, self.start, "read_bytes"),
+            "write_bytes": _delta(end, self.start, "write_bytes"),
+        }
+
+    def to_dict(self, origin):
+        return {
+            "id": self.id,
+            "name": self.name,
+            "parent": self.parent.id if self.parent else None,
+            "thread": self.thread,
+            "start_s": self.start["wall"] - origin,
+            **self.metrics,
+            "counters": dict(self.counters),
+            "attrs": self.attrs,
+        }
+
+
+class Tracer:
+    """
+    Collects spans for one job (an export, a translation, a Veo generation).
+    Activate it with `with tracer.activate():`; span() and count() anywhere below then record
+    into it, including pool workers started with a copied context (see ffmpeg_runner.submit_in_context).
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.created_at = time.time()
+        self.origin = time.perf_counter()
+        self.spans = []
+        self.counters = defaultdict(int)
+        self._lock = threading.Lock()
+        self._next_id = 0
+
+    @contextmanager
+    def activate(self):
+        token = _current.set((self, None))
+        try:
+            with span(self.name):
+                yield self
+        finally:
+            _current.reset(token)
+
+    def _open(self, name, parent, attrs):
+        with self._lock:
+            self._next_id += 1
+            s = Span(self._next_id, name, parent, attrs)
+            self.spans.append(s)
+        return s
+
+    def _count(self, s, name, n):
+        with self._lock:
+            self.counters[name] += n
+            while s is not None:
+                s.counters[name] += n
+                s = s.parent
+
+    # --- Reports ---
+
+    def report(self):
+        """Per-job summary: totals per stage name, counters and the full span list."""
+        finished = [s for s in self.spans if s.metrics]
+        stages = {}
+        for s in finished:
+            stage = stages.setdefault(s.name, {"count": 0, "wall_s": 0.0, "children_cpu_s": 0.0,
+                                               "read_bytes": 0, "write_bytes": 0})
+            stage["count"] += 1
+            for key in ("wall_s", "children_cpu_s", "read_bytes", "write_bytes"):
+                stage[key] += s.metrics[key] or 0
+        return {
+            "job": self.name,
+            "created_at": self.created_at,
+            "wall_s": max((s.metrics["wall_s"] for s in finished if s.parent is None), default=0.0),
+            "counters": dict(self.counters),
+            "stages": stages,
+            "spans": [s.to_dict(self.origin) for s in finished],
+        }
+
+    def write_report(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.report(), f, indent=4, ensure_ascii=False)
+        return path
+
+    def write_chrome_trace(self, path):
+        """Writes the spans in Chrome trace event format (chrome://tracing, Perfetto)."""
+        pid = os.getpid()
+        events = []
+        for s in self.spans:
+            if not s.metrics:
+                continue
+            events.append({
+                "name": s.name, "ph": "X", "pid": pid, "tid": s.thread,
+                "ts": (s.start["wall"] - self.origin) * 1e6,
+                "dur": s.metrics["wall_s"] * 1e6,
+                "args": {**s.attrs, **{k: v for k, v in s.metrics.items() if v is not None}, **s.counters},
+            })
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+        return path
+
+
+# (tracer, open span) of the current context; (None, None) when nothing is being traced
+_current = contextvars.ContextVar("instrumentation", default=(None, None))
+
+
+@contextmanager
+def span(name, **attrs):
+    """Times the block as a child of the current span. A no-op when no Tracer is active."""
+    tracer, parent = _current.get()
+    if tracer is None:
+        yield None
+        return
+    s = tracer._open(name, parent, attrs)
+    token = _current.set((tracer, s))
+    try:
+        yield s
+    except BaseException as e:
+        s.attrs["error"] = repr(e)
+        raise
+    finally:
+        _current.reset(token)
+        s.finish()
+
+
+def count(name, n=1):
+    """Adds n to counter name on the current span, its ancestors and the tracer."""
+    tracer, s = _current.get()
+    if tracer is not None:
+        tracer._count(s, name, n)
+
+
+def traced(name):
+    """Decorator form of span() for whole functions."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,109 @@
+import json
+import time
+import threading
+from collections import deque
+
+LEVELS = {"DEBUG": 10, "INFO": 20, "WARNING": 30, "ERROR": 40}
+
+# Records waiting for the GUI; when workers outpace the flushes the oldest are dropped
+DEFAULT_CAPACITY = 2000
+DEFAULT_FLUSH_MS = 100
+
+
+def infer_level(message):
+    """Severity for plain logger(msg) calls from core functions, guessed from the text."""
+    lowered = message.lower()
+    if "error" in lowered or "failed" in lowered:
+        return "ERROR"
+    if "warning" in lowered:
+        return "WARNING"
+    return "INFO"
+
+
+class LogBus:
+    """
+    Thread-safe log sink shared by worker threads and the GUI.
+
+    Workers call emit() (or a logger() callable) from any thread; records go into a bounded
+    ring buffer and are never pushed into Tk directly. The GUI drains the buffer on a timer
+    (start_pump), so a burst of messages costs one textbox update per flush instead of one
+    event per line. Every record can also be written to a JSONL file for headless runs.
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, jsonl_path=None, min_level="DEBUG"):
+        self._pending = deque(maxlen=capacity)
+        self._dropped = 0
+        self._lock = threading.Lock()
+        self._file_lock = threading.Lock()
+        self._jsonl = None
+        self.min_level = min_level
+        if jsonl_path:
+            self.open_jsonl(jsonl_path)
+
+    def emit(self, message, level=None, channel="main"):
+        """Queues one record. level defaults to infer_level(message)."""
+        level = level or infer_level(message)
+        if LEVELS.get(level, 20) < LEVELS.get(self.min_level, 10):
+            return
+        record = {"time": time.time(), "level": level, "channel": channel, "message": str(message)}
+        with self._lock:
+            if len(self._pending) == self._pending.maxlen:
+                self._dropped += 1
+            self._pending.append(record)
+        if self._jsonl is not None:
+            with self._file_lock:
+                if self._jsonl is not None:
+                    self._jsonl.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def logger(self, channel="main", level=None):
+        """Returns a logger(msg) callable for core functions that logs to channel."""
+        return lambda message: self.emit(message, level=level, channel=channel)
+
+    def drain(self):
+        """Removes and returns (records, dropped_count) queued since the last drain."""
+        with self._lock:
+            records = list(self._pending)
+            self._pending.clear()
+            dropped, self._dropped = self._dropped, 0
+        return records, dropped
+
+    # --- Sinks ---
+
+    def open_jsonl(self, path):
+        """Appends every following record to path as one JSON object per line."""
+        with self._file_lock:
+            if self._jsonl is not None:
+                self._jsonl.close()
+            self._jsonl = open(path, 'a', encoding='utf-8', buffering=1)
+
+    def close(self):
+        with self._file_lock:
+            if self._jsonl is not None:
+                self._jsonl.close()
+                self._jsonl = None
+
+    def start_pump(self, widget, callback, interval_ms=DEFAULT_FLUSH_MS):
+        """
+        Drains the buffer every interval_ms on widget's event loop and calls
+        callback(records, dropped) with each non-empty batch. Stops when widget is destroyed.
+        """
+        def pump():
+            records, dropped = self.drain()
+            if records or dropped:
+                try:
+                    callback(records, dropped)
+                except Exception as e:
+                    print(f"Log flush error: {e}")
+            try:
+                widget.after(interval_ms, pump)
+            except Exception:
+                pass  # widget destroyed
+
+        widget.after(interval_ms, pump)
+
+
+def format_record(record):
+    """One display line: the message, prefixed with '[channel] ' for job channels."""
+    if record["channel"] == "main":
+        return record["message"]
+    return f"[{record['channel']}] {record['message']}"
@@ -0,0 +1,161 @@
+import os
+import re
+import json
+import math
+import threading
+from core.ffmpeg_runner import run_ffmpeg
+from core.instrumentation import span, count
+
+# Integrated loudness targets in LUFS (config "loudness_target": a name, a number or "off").
+# Normalising costs a loudnorm analysis decode per clip and an AAC re-encode of the speech,
+# which is otherwise stream-copied, so it is off unless chosen.
+LOUDNESS_TARGETS = {
+    "social": -14.0,     # YouTube, TikTok, Instagram, Facebook
+    "podcast": -16.0,
+    "broadcast": -23.0,  # EBU R128
+}
+LOUDNESS_OFF = "off"
+DEFAULT_LOUDNESS_TARGET = LOUDNESS_OFF
+# Reference level for measurements when no target is set
+ANALYSIS_TARGET = LOUDNESS_TARGETS["social"]
+TRUE_PEAK_DB = -1.0
+LOUDNESS_RANGE = 11.0
+# Speech this close to the target (and under the true-peak ceiling) is muxed without re-encoding
+LOUDNESS_TOLERANCE_LU = 1.0
+
+# Sidechain ducking of the music while speech is present
+DUCK_THRESHOLD = 0.03
+DUCK_RATIO = 8
+DUCK_ATTACK_MS = 20
+DUCK_RELEASE_MS = 400
+MASTER_SAMPLE_RATE = 48000
+
+_measurements = {}
+_measurements_lock = threading.Lock()
+
+
+def loudness_target(target=None):
+    """Integrated loudness in LUFS for a target name/number, or None when mastering is off."""
+    if target is None:
+        from core.utils import load_config
+
+        target = load_config().get("loudness_target", DEFAULT_LOUDNESS_TARGET)
+    if target in (False, None, LOUDNESS_OFF, "none"):
+        return None
+    if isinstance(target, str):
+        try:
+            return float(target)
+        except ValueError:
+            pass
+        if target not in LOUDNESS_TARGETS:
+            print(f"Unknown loudness target '{target}', normalisation off")
+        return LOUDNESS_TARGETS.get(target)
+    return float(target)
+
+
+def _parse_loudnorm(stderr):
+    """The JSON block loudnorm prints at the end of an analysis run."""
+    blocks = re.findall(r'\{[^{}]*"input_i"[^{}]*\}', stderr)
+    if not blocks:
+        return None
+    data = json.loads(blocks[-1])
+    values = {key: float(data[key]) for key in ("input_i", "input_tp", "input_lra", "input_thresh", "target_offset")}
+    if not all(math.isfinite(v) for v in values.values()):
+        return None  # silence
+    return values
+
+
+def measure_loudness(path, target=None):
+    """
+    EBU R128 loudness of an audio (or video) file: input_i (LUFS), input_tp (dBTP), input_lra,
+    input_thresh and target_offset from a loudnorm analysis pass, as needed by loudnorm_filter().
+    Memoised per file (path, size, mtime) and target. Returns None for silent or unreadable input.
+    """
+    target = target if target is not None else ANALYSIS_TARGET
+    stat = os.stat(path)
+    key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns, target)
+    with _measurements_lock:
+        if key in _measurements:
+            count("loudness_hits")
+            return _measurements[key]
+
+    count("loudness_misses")
+    with span("loudness.measure", file=os.path.basename(path)):
+        cmd = [
+            'ffmpeg', '-hide_banner', '-nostats', '-i', path, '-vn',
+            '-af', f'loudnorm=I={target}:TP={TRUE_PEAK_DB}:LRA={LOUDNESS_RANGE}:print_format=json',
+            '-f', 'null', '-'
+        ]
+        result = run_ffmpeg(cmd)
+    measurement = _parse_loudnorm(result.stderr) if result.returncode == 0 else None
+    if result.returncode != 0:
+        print(f"Loudness analysis failed for {path}: {result.stderr[-500:]}")
+
+    with _measurements_lock:
+        _measurements[key] = measurement
+    return measurement
+
+
+def needs_normalization(measurement, target):
+    return (abs(measurement["input_i"] - target) > LOUDNESS_TOLERANCE_LU
+            or measurement["input_tp"] > TRUE_PEAK_DB)
+
+
+def loudnorm_filter(measurement, target):
+    """Second-pass loudnorm using a measure_loudness() result (linear gain when the peaks allow it)."""
+    return (
+        f"loudnorm=I={target}:TP={TRUE_PEAK_DB}:LRA={LOUDNESS_RANGE}"
+        f":measured_I={measurement['input_i']}:measured_TP={measurement['input_tp']}"
+        f":measured_LRA={measurement['input_lra']}:measured_thresh={measurement['input_thresh']}"
+        f":offset={measurement['target_offset']}:linear=true,aresample={MASTER_SAMPLE_RATE}"
+    )
+
+
+def mastering_graph(speech_input, music_input=None, music_volume=0.15, target=None, out_label="aout"):
+    """
+    filter_complex for the final mux: speech normalised to target (two-pass loudnorm with cached
+    measurements) and, with music, the music bed levelled against the same target, ducked under
+    the speech with sidechaincompress and mixed without amix's level halving.
+    With mastering off, music is still ducked and mixed at music_volume.
+
+    speech_input / music_input: (stream specifier like "1:a" or a filter label, file path) pairs.
+    Intermediate labels are prefixed with out_label, so several graphs can share one filter_complex.
+    Returns the filter string producing [out_label], or None when the speech needs no processing
+    (no music and already on target), so the caller can stream-copy it. With music the output is
+    endless (looped music), so the caller limits it with -t.
+    """
+    target = loudness_target(target)
+    speech_spec, speech_path = speech_input
+    speech = measure_loudness(speech_path, target) if target is not None else None
+
+    if speech is not None and needs_normalization(speech, target):
+        speech_chain = f"[{speech_spec}]{loudnorm_filter(speech, target)}"
+    elif music_input is None:
+        return None
+    else:
+        speech_chain = f"[{speech_spec}]aresample={MASTER_SAMPLE_RATE}"
+
+    if music_input is None:
+        return f"{speech_chain}[{out_label}]"
+
+    music_spec, music_path = music_input
+    music = measure_loudness(music_path, target) if target is not None else None
+    if music is not None:
+        # music_volume=1.0 puts the bed at the target before ducking, whatever the track's own mastering
+        gain_db = target - music["input_i"] + 20 * math.log10(max(music_volume, 1e-3))
+        music_gain = f"volume={gain_db:.2f}dB"
+    else:
+        music_gain = f"volume={music_volume}"
+
+    label = out_label
+    return (
+        # Speech is padded with silence: sidechaincompress stops at the end of either input, and with
+        # both amix inputs endless its scaling stays a constant 1/2 (undone by volume=2). That works on
+        # every ffmpeg version, unlike amix's normalize option (5.1+).
+        f"{speech_chain},apad,asplit=2[{label}_speech][{label}_sidechain];"
+        f"[{music_spec}]{music_gain},aresample={MASTER_SAMPLE_RATE}[{label}_music];"
+        f"[{label}_music][{label}_sidechain]sidechaincompress=threshold={DUCK_THRESHOLD}:ratio={DUCK_RATIO}"
+        f":attack={DUCK_ATTACK_MS}:release={DUCK_RELEASE_MS}[{label}_ducked];"
+        f"[{label}_speech][{label}_ducked]amix=inputs=2:duration=longest,volume=2,"
+        f"alimiter=limit={10 ** (TRUE_PEAK_DB / 20):.3f}:level=false[{out_label}]"
+    )
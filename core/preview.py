@@ -0,0 +1,263 @@
+import os
+import io
+import atexit
+import json
+import shutil
+import threading
+import subprocess
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from PIL import Image, ImageOps
+from core.scratch import get_session_scratch
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp')
+
+# Proxy clips are this tall, with a short GOP so any preview seek decodes only a few frames
+PROXY_HEIGHT = 640
+PROXY_GOP = 15
+THUMBNAIL_HEIGHT = 160
+
+
+class PreviewService:
+    """
+    Shared source of preview frames for the editor dialogs.
+
+    Per source video it builds, once and in the background (warm()):
+      - a low-resolution, short-GOP proxy clip for fast preview seeks
+      - the list of keyframe timestamps (from packet flags, no decoding)
+      - a thumbnail strip of evenly spaced keyframes
+    Decoded frames and scaled previews are kept in an LRU memory cache, so repeated
+    requests (dialog reopen, canvas resize, dragging) never go back to ffmpeg.
+    Frames are decoded through a pipe; nothing is written to temp_frame.jpg-style files.
+    """
+
+    def __init__(self, cache_size=48, proxy_height=PROXY_HEIGHT, thumbnail_count=12, max_workers=2):
+        self.cache_size = cache_size
+        self.proxy_height = proxy_height
+        self.thumbnail_count = thumbnail_count
+        self._frames = OrderedDict()
+        self._sources = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._cache_dir = None
+
+    # --- Source bookkeeping ---
+
+    def _source_key(self, path):
+        path = os.path.abspath(path)
+        return (path, os.path.getmtime(path))
+
+    def _source(self, path):
+        """Returns the per-source info dict (probed on first use)."""
+        key = self._source_key(path)
+        with self._lock:
+            source = self._sources.get(key)
+            if source is None:
+                source = {"path": key[0], "proxy": None, "keyframes": None, "thumbnails": [],
+                          "future": None, "duration": None, "width": None, "height": None}
+                self._sources[key] = source
+        if source["duration"] is None and not is_image(path):
+            self._probe(source)
+        return source
+
+    def _probe(self, source):
+        cmd = ['ffprobe', '-v', 'quiet', '-print_format', 'json', '-show_format', '-show_streams',
+               '-select_streams', 'v:0', source["path"]]
+        result = subprocess.run(cmd, capture_output=True, text=True)
+        if result.returncode != 0:
+            return
+        data = json.loads(result.stdout)
+        source["duration"] = float(data.get('format', {}).get('duration', 0) or 0)
+        if data.get('streams'):
+            source["width"] = int(data['streams'][0]['width'])
+            source["height"] = int(data['streams'][0]['height'])
+
+    def _work_dir(self):
+        with self._lock:
+            if self._cache_dir is None:
+                self._cache_dir = get_session_scratch().mkdir("preview")
+            return self._cache_dir
+
+    # --- Background preparation ---
+
+    def warm(self, path):
+        """
+        Starts building the proxy, keyframe index and thumbnail strip for path in the background.
+        Safe to call repeatedly; returns the Future of the preparation (None for images).
+        """
+        if not path or not os.path.exists(path) or is_image(path):
+            return None
+        source = self._source(path)
+        with self._lock:
+            if source["future"] is None:
+                source["future"] = self._executor.submit(self._prepare, source)
+            return source["future"]
+
+    def _prepare(self, source):
+        try:
+            source["keyframes"] = self._read_keyframes(source["path"])
+            proxy_path = os.path.join(self._work_dir(), f"proxy_{abs(hash(source['path'])):x}.mp4")
+            cmd = [
+                'ffmpeg', '-y', '-i', source["path"],
+                '-vf', f'scale=-2:{self.proxy_height}',
+                '-c:v', 'libx264', '-preset', 'ultrafast', '-crf', '28', '-g', str(PROXY_GOP),
+                '-an', proxy_path
+            ]
+            result = subprocess.run(cmd, capture_output=True, text=True)
+            if result.returncode == 0:
+                source["proxy"] = proxy_path
+            else:
+                print(f"Preview proxy error: {result.stderr[-500:]}")
+            source["thumbnails"] = self._build_thumbnails(source)
+        except Exception as e:
+            print(f"Preview preparation error: {e}")
+
+    def _read_keyframes(self, path):
+        """Keyframe timestamps from packet flags (no decoding)."""
+        cmd = ['ffprobe', '-v', 'quiet', '-select_streams', 'v:0',
+               '-show_entries', 'packet=pts_time,flags', '-of', 'csv=print_section=0', path]
+        result = subprocess.run(cmd, capture_output=True, text=True)
+        times = []
+        for line in result.stdout.splitlines():
+            parts = line.split(',')
+            if len(parts) >= 2 and 'K' in parts[1]:
+                try:
+                    times.append(float(parts[0]))
+                except ValueError:
+                    pass
+        return sorted(times)
+
+    def _build_thumbnails(self, source):
+        keyframes = source["keyframes"] or []
+        if not keyframes:
+            return []
+        step = max(1, len(keyframes) // self.thumbnail_count)
+        thumbnails = []
+        for t in keyframes[::step][:self.thumbnail_count]:
+            frame = self.get_frame(source["path"], time=t)
+            if frame is not None:
+                thumb = frame.copy()
+                thumb.thumbnail((THUMBNAIL_HEIGHT * 4, THUMBNAIL_HEIGHT), Image.Resampling.LANCZOS)
+                thumbnails.append((t, thumb))
+        return thumbnails
+
+    # --- Queries ---
+
+    def duration(self, path):
+        return 0.0 if is_image(path) else (self._source(path)["duration"] or 0.0)
+
+    def keyframe_times(self, path):
+        """Keyframe timestamps once warm() has indexed the source, else []."""
+        if is_image(path):
+            return []
+        return list(self._source(path)["keyframes"] or [])
+
+    def thumbnails(self, path):
+        """[(time, PIL thumbnail)] once warm() has finished, else []."""
+        if is_image(path):
+            return []
+        return list(self._source(path)["thumbnails"])
+
+    def get_frame(self, path, time=None, time_ratio=0.5, full_res=False):
+        """
+        Returns the RGB frame of path at time (seconds) or time_ratio of the duration.
+        Images are returned as-is. Unless full_res is set, video frames come from the proxy
+        when it is ready. Returns None if the frame cannot be decoded.
+        """
+        if is_image(path):
+            key = (self._source_key(path), 'image')
+            return self._cached(key, lambda: _open_rgb(path))
+
+        source = self._source(path)
+        if time is None:
+            time = (source["duration"] or 0) * time_ratio
+        if source["duration"]:
+            time = max(0.0, min(time, source["duration"] - 0.05))
+
+        use_proxy = source["proxy"] is not None and not full_res
+        key = (self._source_key(path), round(time, 3), 'proxy' if use_proxy else 'full')
+        return self._cached(key, lambda: _decode_frame(source["proxy"] if use_proxy else source["path"], time))
+
+    def get_canvas_frame(self, path, width, height, fit="pad", **frame_args):
+        """
+        get_frame() fitted to a width x height canvas:
+        fit="pad" letterboxes (like scale=force_original_aspect_ratio=decrease,pad), "stretch" resizes.
+        """
+        key_args = tuple(sorted(frame_args.items()))
+        frame = self.get_frame(path, **frame_args)
+        if frame is None:
+            return None
+        key = (self._source_key(path), 'canvas', width, height, fit, key_args, frame.size)
+        return self._cached(key, lambda: _fit(frame, width, height, fit))
+
+    def request_frame(self, callback, path, **frame_args):
+        """Decodes get_frame(path, **frame_args) on a worker thread and calls callback(frame) there."""
+        return self._executor.submit(lambda: callback(self.get_frame(path, **frame_args)))
+
+    # --- Cache ---
+
+    def _cached(self, key, produce):
+        with self._lock:
+            if key in self._frames:
+                self._frames.move_to_end(key)
+                return self._frames[key]
+        value = produce()
+        if value is not None:
+            with self._lock:
+                self._frames[key] = value
+                self._frames.move_to_end(key)
+                while len(self._frames) > self.cache_size:
+                    self._frames.popitem(last=False)
+        return value
+
+    def close(self):
+        """Stops background work and removes proxy files."""
+        self._executor.shutdown(wait=False)
+        if self._cache_dir:
+            shutil.rmtree(self._cache_dir, ignore_errors=True)
+
+
+def is_image(path):
+    return path.lower().endswith(IMAGE_EXTENSIONS)
+
+
+def _open_rgb(path):
+    try:
+        with Image.open(path) as img:
+            return img.convert("RGB")
+    except Exception as e:
+        print(f"Preview error: {e}")
+        return None
+
+
+def _decode_frame(video_path, time):
+    """Decodes one frame at time through a pipe (BMP: no compression on either side)."""
+    cmd = [
+        'ffmpeg', '-v', 'error', '-ss', f'{time:.3f}', '-i', video_path,
+        '-frames:v', '1', '-f', 'image2pipe', '-c:v', 'bmp', '-pix_fmt', 'bgr24', 'pipe:1'
+    ]
+    result = subprocess.run(cmd, capture_output=True)
+    if result.returncode != 0 or not result.stdout:
+        print(f"Preview frame error: {result.stderr.decode('utf8', errors='replace')[-500:]}")
+        return None
+    return Image.open(io.BytesIO(result.stdout)).convert("RGB")
+
+
+def _fit(frame, width, height, fit):
+    if fit == "stretch":
+        return frame.resize((width, height), Image.Resampling.LANCZOS)
+    return ImageOps.pad(frame, (width, height), method=Image.Resampling.LANCZOS, color=(0, 0, 0))
+
+
+_preview_service = None
+_preview_service_lock = threading.Lock()
+
+
+def get_preview_service():
+    """Process-wide PreviewService shared by all windows."""
+    global _preview_service
+    with _preview_service_lock:
+        if _preview_service is None:
+            _preview_service = PreviewService()
+            atexit.register(_preview_service.close)
+        return _preview_service
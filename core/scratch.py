@@ -0,0 +1,185 @@
+import os
+import atexit
+import shutil
+import tempfile
+import threading
+import contextvars
+from contextlib import contextmanager
+
+# Small, frequently re-read intermediates (WAV, SRT/ASS, PNG sprites, preview frames) go to tmpfs
+TMPFS_ROOT = "/dev/shm"
+# Per-job tmpfs budget; once used up, small files fall back to the disk root
+TMPFS_LIMIT_BYTES = 256 * 1024 * 1024
+# Disk space left free for the rest of the system when checking the quota
+MIN_FREE_DISK_BYTES = 512 * 1024 * 1024
+
+
+class ScratchQuotaError(OSError):
+    """Raised when a job's scratch files exceed its quota or the scratch disk is nearly full."""
+
+
+def _dir_size(path):
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+def _usable_tmpfs(root):
+    return bool(root) and os.path.isdir(root) and os.access(root, os.W_OK)
+
+
+class ScratchSpace:
+    """
+    Private working directories for one job.
+
+    path(".wav") returns a fresh, never-reused file name for a small intermediate
+    (on tmpfs when available), path(".mp4", large=True) one on the disk root (config "scratch_dir",
+    default: the system temp dir). Both directories are created lazily and removed by cleanup(),
+    which runs on exit of `with ScratchSpace(...)`, whether the job succeeded, failed or was cancelled.
+
+    quota_bytes limits the disk usage of the job; it is checked whenever a large path is handed out.
+    """
+
+    def __init__(self, name="job", disk_root=None, tmpfs_root=TMPFS_ROOT, quota_bytes=None,
+                 tmpfs_limit=TMPFS_LIMIT_BYTES, parent=None):
+        self.name = name
+        self.parent = parent
+        self.disk_root = disk_root
+        self.tmpfs_root = tmpfs_root if _usable_tmpfs(tmpfs_root) else None
+        self.quota_bytes = quota_bytes
+        self.tmpfs_limit = tmpfs_limit
+        self._dirs = {}
+        self._counter = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, name="job"):
+        from core.utils import load_config
+
+        config = load_config()
+        quota_gb = config.get("scratch_quota_gb")
+        return cls(
+            name,
+            disk_root=config.get("scratch_dir") or None,
+            tmpfs_root=TMPFS_ROOT if config.get("scratch_tmpfs", True) else None,
+            quota_bytes=int(quota_gb * 1024 ** 3) if quota_gb else None,
+        )
+
+    def child(self, name):
+        """A sub-space inside this one (same roots, counted against the same quota)."""
+        return ScratchSpace(name, tmpfs_root=self.tmpfs_root, tmpfs_limit=self.tmpfs_limit, parent=self)
+
+    def _root(self):
+        return self.parent._root() if self.parent else self
+
+    def _dir(self, kind):
+        with self._lock:
+            if kind not in self._dirs:
+                if self.parent:
+                    base = self.parent._dir(kind)
+                else:
+                    base = self.tmpfs_root if kind == "tmpfs" else self.disk_root
+                    if base:
+                        os.makedirs(base, exist_ok=True)
+                self._dirs[kind] = tempfile.mkdtemp(prefix=f"{self.name}_", dir=base)
+            return self._dirs[kind]
+
+    def _tmpfs_available(self):
+        if not self.tmpfs_root:
+            return False
+        root = self._root()
+        if "tmpfs" in root._dirs and _dir_size(root._dirs["tmpfs"]) >= self.tmpfs_limit:
+            return False
+        return shutil.disk_usage(self.tmpfs_root).free > self.tmpfs_limit
+
+    def usage(self):
+        """Bytes currently used on the scratch disk by this space and its children."""
+        return _dir_size(self._dirs["disk"]) if "disk" in self._dirs else 0
+
+    def check_quota(self):
+        """Raises ScratchQuotaError if the job is over quota or the scratch disk is nearly full."""
+        root = self._root()
+        if root.quota_bytes is not None:
+            used = root.usage()
+            if used > root.quota_bytes:
+                raise ScratchQuotaError(f"Scratch quota exceeded: {used / 1024 ** 2:.0f} MB used, "
+                                        f"limit {root.quota_bytes / 1024 ** 2:.0f} MB")
+        free = shutil.disk_usage(self._dir("disk")).free
+        if free < MIN_FREE_DISK_BYTES:
+            raise ScratchQuotaError(f"Scratch disk nearly full: {free / 1024 ** 2:.0f} MB free")
+
+    def path(self, suffix="", large=False, prefix="tmp"):
+        """A new unique file path; the file itself is not created."""
+        if large:
+            self.check_quota()
+        kind = "tmpfs" if not large and self._tmpfs_available() else "disk"
+        directory = self._dir(kind)
+        with self._lock:
+            self._counter += 1
+            index = self._counter
+        return os.path.join(directory, f"{prefix}_{index:04d}{suffix}")
+
+    def mkdir(self, prefix="dir", large=True):
+        """A new empty directory (for numbered clip or sprite sets)."""
+        path = self.path(prefix=prefix, large=large)
+        os.makedirs(path)
+        return path
+
+    def cleanup(self):
+        with self._lock:
+            dirs, self._dirs = list(self._dirs.values()), {}
+        for directory in dirs:
+            shutil.rmtree(directory, ignore_errors=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cleanup()
+
+
+# ScratchSpace of the job running in the current context; see scratch_job()
+_current_scratch = contextvars.ContextVar("scratch", default=None)
+
+
+@contextmanager
+def scratch_job(name="job"):
+    """
+    Gives the block (and pool workers started with ffmpeg_runner.submit_in_context) one
+    ScratchSpace configured from config.json, removed when the block exits.
+    """
+    space = ScratchSpace.from_config(name)
+    token = _current_scratch.set(space)
+    try:
+        yield space
+    finally:
+        _current_scratch.reset(token)
+        space.cleanup()
+
+
+def scratch_space(name):
+    """
+    Scratch directories for one function call: a child of the current scratch_job, or a standalone
+    space when none is active. Use as `with scratch_space(...) as scratch:` or call cleanup() in a finally.
+    """
+    job = _current_scratch.get()
+    return job.child(name) if job is not None else ScratchSpace.from_config(name)
+
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session_scratch():
+    """Process-wide ScratchSpace for interactive previews; removed when the app exits."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = ScratchSpace.from_config("session")
+            atexit.register(_session.cleanup)
+        return _session
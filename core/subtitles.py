@@ -1,6 +1,9 @@
 import os
-from faster_whisper import WhisperModel
+import time
 import datetime
+import threading
+from core.instrumentation import span, traced
+from core.ffmpeg_runner import iter_ffmpeg_output, FFmpegError, submit_in_context
 
 def format_timestamp(seconds):
     """Converts seconds to SRT timestamp format (HH:MM:SS,mmm)"""
@@ -13,54 +16,281 @@ def format_timestamp(seconds):
     milliseconds = int(td.microseconds / 1000)
     return f"{hours:02d}:{minutes:02d}:{seconds:02d},{milliseconds:03d}"
 
-def generate_subtitles(audio_path, language=None, mode='sentence', model_size="tiny"):
+# faster-whisper takes 16 kHz mono float32 samples
+WHISPER_SAMPLE_RATE = 16000
+
+# Chunk length for generate_subtitles(chunk_seconds=...) on long videos: bounds decoded audio to ~40 MB
+WHISPER_CHUNK_SECONDS = 600
+
+# Chunks end at the quietest 30 ms frame within their last few seconds, so words are rarely split
+CHUNK_SPLIT_SEARCH_SECONDS = 5.0
+CHUNK_SPLIT_FRAME_SECONDS = 0.03
+
+def _audio_decode_cmd(source, sample_rate):
+    return ['ffmpeg', '-nostdin', '-v', 'error', '-i', source, '-vn', '-ac', '1', '-ar', str(sample_rate),
+            '-f', 's16le', 'pipe:1']
+
+def _pcm_to_float(pcm):
+    import numpy as np
+
+    return np.frombuffer(pcm, dtype=np.int16, count=len(pcm) // 2).astype(np.float32) / 32768.0
+
+@traced("decode_audio")
+def load_audio(source, sample_rate=WHISPER_SAMPLE_RATE):
     """
-    Generates subtitles from audio using Whisper.
-    mode: 'sentence' or 'word'
+    Decodes the audio track of any media file to mono float32 samples through an ffmpeg pipe,
+    without writing a WAV file. Returns a NumPy array, or None on failure.
     """
+    pcm = bytearray()
     try:
-        # Run on CPU for compatibility, or cuda if available
-        # model = WhisperModel(model_size, device="cuda", compute_type="float16")
-        model = WhisperModel(model_size, device="cpu", compute_type="int8")
+        for data in iter_ffmpeg_output(_audio_decode_cmd(source, sample_rate)):
+            pcm += data
+    except FFmpegError as e:
+        print(f"Error decoding audio from {source}: {e}")
+        return None
+    return _pcm_to_float(pcm)
 
-        segments, info = model.transcribe(audio_path, word_timestamps=(mode == 'word'), language=language)
-        
-        subtitles = []
+def _quiet_split(samples, sample_rate):
+    """Index just after the quietest frame in the last CHUNK_SPLIT_SEARCH_SECONDS of samples."""
+    import numpy as np
+
+    frame = max(1, int(CHUNK_SPLIT_FRAME_SECONDS * sample_rate))
+    search = min(len(samples) // 2, int(CHUNK_SPLIT_SEARCH_SECONDS * sample_rate))
+    frames = search // frame
+    if frames < 2:
+        return len(samples)
+    start = len(samples) - frames * frame
+    energy = np.square(samples[start:]).reshape(frames, frame).mean(axis=1)
+    return start + (int(np.argmin(energy)) + 1) * frame
+
+def iter_audio_chunks(source, chunk_seconds=WHISPER_CHUNK_SECONDS, sample_rate=WHISPER_SAMPLE_RATE):
+    """
+    Like load_audio, but yields (offset_seconds, samples) pieces of at most chunk_seconds while
+    ffmpeg is still decoding, so memory stays bounded however long the input is.
+    Raises FFmpegError on failure.
+    """
+    chunk_bytes = int(chunk_seconds * sample_rate) * 2
+    pending = bytearray()
+    offset = 0
+    for data in iter_ffmpeg_output(_audio_decode_cmd(source, sample_rate)):
+        pending += data
+        while len(pending) >= chunk_bytes:
+            samples = _pcm_to_float(pending[:chunk_bytes])
+            cut = _quiet_split(samples, sample_rate)
+            yield offset / sample_rate, samples[:cut]
+            del pending[:cut * 2]
+            offset += cut
+    if len(pending) >= 2:
+        yield offset / sample_rate, _pcm_to_float(pending)
+
+_whisper_models = {}
+_whisper_models_lock = threading.Lock()
+
+def get_whisper_model(model_size, cpu_threads=0, num_workers=1):
+    """
+    Cached CPU WhisperModel; loading takes seconds, so repeated transcriptions share one.
+    num_workers > 1 lets that many threads run transcribe() on it in parallel.
+    """
+    # Imported here: faster_whisper pulls in ctranslate2/onnxruntime, far too heavy for app startup
+    from faster_whisper import WhisperModel
+
+    key = (model_size, cpu_threads, num_workers)
+    with _whisper_models_lock:
+        if key not in _whisper_models:
+            # Run on CPU for compatibility, or cuda if available
+            # model = WhisperModel(model_size, device="cuda", compute_type="float16")
+            with span("whisper.load_model", model=model_size):
+                _whisper_models[key] = WhisperModel(model_size, device="cpu", compute_type="int8",
+                                                    cpu_threads=cpu_threads, num_workers=num_workers)
+        return _whisper_models[key]
+
+def _collect_segments(segments, offset, mode, subtitles, words):
+    """
+    Appends transcribed segments (or, in word mode, their words) shifted by offset seconds.
+    In 'full' mode each segment keeps its words under "words".
+    """
+    for segment in segments:
+        segment_words = [{
+            "start": word.start + offset,
+            "end": word.end + offset,
+            "text": word.word.strip()
+        } for word in (segment.words or [])] if mode != 'sentence' else []
         if mode == 'word':
             # Flatten word segments
-            all_words = []
-            for segment in segments:
-                for word in segment.words:
-                    all_words.append({
-                        "start": word.start,
-                        "end": word.end,
-                        "text": word.word.strip()
-                    })
-            
-            # Adjust end times to prevent overlapping subtitles
-            # Each word's end time should not exceed the next word's start time
-            for i in range(len(all_words)):
-                if i < len(all_words) - 1:
-                    # End this word slightly before the next word starts (50ms gap)
-                    next_start = all_words[i + 1]["start"]
-                    gap = 0.05  # 50ms gap between words
-                    if all_words[i]["end"] > next_start - gap:
-                        all_words[i]["end"] = max(all_words[i]["start"] + 0.1, next_start - gap)
-                subtitles.append(all_words[i])
+            words.extend(segment_words)
         else:
             # Use full segments
-            for segment in segments:
-                subtitles.append({
-                    "start": segment.start,
-                    "end": segment.end,
-                    "text": segment.text.strip()
-                })
+            subtitle = {
+                "start": segment.start + offset,
+                "end": segment.end + offset,
+                "text": segment.text.strip()
+            }
+            if mode == 'full':
+                subtitle["words"] = segment_words
+            subtitles.append(subtitle)
+
+def separate_words(all_words):
+    """Word-mode subtitles from flattened words, with end times trimmed so words never overlap."""
+    subtitles = []
+    # Each word's end time should not exceed the next word's start time
+    for i in range(len(all_words)):
+        if i < len(all_words) - 1:
+            # End this word slightly before the next word starts (50ms gap)
+            next_start = all_words[i + 1]["start"]
+            gap = 0.05  # 50ms gap between words
+            if all_words[i]["end"] > next_start - gap:
+                all_words[i]["end"] = max(all_words[i]["start"] + 0.1, next_start - gap)
+        subtitles.append(all_words[i])
+    return subtitles
+
+@traced("whisper")
+def generate_subtitles(audio, language=None, mode='sentence', model_size="tiny", chunk_seconds=None):
+    """
+    Generates subtitles from audio using Whisper.
+    audio: path of any audio/video file (decoded through an ffmpeg pipe, see load_audio),
+           or 16 kHz mono float32 samples
+    mode: 'sentence', 'word', or 'full' (sentence segments each with their "words")
+    chunk_seconds: for paths, transcribe in pieces of this length (see iter_audio_chunks)
+    For long videos see generate_subtitles_long; to reuse results see core.transcripts.
+    """
+    try:
+        model = get_whisper_model(model_size)
+
+        if not isinstance(audio, str):
+            chunks = [(0.0, audio)]
+        elif chunk_seconds:
+            chunks = iter_audio_chunks(audio, chunk_seconds)
+        else:
+            samples = load_audio(audio)
+            if samples is None:
+                return []
+            chunks = [(0.0, samples)]
+
+        subtitles = []
+        words = []
+        for offset, samples in chunks:
+            segments, info = model.transcribe(samples, word_timestamps=(mode != 'sentence'), language=language)
+            # Later chunks keep the language detected on the first one
+            language = language or info.language
+            _collect_segments(segments, offset, mode, subtitles, words)
         
-        return subtitles
+        return separate_words(words) if mode == 'word' else subtitles
     except Exception as e:
         print(f"Error generating subtitles: {e}")
         return []
 
+# Long-form transcription: speech found by VAD is grouped into chunks of at most this length
+LONG_FORM_CHUNK_SECONDS = 90
+# Silence kept around each chunk so Whisper sees word onsets/offsets
+VAD_PAD_SECONDS = 0.2
+# Pauses shorter than this do not end a speech region
+VAD_MIN_SILENCE_MS = 500
+
+def transcription_workers(workers=None):
+    """
+    (workers, cpu_threads) for generate_subtitles_long: config.json "whisper_workers" and
+    "whisper_cpu_threads", else about 4 threads per worker across all cores.
+    """
+    from core.utils import load_config
+
+    config = load_config()
+    cpus = os.cpu_count() or 1
+    workers = int(workers or config.get("whisper_workers") or max(1, cpus // 4))
+    cpu_threads = int(config.get("whisper_cpu_threads") or max(1, cpus // workers))
+    return workers, cpu_threads
+
+def speech_chunks(samples, sample_rate=WHISPER_SAMPLE_RATE, max_seconds=LONG_FORM_CHUNK_SECONDS):
+    """
+    (start, end) sample ranges covering the speech in samples, split only at silences found by
+    the Silero VAD bundled with faster-whisper, each at most max_seconds unless one utterance is longer.
+    """
+    from faster_whisper.vad import VadOptions, get_speech_timestamps
+
+    regions = get_speech_timestamps(samples, VadOptions(min_silence_duration_ms=VAD_MIN_SILENCE_MS))
+    pad = int(VAD_PAD_SECONDS * sample_rate)
+    limit = int(max_seconds * sample_rate)
+    chunks = []
+    for region in regions:
+        start, end = max(0, region["start"] - pad), min(len(samples), region["end"] + pad)
+        if chunks and end - chunks[-1][0] <= limit:
+            chunks[-1][1] = end
+        else:
+            chunks.append([start, end])
+    return [tuple(c) for c in chunks]
+
+def generate_subtitles_long(source, language=None, mode='sentence', model_size="base", workers=None,
+                            cpu_threads=None, chunk_seconds=LONG_FORM_CHUNK_SECONDS, logger=None):
+    """
+    Long-form variant of generate_subtitles for hour-long videos.
+
+    The audio is decoded through a pipe in bounded pieces (iter_audio_chunks), silence is dropped with
+    VAD (speech_chunks) and the speech chunks are transcribed concurrently by `workers` threads sharing
+    one model, each using `cpu_threads` cores (defaults: transcription_workers()). Timestamps are shifted
+    back to global time. Throughput (audio seconds per wall second) is logged and recorded on the
+    "whisper.long_form" span so the worker count can be sized to the machine.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    def log(msg):
+        if logger:
+            logger(msg)
+        print(msg)
+
+    workers, default_threads = transcription_workers(workers)
+    cpu_threads = cpu_threads or default_threads
+
+    with span("whisper.long_form", model=model_size, workers=workers, cpu_threads=cpu_threads) as s:
+        started = time.perf_counter()
+        try:
+            model = get_whisper_model(model_size, cpu_threads=cpu_threads, num_workers=workers)
+
+            def transcribe(samples, offset, language):
+                segments, info = model.transcribe(samples, word_timestamps=(mode != 'sentence'),
+                                                  language=language, vad_filter=False)
+                subtitles, words = [], []
+                # Segments are a lazy generator: consume them on the worker thread
+                _collect_segments(segments, offset, mode, subtitles, words)
+                return subtitles, words, info.language
+
+            audio_samples = 0
+            speech_samples = 0
+            results = []
+            pending = []
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                for piece_offset, piece in iter_audio_chunks(source):
+                    audio_samples += len(piece)
+                    for start, end in speech_chunks(piece, max_seconds=chunk_seconds):
+                        speech_samples += end - start
+                        offset = piece_offset + start / WHISPER_SAMPLE_RATE
+                        if language is None:
+                            # Detect once on the first chunk so every chunk uses the same language
+                            results.append(transcribe(piece[start:end], offset, None))
+                            language = results[-1][2]
+                            continue
+                        pending.append(submit_in_context(executor, transcribe, piece[start:end], offset, language))
+                        # Bound the audio held by queued chunks
+                        while len(pending) > workers * 2:
+                            results.append(pending.pop(0).result())
+                results.extend(f.result() for f in pending)
+
+            subtitles = sorted((sub for r in results for sub in r[0]), key=lambda sub: sub["start"])
+            words = sorted((word for r in results for word in r[1]), key=lambda word: word["start"])
+        except Exception as e:
+            log(f"Error generating subtitles: {e}")
+            return []
+
+        wall = time.perf_counter() - started
+        audio_seconds = audio_samples / WHISPER_SAMPLE_RATE
+        speech_seconds = speech_samples / WHISPER_SAMPLE_RATE
+        throughput = audio_seconds / wall if wall > 0 else 0.0
+        log(f"Transcribed {audio_seconds:.0f}s of audio ({speech_seconds:.0f}s speech) in {wall:.1f}s: "
+            f"{throughput:.1f} audio-s/s with {workers} worker(s) x {cpu_threads} thread(s)")
+        if s is not None:
+            s.attrs.update(audio_seconds=audio_seconds, speech_seconds=speech_seconds,
+                           audio_seconds_per_second=throughput)
+
+        return separate_words(words) if mode == 'word' else subtitles
+
 def save_srt(subtitles, output_path):
     with open(output_path, 'w', encoding='utf-8') as f:
         for i, sub in enumerate(subtitles, 1):
@@ -71,3 +301,186 @@ def save_srt(subtitles, output_path):
             f.write(f"{start} --> {end}\n")
             f.write(f"{text}\n\n")
     return output_path
+
+def parse_timestamp(timestamp):
+    """Converts an SRT timestamp (HH:MM:SS,mmm) back to seconds"""
+    hms, _, ms = timestamp.strip().replace('.', ',').partition(',')
+    hours, minutes, seconds = (int(p) for p in hms.split(':'))
+    return hours * 3600 + minutes * 60 + seconds + int(ms or 0) / 1000.0
+
+def load_srt(srt_path):
+    """Reads an SRT file back into the [{'start', 'end', 'text'}] list format used by save_srt."""
+    with open(srt_path, 'r', encoding='utf-8') as f:
+        blocks = f.read().replace('\r\n', '\n').strip().split('\n\n')
+
+    subtitles = []
+    for block in blocks:
+        lines = [line for line in block.split('\n') if line.strip()]
+        timing_index = next((i for i, line in enumerate(lines) if '-->' in line), None)
+        if timing_index is None:
+            continue
+        start, end = lines[timing_index].split('-->')
+        subtitles.append({
+            "start": parse_timestamp(start),
+            "end": parse_timestamp(end),
+            "text": "\n".join(lines[timing_index + 1:]).strip()
+        })
+    return subtitles
+
+# ASS script resolution. Matches the header ffmpeg generates when it converts SRT for the
+# subtitles filter, so Fontsize/MarginV keep the same meaning in both formats.
+ASS_PLAY_RES_X = 384
+ASS_PLAY_RES_Y = 288
+
+ASS_STYLE_FORMAT = [
+    "Name", "Fontname", "Fontsize", "PrimaryColour", "SecondaryColour", "OutlineColour", "BackColour",
+    "Bold", "Italic", "Underline", "StrikeOut", "ScaleX", "ScaleY", "Spacing", "Angle",
+    "BorderStyle", "Outline", "Shadow", "Alignment", "MarginL", "MarginR", "MarginV", "Encoding"
+]
+
+ASS_STYLE_DEFAULTS = {
+    "Name": "Default", "Fontname": "Arial", "Fontsize": "16",
+    "PrimaryColour": "&H00FFFFFF", "SecondaryColour": "&H00FFFFFF",
+    "OutlineColour": "&H00000000", "BackColour": "&H00000000",
+    "Bold": "0", "Italic": "0", "Underline": "0", "StrikeOut": "0",
+    "ScaleX": "100", "ScaleY": "100", "Spacing": "0", "Angle": "0",
+    "BorderStyle": "1", "Outline": "1", "Shadow": "0", "Alignment": "2",
+    "MarginL": "10", "MarginR": "10", "MarginV": "10", "Encoding": "1"
+}
+
+# Karaoke highlight used when font_settings has no 'HighlightColour'
+DEFAULT_HIGHLIGHT_COLOUR = "#FFFF00"
+
+# Languages written without spaces between words
+NO_SPACE_LANGUAGES = {"zh", "ja", "th", "lo", "my", "km"}
+
+def ass_color(hex_color, alpha="00"):
+    """Converts #RRGGBB to ASS &HAABBGGRR (alpha 00 = opaque). Returns None for malformed input."""
+    c = (hex_color or "").replace('#', '')
+    if len(c) != 6:
+        return None
+    return f"&H{alpha}{c[4:6]}{c[2:4]}{c[0:2]}".upper()
+
+def ass_style_fields(font_settings, margin_v=None):
+    """
+    Compiles burn_subtitles font_settings into ASS style fields (ordered dict of name -> value).
+    Used both for the SRT force_style string and for the styles written by save_ass.
+    """
+    bg_enabled = font_settings.get('BackgroundEnabled', False)
+    border_enabled = font_settings.get('BorderEnabled', True)
+
+    if bg_enabled:
+        # BorderStyle=3 draws an opaque box behind each line
+        fields = {"Alignment": "2", "BorderStyle": "3", "Outline": "2", "Shadow": "0"}
+        bg_color = ass_color(font_settings.get('BackgroundColour'), alpha="80")  # 80 = semi-transparent
+        if bg_color:
+            fields["OutlineColour"] = bg_color
+            fields["BackColour"] = bg_color
+    elif border_enabled:
+        fields = {"Alignment": "2", "BorderStyle": "1", "Outline": "2", "Shadow": "1",
+                  "OutlineColour": "&H00000000"}
+    else:
+        fields = {"Alignment": "2", "BorderStyle": "1", "Outline": "0", "Shadow": "0"}
+
+    if font_settings.get('Fontname'):
+        fields["Fontname"] = font_settings['Fontname']
+    if font_settings.get('Fontsize'):
+        fields["Fontsize"] = str(font_settings['Fontsize'])
+    primary = ass_color(font_settings.get('PrimaryColour'))
+    if primary:
+        fields["PrimaryColour"] = primary
+    if margin_v is not None:
+        fields["MarginV"] = str(margin_v)
+    return fields
+
+def format_ass_timestamp(seconds):
+    """Converts seconds to ASS timestamp format (H:MM:SS.cc)"""
+    centiseconds = int(round(max(0.0, seconds) * 100))
+    hours, rest = divmod(centiseconds, 360000)
+    minutes, rest = divmod(rest, 6000)
+    secs, cs = divmod(rest, 100)
+    return f"{hours}:{minutes:02d}:{secs:02d}.{cs:02d}"
+
+def escape_ass_text(text):
+    """Escapes override braces and converts newlines to ASS hard breaks."""
+    text = text.replace('{', '\\{').replace('}', '\\}')
+    return text.replace('\r\n', '\n').replace('\n', '\\N')
+
+def group_words_into_lines(words, max_words=5, max_gap=0.6, max_duration=4.0):
+    """
+    Groups word-level subtitles (as returned by generate_subtitles(mode='word')) into lines.
+    A line breaks on a pause longer than max_gap, after sentence punctuation,
+    or when it reaches max_words / max_duration.
+    Returns a list of lists of word dicts.
+    """
+    lines = []
+    current = []
+    for word in words:
+        if current:
+            gap = word['start'] - current[-1]['end']
+            too_long = word['end'] - current[0]['start'] > max_duration
+            if gap > max_gap or len(current) >= max_words or too_long or current[-1]['text'][-1:] in '.!?':
+                lines.append(current)
+                current = []
+        current.append(word)
+    if current:
+        lines.append(current)
+    return lines
+
+def karaoke_text(line_words, separator=" "):
+    """
+    Builds a karaoke event text for one line: each word carries a \\k duration (centiseconds)
+    running until the next word starts, so the highlight sweeps word by word.
+    Boundaries are rounded on the absolute timeline so durations do not drift.
+    """
+    line_start = line_words[0]['start']
+    boundaries = [int(round((w['start'] - line_start) * 100)) for w in line_words]
+    boundaries.append(int(round((line_words[-1]['end'] - line_start) * 100)))
+
+    parts = []
+    for i, word in enumerate(line_words):
+        duration = max(0, boundaries[i + 1] - boundaries[i])
+        parts.append(f"{{\\k{duration}}}{escape_ass_text(word['text'])}")
+    return separator.join(parts)
+
+def save_ass(subtitles, output_path, font_settings, margin_v=None, karaoke=False, language=None):
+    """
+    Writes subtitles as a native ASS script with the style compiled from font_settings,
+    so burning needs no force_style.
+    karaoke: subtitles are word-level; words are grouped into lines and highlighted
+             with \\k tags (SecondaryColour before a word is spoken, PrimaryColour after).
+             The highlight colour comes from font_settings['HighlightColour'].
+    language: used to decide whether karaoke words are joined with spaces.
+    """
+    style = dict(ASS_STYLE_DEFAULTS)
+    style.update(ass_style_fields(font_settings, margin_v=margin_v))
+
+    events = []
+    if karaoke:
+        # Spoken words switch to the highlight colour; upcoming words keep the text colour
+        style["SecondaryColour"] = style["PrimaryColour"]
+        style["PrimaryColour"] = ass_color(font_settings.get('HighlightColour') or DEFAULT_HIGHLIGHT_COLOUR)
+        separator = "" if language in NO_SPACE_LANGUAGES else " "
+        for line_words in group_words_into_lines(subtitles):
+            events.append((line_words[0]['start'], line_words[-1]['end'], karaoke_text(line_words, separator)))
+    else:
+        for sub in subtitles:
+            events.append((sub['start'], sub['end'], escape_ass_text(sub['text'])))
+
+    with open(output_path, 'w', encoding='utf-8') as f:
+        f.write("[Script Info]\n")
+        f.write("ScriptType: v4.00+\n")
+        f.write(f"PlayResX: {ASS_PLAY_RES_X}\n")
+        f.write(f"PlayResY: {ASS_PLAY_RES_Y}\n")
+        f.write("ScaledBorderAndShadow: yes\n")
+        f.write("WrapStyle: 0\n\n")
+
+        f.write("[V4+ Styles]\n")
+        f.write(f"Format: {', '.join(ASS_STYLE_FORMAT)}\n")
+        f.write(f"Style: {','.join(str(style[k]) for k in ASS_STYLE_FORMAT)}\n\n")
+
+        f.write("[Events]\n")
+        f.write("Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text\n")
+        for start, end, text in events:
+            f.write(f"Dialogue: 0,{format_ass_timestamp(start)},{format_ass_timestamp(end)},Default,,0,0,0,,{text}\n")
+    return output_path
@@ -0,0 +1,142 @@
+import os
+import json
+import hashlib
+import threading
+import subprocess
+from core.instrumentation import span, count
+from core.subtitles import generate_subtitles, generate_subtitles_long, separate_words
+
+# One JSON file per transcript, reused across sessions
+TRANSCRIPT_CACHE_DIR = "transcript_cache"
+
+# Bump when the stored format or transcription settings change so old entries are ignored
+TRANSCRIPT_FORMAT_VERSION = 2
+
+_transcripts = {}
+_transcripts_lock = threading.Lock()
+# Per-key locks: concurrent requests for the same audio wait for one transcription
+_key_locks = {}
+
+# (path, size, mtime) -> content hash, so a file is hashed once per session
+_fingerprints = {}
+
+
+def _audio_stream_hash(path):
+    """Hash of the first audio stream's packets (stream copy, no decoding), or None."""
+    cmd = ['ffmpeg', '-v', 'error', '-nostdin', '-i', path, '-map', '0:a:0', '-c', 'copy',
+           '-f', 'hash', '-hash', 'sha256', '-']
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True)
+    except OSError:
+        return None
+    line = result.stdout.strip()
+    if result.returncode != 0 or not line.startswith('SHA256='):
+        return None
+    return "a" + line.split('=', 1)[1][:32]
+
+
+def audio_fingerprint(path):
+    """
+    Content hash of a media file's audio: the first audio stream's packets, so re-rendered
+    videos with the same soundtrack share transcripts. Falls back to BLAKE2b of the file's bytes.
+    """
+    stat = os.stat(path)
+    memo_key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    with _transcripts_lock:
+        if memo_key in _fingerprints:
+            return _fingerprints[memo_key]
+    with span("transcript.hash", bytes=stat.st_size):
+        fingerprint = _audio_stream_hash(path)
+        if fingerprint is None:
+            digest = hashlib.blake2b(digest_size=16)
+            with open(path, 'rb') as f:
+                for block in iter(lambda: f.read(1 << 20), b''):
+                    digest.update(block)
+            fingerprint = digest.hexdigest()
+    with _transcripts_lock:
+        _fingerprints[memo_key] = fingerprint
+    return fingerprint
+
+
+def _cache_path(key):
+    return os.path.join(TRANSCRIPT_CACHE_DIR, f"{key}.json")
+
+
+def _load_cached(key):
+    path = _cache_path(key)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get("version") == TRANSCRIPT_FORMAT_VERSION:
+            return data["segments"]
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Ignoring unreadable transcript cache {path}: {e}")
+    return None
+
+
+def _save_cached(key, segments):
+    try:
+        os.makedirs(TRANSCRIPT_CACHE_DIR, exist_ok=True)
+        tmp_path = _cache_path(key) + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"version": TRANSCRIPT_FORMAT_VERSION, "segments": segments}, f, ensure_ascii=False)
+        os.replace(tmp_path, _cache_path(key))
+    except OSError as e:
+        print(f"Could not save transcript cache: {e}")
+
+
+def get_transcript(source, language=None, model_size="base", long_form=False, logger=None):
+    """
+    Sentence segments of source, each with its word timings under "words".
+
+    Results are keyed by the audio's content hash, model, language (None = auto-detect) and
+    transcription mode (long_form: VAD-chunked generate_subtitles_long, else one pass over the file)
+    and kept in memory and in TRANSCRIPT_CACHE_DIR, so every target language and both subtitle
+    modes of one source share a single Whisper pass.
+    Returns [] (and caches nothing) when transcription fails.
+    """
+    key = f"{audio_fingerprint(source)}_{model_size}_{language or 'auto'}_{'long' if long_form else 'whole'}"
+    with _transcripts_lock:
+        if key in _transcripts:
+            count("transcript_hits")
+            return _transcripts[key]
+        key_lock = _key_locks.setdefault(key, threading.Lock())
+
+    with key_lock:
+        with _transcripts_lock:
+            if key in _transcripts:
+                count("transcript_hits")
+                return _transcripts[key]
+
+        segments = _load_cached(key)
+        if segments is not None:
+            count("transcript_hits")
+        else:
+            count("transcript_misses")
+            if long_form:
+                segments = generate_subtitles_long(source, language=language, mode='full', model_size=model_size,
+                                                   logger=logger)
+            else:
+                segments = generate_subtitles(source, language=language, mode='full', model_size=model_size)
+            if not segments:
+                return []
+            _save_cached(key, segments)
+
+        with _transcripts_lock:
+            _transcripts[key] = segments
+        return segments
+
+
+def transcript_subtitles(segments, mode='sentence'):
+    """generate_subtitles-style list for mode ('sentence' or 'word') from get_transcript segments."""
+    if mode == 'word':
+        words = [dict(word) for segment in segments for word in segment.get("words", [])]
+        return separate_words(words)
+    return [{"start": s["start"], "end": s["end"], "text": s["text"]} for s in segments]
+
+
+def transcribe(source, language=None, mode='sentence', model_size="base", long_form=False, logger=None):
+    """Drop-in for generate_subtitles(path, ...) that goes through the transcript store."""
+    return transcript_subtitles(get_transcript(source, language, model_size, long_form, logger), mode)
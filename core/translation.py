@@ -1,45 +1,126 @@
-import requests
 import json
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from core.instrumentation import span, count
+from core.utils import gemini_base_url, api_request
+
+TRANSLATE_URL = "{base_url}/models/gemini-2.0-flash-exp:generateContent?key={api_key}"
+
+# Session memo of finished translations: (text, target_lang_code) -> translated text.
+# Shared by translate_text and translate_texts, so the cover dialog and the export reuse results.
+_translation_cache = {}
+_translation_cache_lock = threading.Lock()
+
+def _cached_translation(text, target_lang_code):
+    with _translation_cache_lock:
+        return _translation_cache.get((text, target_lang_code))
+
+def _remember_translation(text, target_lang_code, translated_text):
+    if translated_text:
+        with _translation_cache_lock:
+            _translation_cache[(text, target_lang_code)] = translated_text
+
+def _generate_content(prompt, api_key, generation_config=None):
+    """Sends one prompt to Gemini. Returns the response text, or None on error."""
+    url = TRANSLATE_URL.format(base_url=gemini_base_url(), api_key=api_key)
+
+    headers = {
+        "Content-Type": "application/json"
+    }
+
+    payload = {
+        "contents": [{
+            "parts": [{"text": prompt}]
+        }]
+    }
+    if generation_config:
+        payload["generationConfig"] = generation_config
+
+    with span("gemini.generate"):
+        count("gemini_calls")
+        response = api_request("POST", url, headers=headers, json=payload)
+
+    if response.status_code != 200:
+        print(f"Gemini API Error {response.status_code}: {response.text}")
+        return None
+
+    result = response.json()
+
+    if "candidates" in result and result["candidates"]:
+        candidate = result["candidates"][0]
+        if "content" in candidate and "parts" in candidate["content"]:
+            return candidate["content"]["parts"][0]["text"].strip()
+
+    return None
 
 def translate_text(text, target_lang_code, api_key):
     """
     Translates text using Gemini API.
+    Results are memoised for the session.
     """
     if not api_key:
         print("Error: API Key is required for translation.")
         return None
 
+    cached = _cached_translation(text, target_lang_code)
+    if cached:
+        return cached
+
     try:
-        url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash-exp:generateContent?key={api_key}"
-        
-        headers = {
-            "Content-Type": "application/json"
-        }
-        
         prompt = f"Translate the following text to {target_lang_code}. Only return the translated text, nothing else.\n\nText: {text}"
-        
-        payload = {
-            "contents": [{
-                "parts": [{"text": prompt}]
-            }]
-        }
-        
-        response = requests.post(url, headers=headers, json=payload)
-        
-        if response.status_code != 200:
-            print(f"Gemini API Error {response.status_code}: {response.text}")
-            return None
-            
-        result = response.json()
-        
-        if "candidates" in result and result["candidates"]:
-            candidate = result["candidates"][0]
-            if "content" in candidate and "parts" in candidate["content"]:
-                translated_text = candidate["content"]["parts"][0]["text"].strip()
-                return translated_text
-        
-        return None
-            
+
+        translated_text = _generate_content(prompt, api_key)
+        _remember_translation(text, target_lang_code, translated_text)
+        return translated_text
+
     except Exception as e:
         print(f"Translation Error: {e}")
         return None
+
+def translate_texts(text, target_lang_codes, api_key, max_workers=None):
+    """
+    Translates one text into several languages.
+    Uncached targets are requested together in a single Gemini call returning a JSON object;
+    any language missing from that answer is translated with concurrent translate_text calls.
+    Results are memoised for the session.
+    Returns {target_lang_code: translated text or None}.
+    """
+    if not api_key:
+        print("Error: API Key is required for translation.")
+        return {code: None for code in target_lang_codes}
+
+    results = {code: _cached_translation(text, code) for code in target_lang_codes}
+    missing = [code for code, translated in results.items() if not translated]
+    if not missing:
+        return results
+
+    if len(missing) > 1:
+        try:
+            prompt = (
+                f"Translate the following text into each of these languages: {', '.join(missing)}. "
+                "Return only a JSON object mapping each language code to its translation, nothing else.\n\n"
+                f"Text: {text}"
+            )
+            response_text = _generate_content(prompt, api_key, generation_config={"responseMimeType": "application/json"})
+            translations = json.loads(response_text) if response_text else {}
+            if isinstance(translations, dict):
+                for code in missing:
+                    translated = translations.get(code)
+                    if isinstance(translated, str) and translated.strip():
+                        results[code] = translated.strip()
+                        _remember_translation(text, code, results[code])
+        except Exception as e:
+            print(f"Batch translation failed, falling back to per-language requests: {e}")
+
+    missing = [code for code, translated in results.items() if not translated]
+    if missing:
+        workers = max(1, min(len(missing), max_workers or 8))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            # Each worker runs in a copy of the caller's context so spans and counters are kept
+            futures = [executor.submit(contextvars.copy_context().run, translate_text, text, code, api_key)
+                       for code in missing]
+            for code, future in zip(missing, futures):
+                results[code] = future.result()
+
+    return results
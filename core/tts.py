@@ -1,9 +1,10 @@
 import os
 import wave
 import base64
-import requests
 import json
 import subprocess
+from core.instrumentation import span, count
+from core.utils import gemini_base_url, api_request
 
 # Gemini Voices (Single-speaker)
 GEMINI_VOICES = [
@@ -24,14 +25,28 @@ SPEECH_SPEEDS = {
     "Very Fast (1.3x)": 1.3
 }
 
+# Output encoders keyed by file extension.
+# codec None means the raw Gemini PCM is written straight into a WAV container.
+AUDIO_FORMATS = {
+    ".wav": {"codec": None, "bitrate": None},
+    ".mp3": {"codec": "libmp3lame", "bitrate": "128k"},
+    ".m4a": {"codec": "aac", "bitrate": "128k"},
+    ".aac": {"codec": "aac", "bitrate": "128k"},
+    ".opus": {"codec": "libopus", "bitrate": "64k"},
+    ".ogg": {"codec": "libopus", "bitrate": "64k"},
+}
+
+# Gemini TTS returns 16-bit mono PCM at 24 kHz
+TTS_SAMPLE_RATE = 24000
+
 def verify_api_key(api_key):
     """
     Verifies the Gemini API key by attempting to list models via REST.
     Returns (True, "Valid") or (False, ErrorMessage).
     """
     try:
-        url = f"https://generativelanguage.googleapis.com/v1beta/models?key={api_key}"
-        response = requests.get(url)
+        url = f"{gemini_base_url()}/models?key={api_key}"
+        response = api_request("GET", url)
         if response.status_code == 200:
             return True, "API Key is valid!"
         else:
@@ -47,11 +62,53 @@ def save_wave_file(filename, pcm_data, channels=1, rate=24000, sample_width=2):
         wf.setframerate(rate)
         wf.writeframes(pcm_data)
 
-def generate_audio(text, language, output_path, voice="Puck", api_key=None, speech_speed=1.0, voice_prompt=""):
+def encode_audio(pcm_data, output_path, speech_speed=1.0, bitrate=None, rate=TTS_SAMPLE_RATE):
+    """
+    Encodes raw PCM into the format implied by output_path's extension (see AUDIO_FORMATS).
+    Speed change and encoding happen in a single ffmpeg pass fed through stdin,
+    so no intermediate WAV is written. A .wav target at normal speed skips ffmpeg entirely.
+    Returns output_path on success, None on failure.
+    """
+    ext = os.path.splitext(output_path)[1].lower()
+    fmt = AUDIO_FORMATS.get(ext)
+    if fmt is None:
+        print(f"Unsupported audio format '{ext}', expected one of {', '.join(AUDIO_FORMATS)}")
+        return None
+
+    if fmt["codec"] is None and speech_speed == 1.0:
+        save_wave_file(output_path, pcm_data, rate=rate)
+        return output_path
+
+    cmd = [
+        'ffmpeg', '-y',
+        '-f', 's16le', '-ar', str(rate), '-ac', '1',
+        '-i', 'pipe:0',
+    ]
+    if speech_speed != 1.0:
+        # atempo only supports 0.5 to 2.0
+        speed = max(0.5, min(2.0, speech_speed))
+        cmd.extend(['-af', f'atempo={speed}'])
+    if fmt["codec"] is None:
+        cmd.extend(['-c:a', 'pcm_s16le'])
+    else:
+        cmd.extend(['-c:a', fmt["codec"], '-b:a', bitrate or fmt["bitrate"]])
+    if ext == ".aac":
+        cmd.extend(['-f', 'adts'])
+    cmd.append(output_path)
+
+    result = subprocess.run(cmd, input=pcm_data, capture_output=True)
+    if result.returncode != 0:
+        print(f"FFmpeg audio encode error: {result.stderr.decode('utf8', errors='replace')}")
+        return None
+    return output_path
+
+def generate_audio(text, language, output_path, voice="Puck", api_key=None, speech_speed=1.0, voice_prompt="", bitrate=None):
     """
     Generates audio using Gemini API Speech Generation (REST API).
     speech_speed: 0.5 to 2.0 (1.0 = normal speed)
     voice_prompt: Custom instructions for tone/style (e.g. "speak cheerfully", "speak slowly and calmly")
+    The output codec follows output_path's extension (.wav, .mp3, .m4a, .aac, .opus, .ogg);
+    bitrate overrides the default for that format.
     """
     print(f"Generating audio with Gemini API (REST), voice: {voice}, speed: {speech_speed}x")
     
@@ -60,7 +117,7 @@ def generate_audio(text, language, output_path, voice="Puck", api_key=None, spee
         return None
 
     try:
-        url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-2.5-flash-preview-tts:generateContent?key={api_key}"
+        url = f"{gemini_base_url()}/models/gemini-2.5-flash-preview-tts:generateContent?key={api_key}"
         
         headers = {
             "Content-Type": "application/json"
@@ -89,7 +146,9 @@ def generate_audio(text, language, output_path, voice="Puck", api_key=None, spee
             }
         }
         
-        response = requests.post(url, headers=headers, json=payload)
+        with span("tts.request", voice=voice):
+            count("gemini_tts_calls")
+            response = api_request("POST", url, headers=headers, json=payload)
         
         if response.status_code != 200:
             print(f"Gemini API Error {response.status_code}: {response.text}")
@@ -107,32 +166,10 @@ def generate_audio(text, language, output_path, voice="Puck", api_key=None, spee
                     data_base64 = parts[0]["inlineData"]["data"]
                     pcm_data = base64.b64decode(data_base64)
                     
-                    # Save as temporary WAV first
-                    if speech_speed != 1.0:
-                        import tempfile
-                        temp_wav = tempfile.NamedTemporaryFile(suffix='.wav', delete=False)
-                        temp_wav.close()
-                        save_wave_file(temp_wav.name, pcm_data)
-                        
-                        # Use FFmpeg to adjust speed with atempo filter
-                        # atempo only supports 0.5 to 2.0
-                        speed = max(0.5, min(2.0, speech_speed))
-                        
-                        cmd = [
-                            'ffmpeg', '-y',
-                            '-i', temp_wav.name,
-                            '-af', f'atempo={speed}',
-                            output_path
-                        ]
-                        subprocess.run(cmd, capture_output=True)
-                        
-                        # Cleanup temp file
-                        try:
-                            os.remove(temp_wav.name)
-                        except:
-                            pass
-                    else:
-                        save_wave_file(output_path, pcm_data)
+                    with span("tts.encode", output=os.path.basename(output_path)):
+                        encoded = encode_audio(pcm_data, output_path, speech_speed=speech_speed, bitrate=bitrate)
+                    if not encoded:
+                        return None
                     
                     return output_path
         
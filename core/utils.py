@@ -1,6 +1,9 @@
 import uuid
 import json
 import os
+import time
+import random
+from core.instrumentation import count
 
 def generate_id():
     return str(uuid.uuid4())[:8]
@@ -22,6 +25,52 @@ def create_manifest(export_path, video_data_list):
         json.dump(manifest, f, indent=4, ensure_ascii=False)
     return manifest_path
 
+# Gemini REST endpoint root. The GEMINI_API_BASE_URL environment variable or "api_base_url"
+# in config.json point the app at another server (e.g. benchmarks/stub_gemini.py).
+GEMINI_BASE_URL = "https://generativelanguage.googleapis.com/v1beta"
+
+def gemini_base_url():
+    base_url = os.environ.get("GEMINI_API_BASE_URL") or load_config().get("api_base_url") or GEMINI_BASE_URL
+    return base_url.rstrip('/')
+
+# Throttled (429) and transient server errors are retried with exponential backoff
+API_RETRY_STATUSES = {429, 500, 502, 503, 504}
+API_MAX_RETRIES = 4
+API_RETRY_BASE_DELAY = 1.0
+API_RETRY_MAX_DELAY = 30.0
+
+def api_request(method, url, max_retries=API_MAX_RETRIES, idempotent=True, **kwargs):
+    """
+    requests.request() that retries 429/5xx responses and connection errors,
+    waiting Retry-After when the server sends it, else an exponential backoff with jitter.
+    idempotent=False (requests that start paid jobs, e.g. Veo predictLongRunning) retries only 429:
+    after a 5xx or a dropped connection the server may already have accepted the request.
+    Returns the last response (raises the last connection error).
+    """
+    import requests
+
+    retry_statuses = API_RETRY_STATUSES if idempotent else {429}
+    for attempt in range(max_retries + 1):
+        try:
+            response = requests.request(method, url, **kwargs)
+        except requests.ConnectionError:
+            if attempt == max_retries or not idempotent:
+                raise
+            response = None
+        if response is not None and (response.status_code not in retry_statuses or attempt == max_retries):
+            return response
+
+        delay = API_RETRY_BASE_DELAY * 2 ** attempt * random.uniform(0.5, 1.0)
+        if response is not None and response.headers.get("Retry-After", "").replace('.', '', 1).isdigit():
+            delay = float(response.headers["Retry-After"])
+        status = response.status_code if response is not None else "connection error"
+        if response is not None:
+            # Release the connection (streamed downloads keep it open until closed)
+            response.close()
+        print(f"API {status}, retrying in {delay:.1f}s ({attempt + 1}/{max_retries})")
+        count("api_retries")
+        time.sleep(min(delay, API_RETRY_MAX_DELAY))
+
 CONFIG_PATH = "config.json"
 
 def load_config():
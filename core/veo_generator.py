@@ -4,17 +4,17 @@ Generates AI news anchor videos using Google's Veo 3.0 Fast API.
 """
 import os
 import time
-import requests
 import json
 import tempfile
 import base64
+from core.instrumentation import traced, count
+from core.utils import gemini_base_url, api_request
 
 
 # Veo 3.0 Fast model (for generation)
 VEO_MODEL = "veo-3.0-fast-generate-001"
 # Veo 3.1 Preview model (for extension - 3.0 doesn't support extension)
 VEO_MODEL_EXTEND = "veo-3.1-generate-preview"
-VEO_BASE_URL = "https://generativelanguage.googleapis.com/v1beta"
 
 # Supported aspect ratios
 ASPECT_RATIOS = {
@@ -98,6 +98,7 @@ def get_image_mime_type(image_path):
     return mime_types.get(ext, "image/jpeg")
 
 
+@traced("veo.start_generation")
 def start_video_generation(prompt, aspect_ratio, api_key, resolution="720p", reference_image=None):
     """
     Starts a video generation request with Veo 3.0 Fast API.
@@ -112,7 +113,7 @@ def start_video_generation(prompt, aspect_ratio, api_key, resolution="720p", ref
     Returns:
         operation_name: The operation name for polling, or None on error
     """
-    url = f"{VEO_BASE_URL}/models/{VEO_MODEL}:predictLongRunning?key={api_key}"
+    url = f"{gemini_base_url()}/models/{VEO_MODEL}:predictLongRunning?key={api_key}"
     
     headers = {
         "Content-Type": "application/json"
@@ -125,6 +126,7 @@ def start_video_generation(prompt, aspect_ratio, api_key, resolution="720p", ref
     # Add reference image if provided
     if reference_image and os.path.exists(reference_image):
         image_data = encode_image_to_base64(reference_image)
+        count("upload_bytes", len(image_data))
         mime_type = get_image_mime_type(reference_image)
         instance["image"] = {
             "bytesBase64Encoded": image_data,
@@ -146,7 +148,8 @@ def start_video_generation(prompt, aspect_ratio, api_key, resolution="720p", ref
         payload["parameters"]["personGeneration"] = "allow_all"
     
     try:
-        response = requests.post(url, headers=headers, json=payload)
+        count("veo_api_calls")
+        response = api_request("POST", url, headers=headers, json=payload, idempotent=False)
         
         if response.status_code != 200:
             print(f"Veo API Error {response.status_code}: {response.text}")
@@ -161,6 +164,7 @@ def start_video_generation(prompt, aspect_ratio, api_key, resolution="720p", ref
         return None
 
 
+@traced("veo.poll")
 def poll_operation(operation_name, api_key, timeout=300, poll_interval=10):
     """
     Polls an operation until it's complete or times out.
@@ -174,7 +178,7 @@ def poll_operation(operation_name, api_key, timeout=300, poll_interval=10):
     Returns:
         dict: The final response with video URI, or None on error/timeout
     """
-    url = f"{VEO_BASE_URL}/{operation_name}?key={api_key}"
+    url = f"{gemini_base_url()}/{operation_name}?key={api_key}"
     start_time = time.time()
     
     while True:
@@ -184,7 +188,8 @@ def poll_operation(operation_name, api_key, timeout=300, poll_interval=10):
             return None
         
         try:
-            response = requests.get(url)
+            count("veo_api_calls")
+            response = api_request("GET", url)
             
             if response.status_code != 200:
                 print(f"Veo Poll Error {response.status_code}: {response.text}")
@@ -203,6 +208,7 @@ def poll_operation(operation_name, api_key, timeout=300, poll_interval=10):
             return None
 
 
+@traced("veo.start_extension")
 def start_video_extension(video_uri, prompt, aspect_ratio, api_key, resolution="720p"):
     """
     Starts a video extension request with Veo API.
@@ -219,7 +225,7 @@ def start_video_extension(video_uri, prompt, aspect_ratio, api_key, resolution="
         operation_name: The operation name for polling, or None on error
     """
     # Use Veo 3.1 for extension (3.0 doesn't support it)
-    url = f"{VEO_BASE_URL}/models/{VEO_MODEL_EXTEND}:predictLongRunning?key={api_key}"
+    url = f"{gemini_base_url()}/models/{VEO_MODEL_EXTEND}:predictLongRunning?key={api_key}"
     
     print(f"[Extension] Using model: {VEO_MODEL_EXTEND}")
     print(f"[Extension] Video URI: {video_uri[:80]}...")
@@ -243,7 +249,8 @@ def start_video_extension(video_uri, prompt, aspect_ratio, api_key, resolution="
     }
     
     try:
-        response = requests.post(url, headers=headers, json=payload)
+        count("veo_api_calls")
+        response = api_request("POST", url, headers=headers, json=payload, idempotent=False)
         
         if response.status_code != 200:
             print(f"Veo Extension API Error {response.status_code}: {response.text}")
@@ -259,6 +266,7 @@ def start_video_extension(video_uri, prompt, aspect_ratio, api_key, resolution="
         return None
 
 
+@traced("veo.download")
 def download_video(video_uri, output_path, api_key):
     """
     Downloads a generated video from Veo.
@@ -276,7 +284,8 @@ def download_video(video_uri, output_path, api_key):
             "x-goog-api-key": api_key
         }
         
-        response = requests.get(video_uri, headers=headers, stream=True, allow_redirects=True)
+        count("veo_api_calls")
+        response = api_request("GET", video_uri, headers=headers, stream=True, allow_redirects=True)
         
         if response.status_code != 200:
             print(f"Download Error {response.status_code}")
@@ -285,6 +294,7 @@ def download_video(video_uri, output_path, api_key):
         with open(output_path, 'wb') as f:
             for chunk in response.iter_content(chunk_size=8192):
                 f.write(chunk)
+                count("download_bytes", len(chunk))
         
         return output_path
         
@@ -499,8 +509,8 @@ def verify_veo_access(api_key):
         (bool, str): (success, message)
     """
     try:
-        url = f"{VEO_BASE_URL}/models?key={api_key}"
-        response = requests.get(url)
+        url = f"{gemini_base_url()}/models?key={api_key}"
+        response = api_request("GET", url)
         
         if response.status_code != 200:
             return False, f"API Error {response.status_code}"
@@ -1,14 +1,34 @@
-import ffmpeg
 import os
+import json
+import threading
+import subprocess
+from core.ffmpeg_runner import run_ffmpeg, run_stream, submit_in_context, is_cancelled
+from core.instrumentation import traced
+from core.encoding import x264_args, x264_kwargs, ENCODING_PROFILES, DEFAULT_PROFILE
+from core.scratch import scratch_space
 
-def merge_audio_video(video_path, audio_path, output_path, mode="trim", music_path=None, music_volume=0.15):
+# libass renders SRT input on a 384x288 script canvas and scales it to the video,
+# so Fontsize/MarginV/Outline from font_settings are in these units.
+LIBASS_PLAY_RES_X = 384
+LIBASS_PLAY_RES_Y = 288
+
+@traced("merge_audio_video")
+def merge_audio_video(video_path, audio_path, output_path, mode="trim", music_path=None, music_volume=0.15,
+                      loudness=None):
     """
     Merges video and audio using ffmpeg.
     mode="trim": Cut/loop video to match TTS audio length exactly.
-    mode="bg_music": Keep video length, mix TTS with looped background music.
+    mode="bg_music": Keep video length, mix TTS with looped background music ducked under the speech.
+    loudness: loudness target of the speech (name from core.loudness.LOUDNESS_TARGETS, LUFS, or "off";
+              default: config "loudness_target"). Normalisation, ducking and mixing run in the mux itself.
+    With config "gop_copy_merge", trim mode stream-copies whole GOPs and re-encodes only the last
+    partial one (see gop_copy_concat).
     """
-    import subprocess
+    import ffmpeg
+    from core.loudness import mastering_graph
+    from core.utils import load_config
     
+    scratch = scratch_space("merge")
     try:
         # Get audio duration first
         audio_duration = get_audio_duration(audio_path)
@@ -22,83 +42,116 @@ def merge_audio_video(video_path, audio_path, output_path, mode="trim", music_pa
         
         print(f"Audio duration: {audio_duration:.2f}s, Video duration: {video_duration:.2f}s")
         
-        if mode == "bg_music" and music_path and os.path.exists(music_path):
-            # Background Music Mode
-            # Loop music, lower volume, mix with TTS
-            input_video = ffmpeg.input(video_path)
-            input_tts = ffmpeg.input(audio_path)
-            input_music = ffmpeg.input(music_path, stream_loop=-1)
-            
-            music_audio = input_music.audio.filter('volume', music_volume)
-            tts_audio = input_tts.audio
-            
-            mixed_audio = ffmpeg.filter([tts_audio, music_audio], 'amix', inputs=2, duration='longest')
-            
-            # Output with -shortest (to cut to video length)
-            (
-                ffmpeg
-                .output(input_video.video, mixed_audio, output_path, vcodec='copy', acodec='aac', strict='experimental', shortest=None)
-                .overwrite_output()
-                .run(capture_stdout=True, capture_stderr=True)
-            )
-        elif mode == "bg_music":
-            # User wants to keep video length, but no music provided.
-            input_video = ffmpeg.input(video_path)
-            input_tts = ffmpeg.input(audio_path)
-            (
-                ffmpeg
-                .output(input_video.video, input_tts.audio, output_path, vcodec='copy', acodec='aac', strict='experimental')
-                .overwrite_output()
-                .run(capture_stdout=True, capture_stderr=True)
-            )
+        has_music = mode == "bg_music" and music_path and os.path.exists(music_path)
+        audio_graph = mastering_graph(('1:a', audio_path), ('2:a', music_path) if has_music else None,
+                                      music_volume=music_volume, target=loudness)
+        if audio_graph:
+            audio_args = ['-filter_complex', audio_graph, '-map', '[aout]', '-c:a', 'aac', '-b:a', '192k']
         else:
-            # Trim mode: Cut/loop video to match audio length exactly
-            if video_duration >= audio_duration:
-                # Video is longer or equal - just trim to audio length
-                cmd = [
-                    'ffmpeg', '-y',
-                    '-i', video_path,
-                    '-i', audio_path,
-                    '-t', str(audio_duration),
-                    '-map', '0:v',
-                    '-map', '1:a',
-                    '-c:v', 'copy',
-                    '-c:a', 'aac',
-                    output_path
-                ]
-            else:
-                # Video is shorter - loop video to match audio length
-                print(f"Video is shorter than audio, looping video to match {audio_duration:.2f}s")
-                cmd = [
-                    'ffmpeg', '-y',
-                    '-stream_loop', '-1',  # Loop video infinitely
-                    '-i', video_path,
-                    '-i', audio_path,
-                    '-t', str(audio_duration),  # Cut at audio duration
-                    '-map', '0:v',
-                    '-map', '1:a',
-                    '-c:v', 'libx264',  # Need to re-encode when looping
-                    '-preset', 'medium',
-                    '-crf', '18',
-                    '-c:a', 'aac',
-                    output_path
-                ]
-            
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            if result.returncode != 0:
-                print(f"FFmpeg error: {result.stderr}")
-                return None
+            # TTS audio that is already AAC (e.g. .m4a from generate_audio) and on target is muxed
+            # as-is, so the speech track is encoded exactly once.
+            audio_codec = 'copy' if get_audio_codec(audio_path) == 'aac' else 'aac'
+            audio_args = ['-map', '1:a', '-c:a', audio_codec]
+        
+        # Opt-in trim mode: whole GOPs (and whole loops) are stream-copied, only the frames after
+        # the last keyframe before the cut are re-encoded
+        gop_copy = None
+        if mode != "bg_music" and load_config().get("gop_copy_merge", False):
+            gop_copy = gop_copy_concat(video_path, audio_duration, scratch)
+        
+        if mode == "bg_music":
+            # Keep video length; looped music continues under the rest of the video
+            cmd = ['ffmpeg', '-y', '-i', video_path, '-i', audio_path]
+            if has_music:
+                cmd += ['-stream_loop', '-1', '-i', music_path]
+            cmd += ['-map', '0:v', *audio_args, '-c:v', 'copy', '-t', str(video_duration), output_path]
+        elif video_duration >= audio_duration:
+            # Trim mode, video is longer or equal - just trim to audio length
+            cmd = [
+                'ffmpeg', '-y',
+                '-i', video_path,
+                '-i', audio_path,
+                '-t', str(audio_duration),
+                '-map', '0:v',
+                *audio_args,
+                '-c:v', 'copy',
+                output_path
+            ]
+        else:
+            # Trim mode, video is shorter - loop video to match audio length
+            print(f"Video is shorter than audio, looping video to match {audio_duration:.2f}s")
+            cmd = [
+                'ffmpeg', '-y',
+                '-stream_loop', '-1',  # Loop video infinitely
+                '-i', video_path,
+                '-i', audio_path,
+                '-t', str(audio_duration),  # Cut at audio duration
+                '-map', '0:v',
+                *audio_args,
+                *x264_args(),  # Need to re-encode when looping
+                output_path
+            ]
+        
+        if gop_copy:
+            concat_list, splice = gop_copy
+            concat_cmd = [
+                'ffmpeg', '-y',
+                '-f', 'concat', '-safe', '0',
+                '-i', concat_list,
+                '-i', audio_path,
+                '-t', str(audio_duration),
+                '-map', '0:v',
+                *audio_args,
+                '-c:v', 'copy',
+                output_path
+            ]
+            result = run_ffmpeg(concat_cmd)
+            if result.returncode == 0 and verify_video(output_path, audio_duration, splice):
+                return output_path
+            # The plain trim/loop command below is the fallback
+            print("GOP-copy merge failed its check, re-running as a plain merge")
+        
+        result = run_ffmpeg(cmd)
+        if result.returncode != 0:
+            print(f"FFmpeg error: {result.stderr}")
+            return None
                 
         return output_path
     except ffmpeg.Error as e:
         print(f"FFmpeg error: {e.stderr.decode('utf8')}")
         return None
+    finally:
+        scratch.cleanup()
 
 
-def create_image_video(image_path, output_path, duration=5.0, fps=30, width=1080, height=1920):
+# Unsharp mask matching the former ffmpeg unsharp=5:5:1.0 (5x5 luma, amount 1.0)
+STILL_UNSHARP = {"radius": 2, "percent": 100, "threshold": 0}
+
+
+def prepare_still_image(image_path, output_path, width=1080, height=1920):
+    """
+    Fits the image into width x height (Lanczos, letterboxed on black) and sharpens it once with
+    Pillow, so the encoder gets a ready frame instead of filtering every frame. Writes a PNG.
+    """
+    from PIL import Image, ImageFilter, ImageOps
+
+    with Image.open(image_path) as img:
+        img = ImageOps.exif_transpose(img).convert("RGB")
+        img = ImageOps.contain(img, (width, height), method=Image.Resampling.LANCZOS)
+    img = img.filter(ImageFilter.UnsharpMask(**STILL_UNSHARP))
+    canvas = Image.new("RGB", (width, height), (0, 0, 0))
+    canvas.paste(img, ((width - img.width) // 2, (height - img.height) // 2))
+    canvas.save(output_path, compress_level=1)
+    return output_path
+
+
+def create_image_video(image_path, output_path, duration=5.0, fps=30, width=1080, height=1920, threads=None):
     """
     Create a video from a single image.
     
+    The image is scaled and sharpened once (prepare_still_image) and encoded as a static clip:
+    x264 tuned for still images with a single GOP, so the repeated frames cost almost nothing.
+    
     Args:
         image_path: Path to the image file
         output_path: Output video path
@@ -106,30 +159,31 @@ def create_image_video(image_path, output_path, duration=5.0, fps=30, width=1080
         fps: Frames per second for output video
         width: Video width (default 1080 for 9:16 portrait)
         height: Video height (default 1920 for 9:16 portrait)
+        threads: x264 threads (default: ffmpeg's choice)
     
     Returns:
         output_path on success, None on failure
     """
-    import subprocess
-    
+    scratch = scratch_space("still")
     try:
+        frame_path = prepare_still_image(image_path, scratch.path('.png'), width, height)
+        frames = max(1, round(duration * fps))
         cmd = [
             'ffmpeg', '-y',
             '-loop', '1',
-            '-t', str(duration),
             '-framerate', str(fps),
-            '-i', image_path,
-            '-vf', f'scale={width}:{height}:flags=lanczos:force_original_aspect_ratio=decrease,pad={width}:{height}:(ow-iw)/2:(oh-ih)/2,setsar=1,unsharp=5:5:1.0:5:5:0.0,format=yuv420p',
-            '-c:v', 'libx264',
-            '-preset', 'medium',
-            '-crf', '18',
+            '-i', frame_path,
+            '-frames:v', str(frames),
+            *x264_args(tune='stillimage'),
+            '-g', str(frames),
             '-pix_fmt', 'yuv420p',
-            '-r', str(fps),
             '-an',  # No audio
-            output_path
         ]
+        if threads:
+            cmd += ['-threads', str(threads)]
+        cmd.append(output_path)
         
-        result = subprocess.run(cmd, capture_output=True, text=True)
+        result = run_ffmpeg(cmd, duration=duration)
         if result.returncode != 0:
             print(f"FFmpeg error: {result.stderr}")
             return None
@@ -138,12 +192,18 @@ def create_image_video(image_path, output_path, duration=5.0, fps=30, width=1080
     except Exception as e:
         print(f"Error creating image video: {e}")
         return None
+    finally:
+        scratch.cleanup()
 
 
-def create_images_to_videos(image_folder, output_folder, duration=5.0, fps=30, width=1080, height=1920, logger=None):
+@traced("images_to_videos")
+def create_images_to_videos(image_folder, output_folder, duration=5.0, fps=30, width=1080, height=1920, logger=None,
+                            max_workers=None, skip_existing=False):
     """
     Create individual videos from each image in a folder.
     
+    Images are converted in parallel (create_image_video per worker).
+    
     Args:
         image_folder: Path to folder containing images
         output_folder: Output folder for videos
@@ -152,11 +212,14 @@ def create_images_to_videos(image_folder, output_folder, duration=5.0, fps=30, w
         width: Video width
         height: Video height
         logger: Logger function
+        max_workers: Images converted at once (default: half the CPU cores)
+        skip_existing: Keep outputs that are newer than their image instead of converting again
     
     Returns:
         List of created video paths
     """
     import glob
+    from concurrent.futures import ThreadPoolExecutor
     
     def log(msg):
         if logger:
@@ -172,7 +235,8 @@ def create_images_to_videos(image_folder, output_folder, duration=5.0, fps=30, w
     for ext in image_extensions:
         image_files.extend(glob.glob(os.path.join(image_folder, ext)))
     
-    image_files = sorted(image_files)
+    # Case-insensitive filesystems match the same file for *.jpg and *.JPG
+    image_files = sorted(set(image_files))
     
     if not image_files:
         log(f"No images found in {image_folder}")
@@ -180,56 +244,109 @@ def create_images_to_videos(image_folder, output_folder, duration=5.0, fps=30, w
     
     log(f"Found {len(image_files)} images to process")
     
-    created_videos = []
-    for i, image_path in enumerate(image_files):
+    cpus = os.cpu_count() or 1
+    workers = max(1, min(len(image_files), max_workers or max(1, cpus // 2)))
+    threads_per_encoder = max(1, cpus // workers)
+    
+    def convert(i, image_path):
         image_name = os.path.splitext(os.path.basename(image_path))[0]
         output_path = os.path.join(output_folder, f"{image_name}.mp4")
         
-        log(f"Processing image {i+1}/{len(image_files)}: {os.path.basename(image_path)}")
+        if skip_existing and os.path.exists(output_path) and os.path.getmtime(output_path) >= os.path.getmtime(image_path):
+            log(f"Up to date: {os.path.basename(output_path)}")
+            return output_path
+        if is_cancelled():
+            return None
         
-        result = create_image_video(image_path, output_path, duration, fps, width, height)
+        log(f"Processing image {i+1}/{len(image_files)}: {os.path.basename(image_path)}")
+        result = create_image_video(image_path, output_path, duration, fps, width, height, threads=threads_per_encoder)
         if result:
-            created_videos.append(result)
             log(f"Created: {os.path.basename(output_path)}")
         else:
             log(f"Failed to process: {os.path.basename(image_path)}")
+        return result
     
-    return created_videos
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        # Pillow releases the GIL while resizing and each encode is its own ffmpeg process;
+        # workers inherit the caller's ffmpeg_job, scratch and encoding profile
+        futures = [submit_in_context(executor, convert, i, path) for i, path in enumerate(image_files)]
+        results = [future.result() for future in futures]
+    
+    return [path for path in results if path]
 
 
 def extract_frame(video_path, output_path, time_ratio=0.5):
     """
     Extracts a single frame from the video at the given time ratio (0.0 to 1.0).
     """
+    import ffmpeg
     try:
         probe = ffmpeg.probe(video_path)
         duration = float(probe['format']['duration'])
         time = duration * time_ratio
         
-        (
+        run_stream(
             ffmpeg
             .input(video_path, ss=time)
             .output(output_path, vframes=1)
             .overwrite_output()
-            .run(capture_stdout=True, capture_stderr=True)
         )
         return output_path
     except Exception as e:
         print(f"Error extracting frame: {e}")
         return None
 
-def burn_subtitles(video_path, subtitle_path, font_settings, output_path, margin_v=None, logger=None):
+def subtitles_filter(subtitle_path, font_settings=None, margin_v=None):
+    """
+    Builds the ffmpeg subtitles filter for subtitle_path (usable in -vf or -filter_complex).
+    .srt input is styled from font_settings via force_style; .ass scripts from
+    core.subtitles.save_ass carry their own style.
+    """
+    # Escape path for ffmpeg
+    # Windows/Unix path handling might be tricky in filter string
+    # Using relative path or simple filename if possible, or escaping
+    # For now, try absolute path with forward slashes
+    # Escape single quotes and colons
+    sub_path_escaped = subtitle_path.replace('\\', '/').replace(':', '\\:').replace("'", r"'\''")
+    
+    # Also escape [ and ] as they are special in filter graph
+    sub_path_escaped = sub_path_escaped.replace('[', r'\[').replace(']', r'\]')
+
+    if subtitle_path.lower().endswith('.ass'):
+        return f"subtitles='{sub_path_escaped}'"
+
+    # Alignment=2 (Bottom Center), BorderStyle=1 (Outline) or 3 (Opaque box/background)
+    from core.subtitles import ass_style_fields
+    style_str = ",".join(f"{k}={v}" for k, v in ass_style_fields(font_settings or {}, margin_v=margin_v).items())
+    return f"subtitles='{sub_path_escaped}':force_style='{style_str}'"
+
+@traced("burn_subtitles")
+def burn_subtitles(video_path, subtitle_path, font_settings, output_path, margin_v=None, logger=None, renderer=None):
     """
     Burns subtitles into video.
     font_settings: dict with keys like 'Fontname', 'Fontsize', 'PrimaryColour'
     margin_v: Vertical margin from bottom (default None, uses ffmpeg default)
     logger: function to log messages (e.g. self.log)
+    renderer: "libass" (ffmpeg subtitles filter) or "pillow" (pre-rasterized sprites, see burn_subtitles_pillow).
+              Defaults to font_settings['Renderer'] or "libass". .ass input always uses libass.
+    subtitle_path: .srt (styled via force_style from font_settings) or .ass from core.subtitles.save_ass
+                   (styled by the script itself; font_settings and margin_v are then ignored).
     """
+    import ffmpeg
     def log(msg):
         if logger:
             logger(msg)
         print(msg)
 
+    renderer = renderer or font_settings.get('Renderer', 'libass')
+    if renderer == 'pillow' and not subtitle_path.lower().endswith('.ass'):
+        from core.subtitles import load_srt
+        if not os.path.exists(subtitle_path) or os.path.getsize(subtitle_path) == 0:
+            log(f"Error: Subtitle file missing or empty: {subtitle_path}")
+            return None
+        return burn_subtitles_pillow(video_path, load_srt(subtitle_path), font_settings, output_path,
+                                     margin_v=margin_v, logger=logger)
+
     try:
         # 1. Probe Video Dimensions
         try:
@@ -260,80 +377,199 @@ def burn_subtitles(video_path, subtitle_path, font_settings, output_path, margin
             content = f.read()
             log(f"Subtitle Content Preview (First 100 chars):\n{content[:100]}...")
 
-        # Construct style string
-        # Alignment=2 (Bottom Center)
-        # BorderStyle=1 (Outline) or BorderStyle=4 (Opaque box/background)
-        
-        # Check settings
-        bg_enabled = font_settings.get('BackgroundEnabled', False)
-        border_enabled = font_settings.get('BorderEnabled', True)
-        
-        if bg_enabled:
-            # Use BorderStyle=3 for opaque box (standard ASS box)
-            # Outline defines padding? No, for Style 3, Outline is NOT used for text outline usually.
-            # But let's try to make it look cleaner.
-            style_parts = ["Alignment=2", "BorderStyle=3", "Outline=2", "Shadow=0"]
-            
-            # Add background color (uses OutlineColour for the box in BorderStyle=4)
-            if 'BackgroundColour' in font_settings:
-                c = font_settings['BackgroundColour'].replace('#', '')
-                if len(c) == 6:
-                    # ASS format: &HAABBGGRR (AA = alpha, 00 = fully opaque, 80 = semi-transparent)
-                    ass_bg_color = f"&H80{c[4:6]}{c[2:4]}{c[0:2]}"  # 80 = semi-transparent
-                    style_parts.append(f"OutlineColour={ass_bg_color}")
-                    style_parts.append(f"BackColour={ass_bg_color}")
-        elif border_enabled:
-            # Border/Outline style
-            style_parts = ["Alignment=2", "BorderStyle=1", "Outline=2", "Shadow=1"]
-            # Add black outline for contrast
-            style_parts.append("OutlineColour=&H00000000")
-        else:
-            # No border, no background - just text
-            style_parts = ["Alignment=2", "BorderStyle=1", "Outline=0", "Shadow=0"]
-        
-        if 'Fontname' in font_settings and font_settings['Fontname']:
-            style_parts.append(f"Fontname={font_settings['Fontname']}")
-        if 'Fontsize' in font_settings and font_settings['Fontsize']:
-            style_parts.append(f"Fontsize={font_settings['Fontsize']}")
-        if 'PrimaryColour' in font_settings:
-            # Convert hex #RRGGBB to &HBBGGRR
-            c = font_settings['PrimaryColour'].replace('#', '')
-            if len(c) == 6:
-                ass_color = f"&H00{c[4:6]}{c[2:4]}{c[0:2]}"
-                style_parts.append(f"PrimaryColour={ass_color}")
-        
-        if margin_v is not None:
-            style_parts.append(f"MarginV={margin_v}")
+        if subtitle_path.lower().endswith('.ass'):
+            log("Burning ASS subtitles with embedded style")
+        vf = subtitles_filter(subtitle_path, font_settings, margin_v=margin_v)
+        if 'force_style' in vf:
+            log(f"Burning subtitles with style: {vf.split(':force_style=', 1)[1]}")
         
-        style_str = ",".join(style_parts)
-        log(f"Burning subtitles with style: {style_str}")
-        
-        # Escape path for ffmpeg
-        # Windows/Unix path handling might be tricky in filter string
-        # Using relative path or simple filename if possible, or escaping
-        # For now, try absolute path with forward slashes
-        # Escape single quotes and colons
-        sub_path_escaped = subtitle_path.replace('\\', '/').replace(':', '\\:').replace("'", r"'\''")
-        
-        # Also escape [ and ] as they are special in filter graph
-        sub_path_escaped = sub_path_escaped.replace('[', r'\[').replace(']', r'\]')
-        
-        (
+        run_stream(
             ffmpeg
             .input(video_path)
-            .output(output_path, vf=f"subtitles='{sub_path_escaped}':force_style='{style_str}'")
+            .output(output_path, vf=vf, **x264_kwargs())
             .overwrite_output()
-            .run(capture_stdout=True, capture_stderr=True)
         )
         return output_path
     except ffmpeg.Error as e:
         log(f"FFmpeg error: {e.stderr.decode('utf8')}")
         return None
 
+def subtitle_sprite_style(font_settings, video_width, video_height):
+    """
+    Converts burn_subtitles font_settings into a core.image_gen.render_subtitle_sprite style,
+    scaled from libass script units to video pixels so both renderers place text alike.
+    """
+    from core.image_gen import resolve_font_path
+
+    scale = video_height / LIBASS_PLAY_RES_Y
+    bg_enabled = font_settings.get('BackgroundEnabled', False)
+    border_enabled = font_settings.get('BorderEnabled', True)
+
+    try:
+        font_size = float(font_settings.get('Fontsize') or 18)
+    except (TypeError, ValueError):
+        font_size = 18
+
+    style = {
+        "font_path": resolve_font_path(font_settings.get('Fontname') or 'Arial'),
+        "font_size": max(1, int(round(font_size * scale))),
+        "color": font_settings.get('PrimaryColour', '#FFFFFF'),
+        "border_color": "#000000",
+        "border_width": 0,
+        "shadow": 0,
+        "bg_color": None,
+        # libass default MarginL/MarginR is 10 script pixels
+        "margin_h": int(10 * video_width / LIBASS_PLAY_RES_X),
+    }
+    if bg_enabled:
+        c = font_settings.get('BackgroundColour', '#000000').replace('#', '')
+        if len(c) == 6:
+            # Matches the &H80 (semi-transparent) box burn_subtitles asks libass for
+            style["bg_color"] = (int(c[0:2], 16), int(c[2:4], 16), int(c[4:6], 16), 127)
+        style["border_width"] = int(round(2 * scale))
+    elif border_enabled:
+        style["border_width"] = int(round(2 * scale))
+        style["shadow"] = int(round(1 * scale))
+    return style
+
+
+def render_subtitle_frame(frame, text, font_settings, margin_v=None):
+    """
+    Composites one subtitle onto a PIL frame exactly as burn_subtitles_pillow does.
+    Used by the preview dialogs so the preview matches the render.
+    Returns a new RGB image.
+    """
+    from core.image_gen import render_subtitle_sprite
+
+    width, height = frame.size
+    style = subtitle_sprite_style(font_settings, width, height)
+    sprite = render_subtitle_sprite(text, style, width)
+    margin_px = int((margin_v if margin_v is not None else 10) * height / LIBASS_PLAY_RES_Y)
+    y = max(0, height - margin_px - sprite.size[1])
+
+    composed = frame.convert("RGBA")
+    composed.alpha_composite(sprite, (0, y))
+    return composed.convert("RGB")
+
+
+def burn_subtitles_pillow(video_path, subtitles, font_settings, output_path, margin_v=None, logger=None):
+    """
+    Burns subtitles by pre-rasterizing each unique subtitle text once with Pillow and
+    compositing the sprites with a single timed overlay, instead of libass/fontconfig.
+
+    Every sprite is padded to the same full-width strip, so the strip sequence can be fed
+    to ffmpeg as one concat-demuxer image stream (blank strips fill the gaps between events).
+    Identical texts share one PNG.
+
+    Args:
+        video_path: Path to input video
+        subtitles: List of {'start', 'end', 'text'} dicts (as from generate_subtitles/load_srt)
+        font_settings: Same dict burn_subtitles takes
+        output_path: Path for output video
+        margin_v: Vertical margin from bottom in libass script units (like burn_subtitles)
+        logger: Logger function
+
+    Returns:
+        output_path on success, None on failure
+    """
+    import ffmpeg
+    from PIL import Image
+    from core.image_gen import render_subtitle_sprite
+
+    def log(msg):
+        if logger:
+            logger(msg)
+        print(msg)
+
+    subtitles = sorted((s for s in subtitles if s['text'].strip() and s['end'] > s['start']), key=lambda s: s['start'])
+    if not subtitles:
+        log("Error: No subtitle events to burn")
+        return None
+
+    scratch = scratch_space("subtitle_sprites")
+    try:
+        temp_dir = scratch.mkdir("sprites", large=False)
+        probe = ffmpeg.probe(video_path)
+        video_stream = next(s for s in probe['streams'] if s['codec_type'] == 'video')
+        width = int(video_stream['width'])
+        height = int(video_stream['height'])
+
+        style = subtitle_sprite_style(font_settings, width, height)
+
+        # 1. Rasterize each unique text once
+        sprites = {}
+        for sub in subtitles:
+            if sub['text'] not in sprites:
+                sprites[sub['text']] = render_subtitle_sprite(sub['text'], style, width)
+        log(f"Rasterized {len(sprites)} unique subtitle sprites for {len(subtitles)} events")
+
+        strip_height = max(sprite.size[1] for sprite in sprites.values())
+        strip_height += strip_height % 2
+        margin_px = int((margin_v if margin_v is not None else 10) * height / LIBASS_PLAY_RES_Y)
+        strip_y = max(0, height - margin_px - strip_height)
+
+        sprite_files = {}
+        for i, (text, sprite) in enumerate(sprites.items()):
+            strip = Image.new("RGBA", (width, strip_height), (0, 0, 0, 0))
+            # Bottom-align like libass Alignment=2
+            strip.alpha_composite(sprite, (0, strip_height - sprite.size[1]))
+            sprite_files[text] = os.path.join(temp_dir, f"sprite_{i:05d}.png")
+            strip.save(sprite_files[text])
+
+        blank_path = os.path.join(temp_dir, "blank.png")
+        Image.new("RGBA", (width, strip_height), (0, 0, 0, 0)).save(blank_path)
+
+        # 2. Timeline as an ffconcat list. Boundaries are rounded to milliseconds on the absolute
+        # timeline and each duration is the difference of two of them, so hundreds of entries do not drift.
+        entries = []
+        cursor = 0
+        for sub in subtitles:
+            start = max(int(round(sub['start'] * 1000)), cursor)
+            end = int(round(sub['end'] * 1000))
+            if start > cursor:
+                entries.append((blank_path, start - cursor))
+            if end > start:
+                entries.append((sprite_files[sub['text']], end - start))
+                cursor = end
+        entries.append((blank_path, 1000))
+
+        list_path = os.path.join(temp_dir, "timeline.ffconcat")
+        with open(list_path, 'w', encoding='utf-8') as f:
+            f.write("ffconcat version 1.0\n")
+            for path, duration_ms in entries:
+                f.write(f"file '{path}'\n")
+                f.write(f"duration {duration_ms / 1000:.3f}\n")
+            # The concat demuxer ignores the duration of the last entry unless it is repeated
+            f.write(f"file '{blank_path}'\n")
+
+        # 3. One overlay for the whole track
+        cmd = [
+            'ffmpeg', '-y',
+            '-i', video_path,
+            '-f', 'concat', '-safe', '0', '-i', list_path,
+            '-filter_complex', f"[0:v][1:v]overlay=x=0:y={strip_y}:format=auto:eof_action=pass[outv]",
+            '-map', '[outv]', '-map', '0:a?',
+            *x264_args(),
+            '-c:a', 'copy',
+            output_path
+        ]
+        result = run_ffmpeg(cmd)
+        if result.returncode != 0:
+            log(f"FFmpeg error: {result.stderr}")
+            return None
+        return output_path
+    except Exception as e:
+        log(f"Error burning subtitles with Pillow renderer: {e}")
+        return None
+    finally:
+        scratch.cleanup()
+
+
 def burn_subtitle_image(image_path, subtitle_path, font_settings, output_path, margin_v=None, logger=None):
     """
     Burns subtitles into a single image.
     """
+    import ffmpeg
     def log(msg):
         if logger:
             logger(msg)
@@ -363,12 +599,11 @@ def burn_subtitle_image(image_path, subtitle_path, font_settings, output_path, m
         sub_path_escaped = subtitle_path.replace('\\', '/').replace(':', '\\:').replace("'", r"'\''")
         sub_path_escaped = sub_path_escaped.replace('[', r'\[').replace(']', r'\]')
         
-        (
+        run_stream(
             ffmpeg
             .input(image_path)
             .output(output_path, vf=f"subtitles='{sub_path_escaped}':force_style='{style_str}'")
             .overwrite_output()
-            .run(capture_stdout=True, capture_stderr=True)
         )
         return output_path
     except ffmpeg.Error as e:
@@ -376,10 +611,12 @@ def burn_subtitle_image(image_path, subtitle_path, font_settings, output_path, m
         return None
 
 
+@traced("ffprobe")
 def get_audio_duration(audio_path):
     """
     Get the duration of an audio file in seconds using ffprobe.
     """
+    import ffmpeg
     try:
         probe = ffmpeg.probe(audio_path)
         duration = float(probe['format']['duration'])
@@ -389,7 +626,361 @@ def get_audio_duration(audio_path):
         return None
 
 
-def create_slideshow_video(image_folder, audio_duration, output_path, transition_duration=0.5, fps=30, image_duration=3.0):
+@traced("ffprobe")
+def get_audio_codec(audio_path):
+    """
+    Get the codec name of the first audio stream (e.g. 'aac', 'mp3', 'pcm_s16le'), or None.
+    """
+    import ffmpeg
+    try:
+        probe = ffmpeg.probe(audio_path)
+        audio_stream = next((s for s in probe['streams'] if s['codec_type'] == 'audio'), None)
+        return audio_stream['codec_name'] if audio_stream else None
+    except Exception as e:
+        print(f"Error getting audio codec: {e}")
+        return None
+
+
+# (path, size, mtime) -> probe_video_stream() result
+_stream_probes = {}
+_stream_probes_lock = threading.Lock()
+
+
+@traced("ffprobe")
+def probe_video_stream(video_path):
+    """
+    Codec parameters and keyframe index of the first video stream, from one ffprobe packet scan (no
+    decoding): codec, profile, level, bit_rate, width, height, pix_fmt, frame_rate, time_base, start,
+    duration, extradata_hash (of the avcC parameter sets) and keyframes, a list of (pts, dts)
+    in seconds relative to the stream start.
+    Cached per file; None on failure.
+    """
+    stat = os.stat(video_path)
+    key = (os.path.abspath(video_path), stat.st_size, stat.st_mtime_ns)
+    with _stream_probes_lock:
+        if key in _stream_probes:
+            return _stream_probes[key]
+
+    cmd = ['ffprobe', '-v', 'quiet', '-select_streams', 'v:0', '-print_format', 'json', '-show_data_hash', 'SHA256',
+           '-show_entries', 'stream=codec_name,profile,level,bit_rate,width,height,pix_fmt,avg_frame_rate,time_base,'
+                            'start_time,duration,extradata_hash'
+                            ':format=duration:packet=pts_time,dts_time,flags', video_path]
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    info = None
+    try:
+        data = json.loads(result.stdout)
+        stream = data['streams'][0]
+        start = float(stream.get('start_time') or 0)
+        keyframes = sorted(
+            (float(p['pts_time']) - start, float(p.get('dts_time', p['pts_time'])) - start)
+            for p in data.get('packets', []) if 'K' in p.get('flags', '') and 'pts_time' in p
+        )
+        info = {
+            "codec": stream['codec_name'],
+            "profile": stream.get('profile'),
+            "level": int(stream.get('level') or 0),
+            "bit_rate": int(stream['bit_rate']) if str(stream.get('bit_rate', '')).isdigit() else None,
+            "width": int(stream['width']),
+            "height": int(stream['height']),
+            "pix_fmt": stream.get('pix_fmt'),
+            "frame_rate": stream.get('avg_frame_rate'),
+            "time_base": stream.get('time_base'),
+            "start": start,
+            "duration": float(stream.get('duration') or data['format']['duration']),
+            "extradata_hash": stream.get('extradata_hash'),
+            "keyframes": keyframes,
+        }
+    except (ValueError, KeyError, IndexError) as e:
+        print(f"Could not probe video stream of {video_path}: {e}")
+
+    with _stream_probes_lock:
+        _stream_probes[key] = info
+    return info
+
+
+def _frame_seconds(info):
+    try:
+        num, den = (int(x) for x in info["frame_rate"].split('/'))
+        return den / num if num else 1 / 30
+    except (AttributeError, ValueError):
+        return 1 / 30
+
+
+# ffprobe H.264 profile names and the x264 profile that encodes a compatible stream
+X264_PROFILES = {
+    "Constrained Baseline": "baseline",
+    "Baseline": "baseline",
+    "Main": "main",
+    "High": "high",
+    "High 10": "high10",
+    "High 4:2:2": "high422",
+    "High 4:4:4 Predictive": "high444",
+}
+# Fixed settings for GOP-copy tails: they sit behind copied source frames, so they follow the
+# source's quality rather than the job's encoding profile
+TAIL_PROFILE = ENCODING_PROFILES[DEFAULT_PROFILE]
+
+
+def _extradata_hash(path):
+    cmd = ['ffprobe', '-v', 'quiet', '-select_streams', 'v:0', '-show_data_hash', 'SHA256',
+           '-show_entries', 'stream=extradata_hash', '-of', 'default=noprint_wrappers=1:nokey=1', path]
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True)
+    except OSError:
+        return None
+    return result.stdout.strip() or None
+
+
+def _encode_tail(video_path, info, start, duration, output_path):
+    """
+    Re-encodes duration seconds of video_path from keyframe start so it can follow stream-copied GOPs,
+    with the source's profile, level and bitrate class. The result is only usable when its SPS/PPS
+    are byte-identical to the source's (the MP4 sample entry carries one set for the whole track);
+    returns None otherwise, or when the source's profile has no x264 match.
+    """
+    profile = X264_PROFILES.get(info.get("profile"))
+    if profile is None or not info.get("extradata_hash"):
+        print(f"GOP copy: no matching x264 settings for H.264 '{info.get('profile')}', skipping")
+        return None
+    cmd = ['ffmpeg', '-y', '-ss', f"{start:.6f}", '-i', video_path, '-t', f"{duration:.6f}",
+           '-map', '0:v:0', '-an', *x264_args(**TAIL_PROFILE), '-profile:v', profile]
+    if info.get("level"):
+        cmd += ['-level', f"{info['level'] / 10:.1f}"]
+    if info.get("bit_rate"):
+        # Keep the tail in the source's bitrate class (and within its level's buffer limits)
+        cmd += ['-maxrate', str(info["bit_rate"]), '-bufsize', str(2 * info["bit_rate"])]
+    if info["pix_fmt"]:
+        cmd += ['-pix_fmt', info["pix_fmt"]]
+    if info["frame_rate"] and info["frame_rate"] != '0/0':
+        cmd += ['-r', info["frame_rate"]]
+    if info["time_base"] and '/' in info["time_base"]:
+        cmd += ['-video_track_timescale', info["time_base"].split('/')[1]]
+    cmd.append(output_path)
+    result = run_ffmpeg(cmd)
+    if result.returncode != 0:
+        print(f"FFmpeg tail encode error: {result.stderr[-1000:]}")
+        return None
+    if _extradata_hash(output_path) != info["extradata_hash"]:
+        # Typically a source from another encoder or other x264 settings
+        print("GOP copy: tail parameter sets differ from the source's, skipping")
+        return None
+    return output_path
+
+
+def verify_video(path, duration, splice=None, tolerance=0.1):
+    """
+    Sanity check of a spliced output: its length is duration (within tolerance) and, with splice
+    (seconds), the second around the splice decodes without errors. Catches broken concat lists and
+    bad cuts; it is not a conformance check (ffmpeg accepts parameter-set changes other decoders reject).
+    """
+    try:
+        probe = subprocess.run(['ffprobe', '-v', 'error', '-show_entries', 'format=duration',
+                                '-of', 'default=noprint_wrappers=1:nokey=1', path],
+                               capture_output=True, text=True)
+        actual = float(probe.stdout.strip())
+    except (OSError, ValueError):
+        return False
+    if abs(actual - duration) > tolerance:
+        print(f"Check of {os.path.basename(path)}: {actual:.3f}s instead of {duration:.3f}s")
+        return False
+    if splice is None:
+        return True
+    result = run_ffmpeg(['ffmpeg', '-v', 'error', '-xerror', '-ss', f"{max(0.0, splice - 0.5):.6f}", '-i', path,
+                         '-t', '1', '-map', '0:v', '-f', 'null', '-'], outputs=[])
+    if result.returncode != 0 or result.stderr.strip():
+        print(f"Check of {os.path.basename(path)}: decode errors at the splice: {result.stderr[-500:]}")
+        return False
+    return True
+
+
+def gop_copy_concat(video_path, duration, scratch):
+    """
+    A concat-demuxer list that plays video_path for exactly duration seconds with minimal encoding:
+    whole copies of the source while it fits (looping), then the GOPs of the remainder up to its last
+    keyframe, stream-copied, and only the frames after that keyframe re-encoded.
+    Returns (list path, splice), splice being where the re-encoded tail starts in seconds (None when
+    everything is copied), or None when the source is not H.264, has no keyframe index, or the tail
+    cannot be encoded with the source's parameter sets (callers fall back to a plain trim or re-encode).
+    """
+    info = probe_video_stream(video_path)
+    if not info or info["codec"] != 'h264' or not info["keyframes"] or info["duration"] <= 0:
+        return None
+
+    frame = _frame_seconds(info)
+    source = os.path.abspath(video_path).replace("'", r"'\''")
+    entries = []
+    splice = None
+    loops = int((duration + frame / 2) // info["duration"])
+    entries += [f"file '{source}'\nduration {info['duration']:.6f}"] * loops
+
+    remainder = duration - loops * info["duration"]
+    if remainder > frame / 2:
+        pts, dts = max((k for k in info["keyframes"] if k[0] <= remainder + frame / 2), default=(0.0, 0.0))
+        if pts > 0:
+            # outpoint is compared with decode timestamps: stop right before the keyframe's packet
+            entries.append(f"file '{source}'\noutpoint {dts + info['start']:.6f}\nduration {pts:.6f}")
+        if remainder - pts > frame / 2:
+            tail = _encode_tail(video_path, info, pts + info["start"], remainder - pts, scratch.path('.mp4', large=True))
+            if tail is None:
+                return None
+            entries.append(f"file '{tail}'\nduration {remainder - pts:.6f}")
+            splice = loops * info["duration"] + pts
+
+    if not entries:
+        return None
+    list_path = scratch.path('.txt')
+    with open(list_path, 'w', encoding='utf-8') as f:
+        f.write("ffconcat version 1.0\n" + "\n".join(entries) + "\n")
+    return list_path, splice
+
+
+# Clips per xfade graph before create_slideshow_video switches to segmented rendering
+SLIDESHOW_GROUP_SIZE = 8
+
+
+def build_xfade_chain(num_clips, display_time, transition_duration, out_label='vfinal'):
+    """
+    Builds the linear xfade filter chain over inputs 0..num_clips-1, each display_time long,
+    overlapping by transition_duration. The result is labelled [out_label].
+    """
+    filter_parts = []
+    offset = display_time - transition_duration
+    prev_label = '0:v'
+    
+    for i in range(1, num_clips):
+        next_label = f'vout{i}' if i < num_clips - 1 else out_label
+        filter_parts.append(f'[{prev_label}][{i}:v]xfade=transition=fade:duration={transition_duration}:offset={offset:.3f}[{next_label}]')
+        prev_label = next_label
+        offset += display_time - transition_duration
+    
+    return ';'.join(filter_parts)
+
+
+def render_xfade_segment(clips, display_time, transition_duration, fps, output_path, trim_frames=None, threads=None):
+    """
+    Renders clips joined by xfade into output_path.
+    trim_frames: optional (start_frame, end_frame) kept from the chain output, in output frames.
+    threads: x264 threads (default: ffmpeg's choice)
+    Returns True on success.
+    """
+    
+    input_args = []
+    for clip in clips:
+        input_args.extend(['-i', clip])
+    
+    if trim_frames:
+        filter_complex = build_xfade_chain(len(clips), display_time, transition_duration, out_label='vchain')
+        start_frame, end_frame = trim_frames
+        filter_complex += f';[vchain]trim=start_frame={start_frame}:end_frame={end_frame},setpts=PTS-STARTPTS[vfinal]'
+    else:
+        filter_complex = build_xfade_chain(len(clips), display_time, transition_duration)
+    
+    cmd = [
+        'ffmpeg', '-y',
+        *input_args,
+        '-filter_complex', filter_complex,
+        '-map', '[vfinal]',
+        *x264_args(),
+        '-pix_fmt', 'yuv420p',
+        '-r', str(fps),
+    ]
+    if threads:
+        cmd += ['-threads', str(threads)]
+    cmd.append(output_path)
+    
+    result = run_ffmpeg(cmd)
+    if result.returncode != 0:
+        print(f"FFmpeg error: {result.stderr}")
+        return False
+    return True
+
+
+def plan_slideshow_segments(num_clips, display_time, transition_duration, fps, group_size=SLIDESHOW_GROUP_SIZE):
+    """
+    Splits a num_clips xfade slideshow into independently renderable segments.
+    
+    Clip i occupies [i*step, i*step + display_time] with step = display_time - transition_duration,
+    so between transitions each clip shows alone for display_time - 2*transition_duration.
+    Consecutive groups share one clip and are cut at the frame-aligned middle of that clip's
+    solo stretch, where both groups render identical frames, so the joined segments match
+    the single-graph render frame for frame.
+    
+    Returns a list of (first_clip, last_clip, start_frame, end_frame) with frames local to the
+    group's own chain, or None when the slideshow fits one graph or has no solo stretch to cut in.
+    """
+    if group_size < 2 or num_clips <= group_size:
+        return None
+    if display_time - 2 * transition_duration < 1.0 / fps:
+        return None
+    
+    step = display_time - transition_duration
+    total_frames = int(round((num_clips * display_time - (num_clips - 1) * transition_duration) * fps))
+    
+    segments = []
+    first = 0
+    cut_frame = 0
+    while first < num_clips - 1:
+        last = min(first + group_size - 1, num_clips - 1)
+        if last == num_clips - 1:
+            next_cut = total_frames
+        else:
+            next_cut = int(round((last * step + display_time / 2) * fps))
+        # Frames are counted from the start of this group's first clip
+        local_start = int(round(cut_frame - first * step * fps))
+        segments.append((first, last, local_start, local_start + next_cut - cut_frame))
+        first = last
+        cut_frame = next_cut
+    return segments
+
+
+def render_slideshow_segments(clips, segments, display_time, transition_duration, fps, output_path, work_dir, max_workers=None):
+    """
+    Renders the segments from plan_slideshow_segments in parallel, then joins them with the
+    concat demuxer without re-encoding. A failed segment is retried once. Returns True on success.
+    max_workers: segments rendered at once (default: half the CPU cores, x264 threads split between them)
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    
+    def render(index):
+        first, last, start_frame, end_frame = segments[index]
+        segment_path = os.path.join(work_dir, f"segment_{index:04d}.mp4")
+        for attempt in range(2):
+            if render_xfade_segment(clips[first:last + 1], display_time, transition_duration, fps,
+                                    segment_path, trim_frames=(start_frame, end_frame), threads=threads_per_encoder):
+                return segment_path
+            if is_cancelled():
+                return None
+            print(f"Slideshow segment {index} failed (attempt {attempt + 1})")
+        return None
+    
+    cpus = os.cpu_count() or 1
+    workers = max(1, min(len(segments), max_workers or max(1, cpus // 2)))
+    threads_per_encoder = max(1, cpus // workers)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        # Workers inherit the caller's ffmpeg_job so a cancel stops every segment
+        futures = [submit_in_context(executor, render, i) for i in range(len(segments))]
+        segment_paths = [future.result() for future in futures]
+    
+    if not all(segment_paths):
+        return False
+    
+    list_path = os.path.join(work_dir, "segments.txt")
+    with open(list_path, 'w', encoding='utf-8') as f:
+        for path in segment_paths:
+            escaped = path.replace("'", "'\\''")
+            f.write(f"file '{escaped}'\n")
+    
+    cmd = ['ffmpeg', '-y', '-f', 'concat', '-safe', '0', '-i', list_path, '-c', 'copy', output_path]
+    result = run_ffmpeg(cmd)
+    if result.returncode != 0:
+        print(f"FFmpeg concat error: {result.stderr}")
+        return False
+    return True
+
+
+@traced("slideshow")
+def create_slideshow_video(image_folder, audio_duration, output_path, transition_duration=0.5, fps=30, image_duration=3.0,
+                           group_size=SLIDESHOW_GROUP_SIZE, max_workers=None):
     """
     Create a slideshow video from images AND videos in a folder with fade transitions.
     
@@ -400,13 +991,15 @@ def create_slideshow_video(image_folder, audio_duration, output_path, transition
         transition_duration: Duration of fade transition between items (default 0.5s)
         fps: Frames per second for output video
         image_duration: Duration each image is displayed in seconds (default 3.0s)
+        group_size: Clips per xfade graph. Longer slideshows are rendered as parallel
+                    segments of this many clips and joined losslessly (see plan_slideshow_segments)
+        max_workers: Parallel segment renders (default: half the CPU cores)
     
     Returns:
         output_path on success, None on failure
     """
     import subprocess
     import glob
-    import tempfile
     
     # 9:16 aspect ratio (portrait/vertical video for TikTok, Reels, etc.)
     WIDTH = 1080
@@ -467,13 +1060,15 @@ def create_slideshow_video(image_folder, audio_duration, output_path, transition
         
         print(f"Using {N} media slots, {display_time:.2f}s each, transition: {transition_duration}s, resolution: {WIDTH}x{HEIGHT} (9:16)")
         
-        # Create temporary directory for intermediate files
-        temp_dir = tempfile.mkdtemp()
+        # Private scratch directory for intermediate clips
+        scratch = scratch_space("slideshow")
         temp_clips = []
         
         try:
+            temp_dir = scratch.mkdir("clips")
             # Pre-process each media item to a standardized clip
             for i, media in enumerate(media_list):
+                scratch.check_quota()
                 temp_clip_path = os.path.join(temp_dir, f"clip_{i:04d}.mp4")
                 
                 if media['type'] == 'image':
@@ -485,9 +1080,7 @@ def create_slideshow_video(image_folder, audio_duration, output_path, transition
                         '-framerate', str(fps),
                         '-i', media['path'],
                         '-vf', f'scale={WIDTH}:{HEIGHT}:flags=lanczos:force_original_aspect_ratio=decrease,pad={WIDTH}:{HEIGHT}:(ow-iw)/2:(oh-ih)/2,setsar=1,unsharp=5:5:1.0:5:5:0.0,format=yuv420p',
-                        '-c:v', 'libx264',
-                        '-preset', 'medium',
-                        '-crf', '18',
+                        *x264_args(),
                         '-pix_fmt', 'yuv420p',
                         '-r', str(fps),
                         '-an',
@@ -500,16 +1093,14 @@ def create_slideshow_video(image_folder, audio_duration, output_path, transition
                         '-i', media['path'],
                         '-t', str(display_time),
                         '-vf', f'scale={WIDTH}:{HEIGHT}:flags=lanczos:force_original_aspect_ratio=decrease,pad={WIDTH}:{HEIGHT}:(ow-iw)/2:(oh-ih)/2,setsar=1,unsharp=5:5:1.0:5:5:0.0,format=yuv420p,fps={fps}',
-                        '-c:v', 'libx264',
-                        '-preset', 'medium',
-                        '-crf', '18',
+                        *x264_args(),
                         '-pix_fmt', 'yuv420p',
                         '-r', str(fps),
                         '-an',
                         temp_clip_path
                     ]
                 
-                result = subprocess.run(cmd, capture_output=True, text=True)
+                result = run_ffmpeg(cmd)
                 if result.returncode != 0:
                     print(f"Error processing media {i}: {result.stderr}")
                     continue
@@ -527,48 +1118,19 @@ def create_slideshow_video(image_folder, audio_duration, output_path, transition
                 import shutil
                 shutil.copy(temp_clips[0], output_path)
             else:
-                # Combine clips with xfade transitions
-                input_args = []
-                for clip in temp_clips:
-                    input_args.extend(['-i', clip])
-                
-                # Build filter complex for xfade
-                filter_parts = []
-                offset = display_time - transition_duration
-                prev_label = '0:v'
-                
-                for i in range(1, N):
-                    next_label = f'vout{i}' if i < N - 1 else 'vfinal'
-                    filter_parts.append(f'[{prev_label}][{i}:v]xfade=transition=fade:duration={transition_duration}:offset={offset:.3f}[{next_label}]')
-                    prev_label = next_label
-                    offset += display_time - transition_duration
-                
-                filter_complex = ';'.join(filter_parts)
-                
-                cmd = [
-                    'ffmpeg', '-y',
-                    *input_args,
-                    '-filter_complex', filter_complex,
-                    '-map', '[vfinal]',
-                    '-c:v', 'libx264',
-                    '-preset', 'medium',
-                    '-crf', '18',
-                    '-pix_fmt', 'yuv420p',
-                    '-r', str(fps),
-                    output_path
-                ]
-                
-                result = subprocess.run(cmd, capture_output=True, text=True)
-                if result.returncode != 0:
-                    print(f"FFmpeg error: {result.stderr}")
+                segments = plan_slideshow_segments(N, display_time, transition_duration, fps, group_size)
+                if segments:
+                    print(f"Rendering {N} clips as {len(segments)} parallel segments of up to {group_size} clips")
+                    if not render_slideshow_segments(temp_clips, segments, display_time, transition_duration,
+                                                     fps, output_path, temp_dir, max_workers=max_workers):
+                        return None
+                elif not render_xfade_segment(temp_clips, display_time, transition_duration, fps, output_path):
                     return None
             
             return output_path
             
         finally:
-            # Cleanup temp files
-            import shutil
-            shutil.rmtree(temp_dir, ignore_errors=True)
+            scratch.cleanup()
         
     except subprocess.CalledProcessError as e:
         print(f"FFmpeg error creating slideshow: {e.stderr}")
@@ -578,6 +1140,7 @@ def create_slideshow_video(image_folder, audio_duration, output_path, transition
         return None
 
 
+@traced("overlay_logo")
 def overlay_logo(video_path, logo_path, output_path, position=None, logo_scale=0.15, logger=None):
     """
     Overlay a logo image onto a video at specified position.
@@ -593,6 +1156,7 @@ def overlay_logo(video_path, logo_path, output_path, position=None, logo_scale=0
     Returns:
         output_path on success, None on failure
     """
+    import ffmpeg
     def log(msg):
         if logger:
             logger(msg)
@@ -631,11 +1195,10 @@ def overlay_logo(video_path, logo_path, output_path, position=None, logo_scale=0
         output = ffmpeg.overlay(input_video, logo_scaled, x=x, y=y)
         
         # Output with audio
-        (
+        run_stream(
             ffmpeg
-            .output(output, input_video.audio, output_path, vcodec='libx264', preset='medium', crf='18', acodec='copy')
+            .output(output, input_video.audio, output_path, acodec='copy', **x264_kwargs())
             .overwrite_output()
-            .run(capture_stdout=True, capture_stderr=True)
         )
         
         return output_path
@@ -648,6 +1211,217 @@ def overlay_logo(video_path, logo_path, output_path, position=None, logo_scale=0
         return None
 
 
+# Fan-out rendering: frames held per branch (filter queues + x264 lookahead/refs) and fixed
+# per-encoder overhead, used to cap how many outputs one ffmpeg process may carry.
+FANOUT_FRAMES_PER_BRANCH = 64
+FANOUT_BRANCH_OVERHEAD = 64 * 1024 * 1024
+FANOUT_MEMORY_FRACTION = 0.75
+
+
+def available_memory_bytes():
+    """Returns currently available physical memory in bytes, or None if it cannot be determined."""
+    try:
+        with open('/proc/meminfo', 'r') as f:
+            for line in f:
+                if line.startswith('MemAvailable:'):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError):
+        pass
+    try:
+        return os.sysconf('SC_AVPHYS_PAGES') * os.sysconf('SC_PAGE_SIZE')
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def fanout_branch_limit(width, height, max_branches=None):
+    """
+    How many output branches a single fan-out ffmpeg process may carry for a width x height source,
+    bounded by available memory and CPU cores (each branch runs its own encoder).
+    """
+    per_branch = width * height * 1.5 * FANOUT_FRAMES_PER_BRANCH + FANOUT_BRANCH_OVERHEAD
+    limit = os.cpu_count() or 1
+    available = available_memory_bytes()
+    if available:
+        limit = min(limit, int(available * FANOUT_MEMORY_FRACTION // per_branch))
+    if max_branches:
+        limit = min(limit, max_branches)
+    return max(1, limit)
+
+
+@traced("fanout")
+def render_fanout(video_path, branches, logo_path=None, logo_position=None, logo_scale=0.15,
+                  music_path=None, music_volume=0.15, max_branches=None, logger=None):
+    """
+    Renders several outputs (e.g. one per language) from a single decode of video_path.
+    The source is decoded once and split; the logo is scaled and sharpened once and shared;
+    each branch then gets its own subtitles, audio and duration.
+    Branches are batched so that one process never carries more than fanout_branch_limit().
+    Branches with nothing to burn in (no subtitles, no logo) skip the decode entirely and are
+    muxed by merge_audio_video, which stream-copies the video.
+
+    Each branch is a dict:
+        output_path:    where to write the branch
+        duration:       output length in seconds (None = source length); the source loops if shorter
+        audio_path:     speech track (None = no audio)
+        music:          True to mix the looped music_path under the speech (bg_music mode)
+        subtitle_path:  .ass or .srt to burn (None = no subtitles)
+        font_settings / margin_v: style for .srt subtitles (see burn_subtitles)
+
+    Returns a list with output_path or None for each branch, in order.
+    """
+    import ffmpeg
+    from core.loudness import mastering_graph
+
+    def log(msg):
+        if logger:
+            logger(msg)
+        print(msg)
+
+    try:
+        probe = ffmpeg.probe(video_path)
+        video_stream = next((stream for stream in probe['streams'] if stream['codec_type'] == 'video'), None)
+        video_width = int(video_stream['width']) if video_stream else 1080
+        video_height = int(video_stream['height']) if video_stream else 1920
+        video_duration = float(probe['format']['duration'])
+    except (ffmpeg.Error, KeyError, ValueError) as e:
+        log(f"Fan-out render: failed to probe source video: {e}")
+        return [None] * len(branches)
+
+    if logo_path and not os.path.exists(logo_path):
+        logo_path = None
+    if music_path and not os.path.exists(music_path):
+        music_path = None
+    if logo_position is None:
+        logo_position = {"x": 50, "y": 50}
+
+    results = [None] * len(branches)
+    filtered = []
+    for index, branch in enumerate(branches):
+        mode = _copy_mode(branch, logo_path)
+        if mode is None:
+            filtered.append(index)
+            continue
+        log(f"Fan-out render: {os.path.basename(branch['output_path'])} has no overlays, muxing without re-encode")
+        results[index] = merge_audio_video(video_path, branch['audio_path'], branch['output_path'], mode=mode,
+                                           music_path=music_path if branch.get('music') else None,
+                                           music_volume=music_volume)
+
+    limit = fanout_branch_limit(video_width, video_height, max_branches)
+    threads_per_encoder = max(1, (os.cpu_count() or 1) // min(limit, len(filtered) or 1))
+    if filtered:
+        log(f"Fan-out render: {len(filtered)} outputs, up to {limit} per ffmpeg process")
+
+    for batch_start in range(0, len(filtered), limit):
+        batch_indices = filtered[batch_start:batch_start + limit]
+        batch = [branches[index] for index in batch_indices]
+        n = len(batch)
+
+        durations = [b.get('duration') or video_duration for b in batch]
+        inputs = []
+        if max(durations) > video_duration + 0.01:
+            inputs.extend(['-stream_loop', '-1'])
+        inputs.extend(['-i', video_path])
+        next_input = 1
+
+        filters = []
+        if n > 1:
+            filters.append(f"[0:v]split={n}" + "".join(f"[src{i}]" for i in range(n)))
+        else:
+            filters.append("[0:v]null[src0]")
+
+        if logo_path:
+            inputs.extend(['-i', logo_path])
+            logo_width = int(video_width * logo_scale)
+            # Scale logo with high-quality Lanczos algorithm and sharpening, once for every branch
+            filters.append(
+                f"[{next_input}:v]scale={logo_width}:-1:flags=lanczos,unsharp=5:5:1.0:5:5:0.0,"
+                f"split={n}" + "".join(f"[logo{i}]" for i in range(n))
+            )
+            next_input += 1
+
+        speech_inputs = {}
+        for i, branch in enumerate(batch):
+            if branch.get('audio_path'):
+                inputs.extend(['-i', branch['audio_path']])
+                speech_inputs[i] = next_input
+                next_input += 1
+
+        music_branches = [i for i in speech_inputs if music_path and batch[i].get('music')]
+        if music_branches:
+            # One music decode split per branch; each branch levels and ducks its copy (see mastering_graph)
+            inputs.extend(['-stream_loop', '-1', '-i', music_path])
+            filters.append(
+                f"[{next_input}:a]asplit={len(music_branches)}"
+                + "".join(f"[music{i}]" for i in music_branches)
+            )
+            next_input += 1
+
+        output_args = []
+        for i, branch in enumerate(batch):
+            chain = f"[src{i}]"
+            if branch.get('subtitle_path'):
+                chain += subtitles_filter(branch['subtitle_path'], branch.get('font_settings'),
+                                          margin_v=branch.get('margin_v')) + f"[sub{i}];[sub{i}]"
+            if logo_path:
+                chain += f"[logo{i}]overlay=x={logo_position.get('x', 50)}:y={logo_position.get('y', 50)}"
+            else:
+                chain += "null"
+            filters.append(chain + f"[v{i}]")
+
+            output_args.extend(['-map', f"[v{i}]"])
+            audio_graph = None
+            if i in speech_inputs:
+                # Same mastering as merge_audio_video: loudness target, ducked music bed
+                audio_graph = mastering_graph((f"{speech_inputs[i]}:a", branch['audio_path']),
+                                              (f"music{i}", music_path) if i in music_branches else None,
+                                              music_volume=music_volume, out_label=f"a{i}")
+            if audio_graph:
+                filters.append(audio_graph)
+                output_args.extend(['-map', f"[a{i}]", '-c:a', 'aac', '-b:a', '192k'])
+            elif i in speech_inputs:
+                # Speech that is already AAC (and on target) is muxed as-is, like merge_audio_video
+                audio_codec = 'copy' if get_audio_codec(branch['audio_path']) == 'aac' else 'aac'
+                output_args.extend(['-map', f"{speech_inputs[i]}:a", '-c:a', audio_codec])
+            else:
+                output_args.append('-an')
+            output_args.extend([
+                '-t', str(durations[i]),
+                *x264_args(),
+                '-threads', str(threads_per_encoder),
+                branch['output_path']
+            ])
+
+        cmd = ['ffmpeg', '-y'] + inputs + ['-filter_complex', ";".join(filters)] + output_args
+        log(f"Fan-out render: batch of {n} from one decode")
+        result = run_ffmpeg(cmd, duration=max(durations),
+                            outputs=[b['output_path'] for b in batch])
+        if result.returncode != 0:
+            log(f"FFmpeg fan-out error: {result.stderr[-2000:]}")
+        else:
+            for index, branch in zip(batch_indices, batch):
+                results[index] = branch['output_path']
+
+    return results
+
+
+def _copy_mode(branch, logo_path):
+    """
+    merge_audio_video mode that produces a fan-out branch without filtering its video,
+    or None when the branch has to go through the filter graph.
+    """
+    if branch.get('subtitle_path') or logo_path or not branch.get('audio_path'):
+        return None
+    if branch.get('duration') is None:
+        return "bg_music"  # source length, music (if any) under the speech
+    if branch.get('music'):
+        return None
+    # Trim mode cuts to the speech, so the requested length has to be the speech length
+    audio_duration = get_audio_duration(branch['audio_path'])
+    if audio_duration is not None and abs(audio_duration - branch['duration']) < 0.05:
+        return "trim"
+    return None
+
+
 def concatenate_videos(video_paths, output_path, logger=None):
     """
     Concatenate multiple videos into a single video file.
@@ -660,9 +1434,6 @@ def concatenate_videos(video_paths, output_path, logger=None):
     Returns:
         output_path on success, None on failure
     """
-    import subprocess
-    import tempfile
-    
     def log(msg):
         if logger:
             logger(msg)
@@ -678,14 +1449,15 @@ def concatenate_videos(video_paths, output_path, logger=None):
         shutil.copy(video_paths[0], output_path)
         return output_path
     
+    scratch = scratch_space("concat")
     try:
-        # Create a temporary file list for ffmpeg concat demuxer
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.txt', delete=False) as f:
+        # File list for the ffmpeg concat demuxer (used by both attempts)
+        list_file = scratch.path('.txt')
+        with open(list_file, 'w', encoding='utf-8') as f:
             for vp in video_paths:
                 # Escape single quotes in path
                 escaped_path = vp.replace("'", "'\\''")
                 f.write(f"file '{escaped_path}'\n")
-            list_file = f.name
         
         log(f"Concatenating {len(video_paths)} videos...")
         
@@ -699,44 +1471,24 @@ def concatenate_videos(video_paths, output_path, logger=None):
             output_path
         ]
         
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        
-        # Cleanup temp file
-        try:
-            os.remove(list_file)
-        except:
-            pass
+        result = run_ffmpeg(cmd)
         
         if result.returncode != 0:
             log(f"FFmpeg concat error: {result.stderr}")
             # Try re-encoding if copy fails
             log("Trying with re-encoding...")
             
-            # Re-create list file
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.txt', delete=False) as f:
-                for vp in video_paths:
-                    escaped_path = vp.replace("'", "'\\''")
-                    f.write(f"file '{escaped_path}'\n")
-                list_file = f.name
-            
             cmd = [
                 'ffmpeg', '-y',
                 '-f', 'concat',
                 '-safe', '0',
                 '-i', list_file,
-                '-c:v', 'libx264',
-                '-preset', 'medium',
-                '-crf', '18',
+                *x264_args(),
                 '-c:a', 'aac',
                 output_path
             ]
             
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            
-            try:
-                os.remove(list_file)
-            except:
-                pass
+            result = run_ffmpeg(cmd)
             
             if result.returncode != 0:
                 log(f"FFmpeg re-encode error: {result.stderr}")
@@ -748,6 +1500,8 @@ def concatenate_videos(video_paths, output_path, logger=None):
     except Exception as e:
         log(f"Error concatenating videos: {e}")
         return None
+    finally:
+        scratch.cleanup()
 
 
 def insert_multiple_overlays(video_path, overlay_schedule, output_path, fade_duration=0.0, logger=None):
@@ -772,7 +1526,7 @@ def insert_multiple_overlays(video_path, overlay_schedule, output_path, fade_dur
     Returns:
         output_path on success, None on failure
     """
-    import subprocess
+    import ffmpeg
 
     def log(msg):
         if logger:
@@ -843,13 +1597,13 @@ def insert_multiple_overlays(video_path, overlay_schedule, output_path, fade_dur
             '-filter_complex', filter_complex,
             '-map', current_stream,
             '-map', '0:a?',
-            '-c:v', 'libx264', '-preset', 'medium', '-crf', '18',
+            *x264_args(),
             '-c:a', 'aac',
             output_path
         ])
 
         log(f"Running FFmpeg with {len(overlay_schedule)} overlays...")
-        result = subprocess.run(cmd, capture_output=True, text=True)
+        result = run_ffmpeg(cmd)
 
         if result.returncode != 0:
             log(f"FFmpeg error: {result.stderr[:500]}")
@@ -882,7 +1636,7 @@ def insert_overlay_with_fade(video_path, overlay_path, output_path, start_time=2
     Returns:
         output_path on success, None on failure
     """
-    import subprocess
+    import ffmpeg
     
     def log(msg):
         if logger:
@@ -919,7 +1673,7 @@ def insert_overlay_with_fade(video_path, overlay_path, output_path, start_time=2
                 f"[main2]trim={start_time+duration},setpts=PTS-STARTPTS[after];"
                 f"[before][middle][after]concat=n=3:v=1:a=0[outv]",
                 '-map', '[outv]', '-map', '0:a?',
-                '-c:v', 'libx264', '-preset', 'medium', '-crf', '18', '-c:a', 'aac',
+                *x264_args(), '-c:a', 'aac',
                 output_path
             ]
         else:
@@ -937,11 +1691,11 @@ def insert_overlay_with_fade(video_path, overlay_path, output_path, start_time=2
                 f"[main2]trim={start_time+duration},setpts=PTS-STARTPTS[after];"
                 f"[before][insert][after]concat=n=3:v=1:a=0[outv]",
                 '-map', '[outv]', '-map', '0:a?',
-                '-c:v', 'libx264', '-preset', 'medium', '-crf', '18', '-c:a', 'aac',
+                *x264_args(), '-c:a', 'aac',
                 output_path
             ]
         
-        result = subprocess.run(cmd, capture_output=True, text=True)
+        result = run_ffmpeg(cmd)
         
         if result.returncode != 0:
             log(f"FFmpeg overlay error: {result.stderr[:500]}")
@@ -973,35 +1727,27 @@ def burn_subtitles_for_news(video_path, subtitle_text, output_path, mode="senten
     Returns:
         output_path on success, None on failure
     """
-    import subprocess
-    import tempfile
-    
     def log(msg):
         if logger:
             logger(msg)
         print(msg)
     
+    scratch = scratch_space("news_subtitles")
     try:
         from core.subtitles import generate_subtitles, save_srt
         
         log(f"Generating subtitles in {mode} mode...")
         log(f"Subtitle settings: margin={margin}px, color={color}, fontsize={fontsize}px")
         
-        # Extract audio from video
-        audio_temp = tempfile.NamedTemporaryFile(suffix='.wav', delete=False).name
-        cmd = ['ffmpeg', '-y', '-i', video_path, '-vn', '-acodec', 'pcm_s16le', '-ar', '16000', audio_temp]
-        subprocess.run(cmd, capture_output=True)
-        
-        # Generate subtitles using Whisper
-        segments = generate_subtitles(audio_temp, mode=mode, model_size="base")
+        # Generate subtitles using Whisper (audio is decoded straight from the video through a pipe)
+        segments = generate_subtitles(video_path, mode=mode, model_size="base")
         
         if not segments:
             log("No subtitles generated")
-            os.remove(audio_temp)
             return None
         
         # Save SRT file
-        srt_temp = tempfile.NamedTemporaryFile(suffix='.srt', delete=False).name
+        srt_temp = scratch.path('.srt')
         save_srt(segments, srt_temp)
         
         log(f"Generated {len(segments)} subtitle segments")
@@ -1029,14 +1775,10 @@ def burn_subtitles_for_news(video_path, subtitle_text, output_path, mode="senten
         }
         
         # Pass margin as separate parameter (margin_v)
-        result = burn_subtitles(video_path, srt_temp, font_settings, output_path, margin_v=margin, logger=logger)
-        
-        # Cleanup
-        os.remove(audio_temp)
-        os.remove(srt_temp)
-        
-        return result
+        return burn_subtitles(video_path, srt_temp, font_settings, output_path, margin_v=margin, logger=logger)
         
     except Exception as e:
         log(f"Error burning subtitles: {e}")
         return None
+    finally:
+        scratch.cleanup()
@@ -1,13 +1,28 @@
 import os
-import tempfile
+import shutil
 import subprocess
 import json
-from core.subtitles import generate_subtitles, save_srt
-from core.translation import translate_text
+import threading
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor
+from core.subtitles import save_srt, generate_subtitles
+from core.transcripts import transcribe, get_transcript, transcript_subtitles
+from core.translation import translate_text, translate_texts
 from core.tts import generate_audio
 from core.video import burn_subtitles, merge_audio_video
+from core.ffmpeg_runner import run_ffmpeg, submit_in_context, is_cancelled
+from core.encoding import x264_args
+from core.instrumentation import traced, span
+from core.scratch import scratch_space
+from core.utils import create_manifest, generate_id
 
+# Batch mode (translate_video_batch): Gemini requests (translation, TTS) in flight at once
+BATCH_API_CONCURRENCY = 4
+# Cores one x264 render keeps busy; batch mode runs about cpu_count / this renders at once
+ENCODE_THREADS_PER_JOB = 4
 
+
+@traced("ffprobe")
 def get_video_dimensions(video_path):
     """
     Get video width and height using ffprobe.
@@ -32,6 +47,7 @@ def get_video_dimensions(video_path):
     return None, None
 
 
+@traced("letterbox")
 def add_letterbox_if_horizontal(video_path, output_path, target_height=1920, logger=None):
     """
     If video is horizontal (landscape), add black bars to make it vertical (9:16).
@@ -88,10 +104,11 @@ def add_letterbox_if_horizontal(video_path, output_path, target_height=1920, log
             'ffmpeg', '-y',
             '-i', video_path,
             '-vf', f'pad={new_width}:{new_height}:0:{pad_top}:black',
+            *x264_args(),
             '-c:a', 'copy',
             output_path
         ]
-        result = subprocess.run(cmd, capture_output=True, text=True)
+        result = run_ffmpeg(cmd)
 
         if result.returncode != 0:
             log(f"FFmpeg letterbox error: {result.stderr}")
@@ -105,6 +122,7 @@ def add_letterbox_if_horizontal(video_path, output_path, target_height=1920, log
         return None
 
 
+@traced("extract_audio")
 def extract_audio_from_video(video_path, output_audio_path):
     """
     Extract audio from video file to WAV format for transcription.
@@ -118,7 +136,7 @@ def extract_audio_from_video(video_path, output_audio_path):
             '-ar', '16000',
             output_audio_path
         ]
-        result = subprocess.run(cmd, capture_output=True, text=True)
+        result = run_ffmpeg(cmd)
         if result.returncode != 0:
             print(f"FFmpeg audio extraction error: {result.stderr}")
             return None
@@ -128,19 +146,25 @@ def extract_audio_from_video(video_path, output_audio_path):
         return None
 
 
+@traced("translate_video_subtitles")
 def translate_video_subtitles(video_path, target_language, api_key, output_video_path=None,
-                               font_settings=None, margin_v=None, sub_mode='sentence', logger=None):
+                               font_settings=None, margin_v=None, sub_mode='sentence', logger=None,
+                               source=None, translations=None, scheduler=None):
     """
     Mode 1: Subtitle-only translation
 
     Args:
         sub_mode: 'sentence' for sentence-level or 'word' for word-level subtitles
+        source: prepare_translation_source() result shared by several targets (skips steps 1, 2 and 4)
+        translations: translated text per subtitle segment (skips step 3)
+        scheduler: BatchScheduler limiting concurrent API calls and renders
     """
     def log(msg):
         if logger:
             logger(msg)
         print(msg)
 
+    scratch = scratch_space("subtitle_translation")
     try:
         log("=== Starting Subtitle Translation Mode ===")
         log(f"Target Language: {target_language}")
@@ -157,20 +181,18 @@ def translate_video_subtitles(video_path, target_language, api_key, output_video
                 'PrimaryColour': '#FFFFFF'
             }
 
-        log("Step 1/5: Extracting audio from video...")
-        audio_temp = tempfile.NamedTemporaryFile(suffix='.wav', delete=False).name
-        audio_result = extract_audio_from_video(video_path, audio_temp)
-
-        if not audio_result:
-            log("Failed to extract audio from video")
-            return None
-
-        log("Step 2/5: Transcribing audio with Whisper...")
-        segments = generate_subtitles(audio_temp, mode=sub_mode, model_size='base')
+        if source is None:
+            # Audio is decoded from the video through a pipe in bounded pieces, no WAV file;
+            # speech chunks found by VAD are transcribed in parallel. The transcript store
+            # reuses an earlier pass over the same source (other languages, other sub_mode).
+            log("Step 1/5: Extracting audio from video...")
+            log("Step 2/5: Transcribing audio with Whisper...")
+            segments = transcribe(video_path, mode=sub_mode, model_size='base', long_form=True, logger=logger)
+        else:
+            segments = transcript_subtitles(source["transcript"], sub_mode)
 
         if not segments:
             log("Failed to generate subtitles")
-            os.remove(audio_temp)
             return None
 
         log(f"Generated {len(segments)} subtitle segments")
@@ -180,9 +202,11 @@ def translate_video_subtitles(video_path, target_language, api_key, output_video
 
         for i, segment in enumerate(segments):
             original_text = segment['text']
-            log(f"Translating segment {i+1}/{len(segments)}: {original_text[:50]}...")
-
-            translated_text = translate_text(original_text, target_language, api_key)
+            if translations is not None:
+                translated_text = translations[i]
+            else:
+                log(f"Translating segment {i+1}/{len(segments)}: {original_text[:50]}...")
+                translated_text = translate_text(original_text, target_language, api_key)
 
             if translated_text:
                 translated_segments.append({
@@ -193,31 +217,23 @@ def translate_video_subtitles(video_path, target_language, api_key, output_video
             else:
                 translated_segments.append(segment)
 
-        log("Step 4/5: Applying letterbox if horizontal video...")
-        letterbox_temp = tempfile.NamedTemporaryFile(suffix='.mp4', delete=False).name
-        letterbox_result = add_letterbox_if_horizontal(video_path, letterbox_temp, logger=logger)
+        if source is None:
+            log("Step 4/5: Applying letterbox if horizontal video...")
+            letterbox_temp = scratch.path('.mp4', large=True)
+            letterbox_result = add_letterbox_if_horizontal(video_path, letterbox_temp, logger=logger)
 
-        # Determine which video to use for subtitle burning
-        if letterbox_result and letterbox_result != video_path:
-            video_for_subs = letterbox_result
-            need_cleanup_letterbox = True
+            # Determine which video to use for subtitle burning
+            video_for_subs = letterbox_result if letterbox_result else video_path
         else:
-            video_for_subs = video_path
-            need_cleanup_letterbox = False
-            if os.path.exists(letterbox_temp):
-                os.remove(letterbox_temp)
+            video_for_subs = source["render_video"]
 
         log("Step 5/5: Burning translated subtitles to video...")
-        srt_temp = tempfile.NamedTemporaryFile(suffix='.srt', delete=False).name
+        srt_temp = scratch.path('.srt')
         save_srt(translated_segments, srt_temp)
 
-        result = burn_subtitles(video_for_subs, srt_temp, font_settings, output_video_path,
-                                margin_v=margin_v, logger=logger)
-
-        os.remove(audio_temp)
-        os.remove(srt_temp)
-        if need_cleanup_letterbox and os.path.exists(letterbox_temp):
-            os.remove(letterbox_temp)
+        with _slot(scheduler, "encode"):
+            result = burn_subtitles(video_for_subs, srt_temp, font_settings, output_video_path,
+                                    margin_v=margin_v, logger=logger)
 
         if result:
             log(f"Subtitle translation completed: {output_video_path}")
@@ -227,23 +243,30 @@ def translate_video_subtitles(video_path, target_language, api_key, output_video
     except Exception as e:
         log(f"Error in subtitle translation: {e}")
         return None
+    finally:
+        scratch.cleanup()
 
 
+@traced("translate_video_dubbing")
 def translate_video_dubbing(video_path, target_language, api_key, output_video_path=None,
                             voice="Puck", speech_speed=1.0, voice_prompt="",
                             add_subtitles=False, font_settings=None, margin_v=None,
-                            sub_mode='sentence', logger=None):
+                            sub_mode='sentence', logger=None, source=None, translation=None, scheduler=None):
     """
     Mode 2: Full dubbing (translate audio + replace)
 
     Args:
         sub_mode: 'sentence' for sentence-level or 'word' for word-level subtitles
+        source: prepare_translation_source() result shared by several targets (skips steps 1, 2 and 5)
+        translation: the already translated script (skips step 3)
+        scheduler: BatchScheduler limiting concurrent API calls and renders
     """
     def log(msg):
         if logger:
             logger(msg)
         print(msg)
 
+    scratch = scratch_space("dubbing")
     try:
         log("=== Starting Full Dubbing Mode ===")
         log(f"Target Language: {target_language}")
@@ -254,20 +277,16 @@ def translate_video_dubbing(video_path, target_language, api_key, output_video_p
             base, ext = os.path.splitext(video_path)
             output_video_path = f"{base}_dubbed_{target_language}{ext}"
 
-        log("Step 1/6: Extracting audio from video...")
-        audio_temp = tempfile.NamedTemporaryFile(suffix='.wav', delete=False).name
-        audio_result = extract_audio_from_video(video_path, audio_temp)
-
-        if not audio_result:
-            log("Failed to extract audio from video")
-            return None
-
-        log("Step 2/6: Transcribing audio with Whisper...")
-        segments = generate_subtitles(audio_temp, mode='sentence', model_size='base')
+        if source is None:
+            # Shared with subtitle mode and other languages through the transcript store
+            log("Step 1/6: Extracting audio from video...")
+            log("Step 2/6: Transcribing audio with Whisper...")
+            segments = transcribe(video_path, mode='sentence', model_size='base', long_form=True, logger=logger)
+        else:
+            segments = transcript_subtitles(source["transcript"], 'sentence')
 
         if not segments:
             log("Failed to generate subtitles")
-            os.remove(audio_temp)
             return None
 
         log(f"Generated {len(segments)} subtitle segments")
@@ -275,61 +294,55 @@ def translate_video_dubbing(video_path, target_language, api_key, output_video_p
         log(f"Step 3/6: Translating text to {target_language}...")
         full_text = " ".join([seg['text'] for seg in segments])
 
-        translated_full_text = translate_text(full_text, target_language, api_key)
+        translated_full_text = translation or translate_text(full_text, target_language, api_key)
 
         if not translated_full_text:
             log("Translation failed")
-            os.remove(audio_temp)
             return None
 
         log(f"Translated text: {translated_full_text[:100]}...")
 
         log(f"Step 4/6: Generating TTS audio in {target_language}...")
-        tts_audio_temp = tempfile.NamedTemporaryFile(suffix='.wav', delete=False).name
-
-        tts_result = generate_audio(
-            translated_full_text,
-            target_language,
-            tts_audio_temp,
-            voice=voice,
-            api_key=api_key,
-            speech_speed=speech_speed,
-            voice_prompt=voice_prompt
-        )
+        tts_audio_temp = scratch.path('.wav')
+
+        with _slot(scheduler, "api"):
+            tts_result = generate_audio(
+                translated_full_text,
+                target_language,
+                tts_audio_temp,
+                voice=voice,
+                api_key=api_key,
+                speech_speed=speech_speed,
+                voice_prompt=voice_prompt
+            )
 
         if not tts_result:
             log("Failed to generate TTS audio")
-            os.remove(audio_temp)
             return None
 
-        log("Step 5/6: Applying letterbox if horizontal video...")
-        letterbox_temp = tempfile.NamedTemporaryFile(suffix='.mp4', delete=False).name
-        letterbox_result = add_letterbox_if_horizontal(video_path, letterbox_temp, logger=logger)
+        if source is None:
+            log("Step 5/6: Applying letterbox if horizontal video...")
+            letterbox_temp = scratch.path('.mp4', large=True)
+            letterbox_result = add_letterbox_if_horizontal(video_path, letterbox_temp, logger=logger)
 
-        # Determine which video to use
-        if letterbox_result and letterbox_result != video_path:
-            video_for_merge = letterbox_result
-            need_cleanup_letterbox = True
+            # Determine which video to use
+            video_for_merge = letterbox_result if letterbox_result else video_path
         else:
-            video_for_merge = video_path
-            need_cleanup_letterbox = False
-            if os.path.exists(letterbox_temp):
-                os.remove(letterbox_temp)
+            video_for_merge = source["render_video"]
 
         log("Step 6/6: Replacing audio in video...")
-        video_with_new_audio_temp = tempfile.NamedTemporaryFile(suffix='.mp4', delete=False).name
+        video_with_new_audio_temp = scratch.path('.mp4', large=True)
 
-        merge_result = merge_audio_video(
-            video_for_merge,
-            tts_audio_temp,
-            video_with_new_audio_temp,
-            mode="trim"
-        )
+        with _slot(scheduler, "encode"):
+            merge_result = merge_audio_video(
+                video_for_merge,
+                tts_audio_temp,
+                video_with_new_audio_temp,
+                mode="trim"
+            )
 
         if not merge_result:
             log("Failed to merge video with new audio")
-            os.remove(audio_temp)
-            os.remove(tts_audio_temp)
             return None
 
         if add_subtitles:
@@ -342,38 +355,31 @@ def translate_video_dubbing(video_path, target_language, api_key, output_video_p
                     'PrimaryColour': '#FFFFFF'
                 }
 
-            new_segments = generate_subtitles(tts_audio_temp, language=target_language,
-                                              mode=sub_mode, model_size='base')
+            # One-off TTS track: transcribed directly, not kept in the transcript store
+            with _slot(scheduler, "encode"):
+                new_segments = generate_subtitles(tts_audio_temp, language=target_language,
+                                                  mode=sub_mode, model_size='base')
 
             if new_segments:
-                srt_temp = tempfile.NamedTemporaryFile(suffix='.srt', delete=False).name
+                srt_temp = scratch.path('.srt')
                 save_srt(new_segments, srt_temp)
 
-                final_result = burn_subtitles(
-                    video_with_new_audio_temp,
-                    srt_temp,
-                    font_settings,
-                    output_video_path,
-                    margin_v=margin_v,
-                    logger=logger
-                )
-
-                os.remove(srt_temp)
-                os.remove(video_with_new_audio_temp)
+                with _slot(scheduler, "encode"):
+                    final_result = burn_subtitles(
+                        video_with_new_audio_temp,
+                        srt_temp,
+                        font_settings,
+                        output_video_path,
+                        margin_v=margin_v,
+                        logger=logger
+                    )
             else:
-                import shutil
                 shutil.move(video_with_new_audio_temp, output_video_path)
                 final_result = output_video_path
         else:
-            import shutil
             shutil.move(video_with_new_audio_temp, output_video_path)
             final_result = output_video_path
 
-        os.remove(audio_temp)
-        os.remove(tts_audio_temp)
-        if need_cleanup_letterbox and os.path.exists(letterbox_temp):
-            os.remove(letterbox_temp)
-
         if final_result:
             log(f"Full dubbing completed: {output_video_path}")
 
@@ -382,6 +388,8 @@ def translate_video_dubbing(video_path, target_language, api_key, output_video_p
     except Exception as e:
         log(f"Error in full dubbing: {e}")
         return None
+    finally:
+        scratch.cleanup()
 
 
 def translate_video(video_path, target_language, api_key, mode="subtitle", **kwargs):
@@ -405,3 +413,144 @@ def translate_video(video_path, target_language, api_key, mode="subtitle", **kwa
     else:
         print(f"Unknown translation mode: {mode}")
         return None
+
+
+class BatchScheduler:
+    """
+    Resource limits shared by the targets of a batch: `api` slots for Gemini requests
+    (translation, TTS) and `encode` slots for CPU-heavy work (ffmpeg renders, Whisper on TTS audio).
+    Each slot is a semaphore; use `with scheduler.api:` around the call.
+    """
+
+    def __init__(self, api_slots=None, encode_slots=None):
+        self.api_slots = api_slots or BATCH_API_CONCURRENCY
+        self.encode_slots = encode_slots or max(1, (os.cpu_count() or 1) // ENCODE_THREADS_PER_JOB)
+        self.api = threading.BoundedSemaphore(self.api_slots)
+        self.encode = threading.BoundedSemaphore(self.encode_slots)
+
+
+def _slot(scheduler, resource):
+    return getattr(scheduler, resource) if scheduler is not None else nullcontext()
+
+
+@traced("prepare_translation_source")
+def prepare_translation_source(video_path, scratch, logger=None):
+    """
+    Work every target language of one video shares: the transcript (segments with word timings,
+    from the transcript store) and the letterboxed render input, written once into scratch.
+    Returns {"video_path", "transcript", "render_video"}, or None if nothing could be transcribed.
+    """
+    transcript = get_transcript(video_path, model_size='base', long_form=True, logger=logger)
+    if not transcript:
+        return None
+    letterbox_result = add_letterbox_if_horizontal(video_path, scratch.path('.mp4', large=True), logger=logger)
+    return {"video_path": video_path, "transcript": transcript, "render_video": letterbox_result or video_path}
+
+
+def _translate_for_targets(source, mode, sub_mode, target_languages, api_key, scheduler):
+    """
+    Translations for every target at once: one multi-language request per subtitle segment
+    (subtitle mode) or for the whole script (dubbing), running scheduler.api_slots at a time.
+    Returns {language code: list of segment texts (subtitle mode) or the script (dubbing)}.
+    """
+    if mode == "dubbing":
+        full_text = " ".join(seg['text'] for seg in transcript_subtitles(source["transcript"], 'sentence'))
+        with scheduler.api:
+            return translate_texts(full_text, target_languages, api_key)
+
+    texts = [seg['text'] for seg in transcript_subtitles(source["transcript"], sub_mode)]
+
+    def translate(text):
+        with scheduler.api:
+            return translate_texts(text, target_languages, api_key)
+
+    with ThreadPoolExecutor(max_workers=scheduler.api_slots) as executor:
+        per_segment = list(executor.map(translate, texts))
+    return {code: [result.get(code) for result in per_segment] for code in target_languages}
+
+
+def translate_video_batch(video_paths, target_languages, api_key, mode="subtitle", output_dir=None,
+                          scheduler=None, logger=None, target_logger=None, **kwargs):
+    """
+    Translates each video into every target language in one run.
+
+    Per video, audio decoding, transcription and the letterbox render happen once
+    (prepare_translation_source) and all targets are translated together. The per-language
+    TTS, merges and burns then run concurrently, limited by scheduler (default: BatchScheduler()).
+    Outputs are written as <video>_<subtitled|dubbed>_<code>.mp4 into output_dir (default: next to
+    each video), with a gemlogin_manifest.json per output folder (see create_manifest).
+
+    Args:
+        logger: logger(message) for batch progress
+        target_logger: target_logger(code) -> logger for that language's steps (default: logger)
+        **kwargs: passed to translate_video_subtitles / translate_video_dubbing (font_settings,
+                  margin_v, sub_mode, voice, speech_speed, add_subtitles, ...)
+
+    Returns:
+        {(video_path, code): output path or None}
+    """
+    def log(msg):
+        if logger:
+            logger(msg)
+        print(msg)
+
+    scheduler = scheduler or BatchScheduler()
+    sub_mode = kwargs.get("sub_mode", 'sentence')
+    suffix = "subtitled" if mode == "subtitle" else "dubbed"
+    render = translate_video_subtitles if mode == "subtitle" else translate_video_dubbing
+    target_logger = target_logger or (lambda code: logger)
+
+    results = {}
+    manifests = {}
+    scratch = scratch_space("translation_batch")
+    try:
+        for video_index, video_path in enumerate(video_paths, 1):
+            if is_cancelled():
+                break
+            name = os.path.basename(video_path)
+            log(f"=== [{video_index}/{len(video_paths)}] {name}: {len(target_languages)} language(s) ===")
+
+            with span("translation_batch.video", video=name, languages=len(target_languages)), \
+                    scratch.child("source") as source_scratch:
+                source = prepare_translation_source(video_path, source_scratch, logger=logger)
+                if source is None:
+                    log(f"Failed to transcribe {name}, skipping")
+                    results.update({(video_path, code): None for code in target_languages})
+                    continue
+
+                log(f"Translating into {', '.join(target_languages)}...")
+                translations = _translate_for_targets(source, mode, sub_mode, target_languages, api_key, scheduler)
+
+                folder = output_dir or os.path.dirname(os.path.abspath(video_path))
+                base_name = os.path.splitext(name)[0]
+
+                def run_target(code):
+                    if is_cancelled():
+                        return None
+                    output_path = os.path.join(folder, f"{base_name}_{suffix}_{code}.mp4")
+                    translation_kwarg = {"translations" if mode == "subtitle" else "translation": translations.get(code)}
+                    return render(video_path, code, api_key, output_video_path=output_path,
+                                  logger=target_logger(code), source=source, scheduler=scheduler,
+                                  **translation_kwarg, **kwargs)
+
+                # Renders wait on scheduler.encode, API calls on scheduler.api
+                with ThreadPoolExecutor(max_workers=len(target_languages)) as executor:
+                    futures = {code: submit_in_context(executor, run_target, code) for code in target_languages}
+                    for code, future in futures.items():
+                        output_path = future.result()
+                        results[(video_path, code)] = output_path
+                        if output_path:
+                            manifests.setdefault(folder, []).append({
+                                "id": generate_id(),
+                                "language": code,
+                                "title": base_name,
+                                "file_path": output_path
+                            })
+    finally:
+        scratch.cleanup()
+
+    for folder, entries in manifests.items():
+        log(f"Manifest: {create_manifest(folder, entries)}")
+    done = sum(1 for output in results.values() if output)
+    log(f"Batch finished: {done}/{len(video_paths) * len(target_languages)} output(s)")
+    return results
@@ -5,15 +5,25 @@ import os
 import threading
 import shutil
 import subprocess
+import json
+import importlib
 from PIL import Image, ImageTk
 from core.tts import generate_audio, verify_api_key, GEMINI_VOICES, SPEECH_SPEEDS
-from core.subtitles import generate_subtitles, save_srt
-from core.video import merge_audio_video, burn_subtitles, extract_frame, burn_subtitle_image, get_audio_duration, create_slideshow_video, overlay_logo, create_images_to_videos, concatenate_videos, insert_overlay_with_fade, insert_multiple_overlays, burn_subtitles_for_news
-from core.utils import generate_id, create_manifest, load_config, save_config, load_cover_presets, save_cover_presets, load_settings_presets, save_settings_preset, delete_settings_preset
+from core.subtitles import generate_subtitles, save_srt, save_ass
+from core.video import merge_audio_video, burn_subtitles, render_subtitle_frame, LIBASS_PLAY_RES_Y, burn_subtitle_image, get_audio_duration, create_slideshow_video, overlay_logo, create_images_to_videos, concatenate_videos, insert_overlay_with_fade, insert_multiple_overlays, burn_subtitles_for_news, render_fanout
+from core.utils import gemini_base_url, api_request, generate_id, create_manifest, load_config, save_config, load_cover_presets, save_cover_presets, load_settings_presets, save_settings_preset, delete_settings_preset
 from core.veo_generator import generate_news_anchor_video, verify_veo_access, ASPECT_RATIOS, extend_video
-from core.translation import translate_text
-from core.video_translation import translate_video
-from core.image_gen import draw_text_on_image
+from core.translation import translate_texts
+from core.video_translation import translate_video_batch
+from core.image_gen import draw_text_on_images, scale_logo, composite_logo
+from core.preview import get_preview_service
+from core.log_bus import LogBus, format_record
+from core.ffmpeg_runner import CancelToken, ffmpeg_job
+from core.instrumentation import Tracer, span
+from core.scratch import scratch_job, scratch_space, get_session_scratch
+from core.encoding import encoding_profile, ENCODING_PROFILES, AUTO_PROFILE, DEFAULT_PROFILE
+from core.loudness import LOUDNESS_TARGETS, LOUDNESS_OFF, DEFAULT_LOUDNESS_TARGET
+from contextlib import nullcontext
 import random
 import time
 
@@ -31,7 +41,118 @@ def get_system_fonts():
         return sorted(list(fonts))
     except Exception as e:
         print(f"Error getting system fonts: {e}")
-        return ["Arial", "Helvetica", "Times New Roman", "Noto Sans", "Noto Sans Thai"]
+        return list(FALLBACK_FONTS)
+
+FALLBACK_FONTS = ["Arial", "Helvetica", "Times New Roman", "Noto Sans", "Noto Sans Thai"]
+
+# fc-list output cached between runs; fontconfig rewrites its cache dirs whenever fonts change
+FONT_CACHE_PATH = "font_cache.json"
+FONTCONFIG_CACHE_DIRS = ["~/.cache/fontconfig", "~/.fontconfig", "/var/cache/fontconfig", "/usr/lib/fontconfig/cache"]
+
+def fontconfig_cache_stamp():
+    """Latest mtime of the fontconfig cache directories (0 if none exist)."""
+    stamp = 0.0
+    for path in FONTCONFIG_CACHE_DIRS:
+        try:
+            stamp = max(stamp, os.path.getmtime(os.path.expanduser(path)))
+        except OSError:
+            pass
+    return stamp
+
+def load_cached_system_fonts():
+    """Font list from FONT_CACHE_PATH, or None if missing or older than the fontconfig cache."""
+    try:
+        with open(FONT_CACHE_PATH, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get("stamp") == fontconfig_cache_stamp() and data.get("fonts"):
+            return data["fonts"]
+    except (OSError, ValueError):
+        pass
+    return None
+
+def refresh_system_fonts_cache():
+    """Runs fc-list and rewrites FONT_CACHE_PATH. Returns the font list."""
+    fonts = get_system_fonts()
+    if fonts != FALLBACK_FONTS:
+        try:
+            with open(FONT_CACHE_PATH, 'w', encoding='utf-8') as f:
+                json.dump({"stamp": fontconfig_cache_stamp(), "fonts": fonts}, f)
+        except OSError as e:
+            print(f"Error saving font cache: {e}")
+    return fonts
+
+# Log textboxes keep only the most recent lines
+MAX_LOG_LINES = 5000
+
+def append_log_records(textbox, records, dropped, readonly=True):
+    """Writes one LogBus batch (see LogBus.start_pump) into a textbox in a single insert."""
+    lines = [format_record(record) for record in records]
+    if dropped:
+        lines.insert(0, f"... {dropped} earlier log message(s) dropped ...")
+    if readonly:
+        textbox.configure(state="normal")
+    textbox.insert("end", "\n".join(lines) + "\n")
+    line_count = int(textbox.index("end-1c").split('.')[0])
+    if line_count > MAX_LOG_LINES:
+        textbox.delete("1.0", f"{line_count - MAX_LOG_LINES}.0")
+    textbox.see("end")
+    if readonly:
+        textbox.configure(state="disabled")
+
+# Timing reports of traced jobs (config "timing_reports": true), kept apart from the exported files
+REPORTS_DIR = "reports"
+
+def run_job(target, *args, cancel=None, progress=None, trace_name=None, logger=None, encoding=None):
+    """
+    Thread target: runs target(*args) with every ffmpeg call bound to cancel/progress (see ffmpeg_job)
+    and a private scratch directory that is removed however the job ends (see scratch_job).
+    encoding is the encoding profile of every render in the job (default: config "encoding_profile").
+    With trace_name, the run is traced; when config.json has "timing_reports": true,
+    <trace_name>_report.json is written to REPORTS_DIR (config "reports_dir"), plus
+    <trace_name>_trace.json for chrome://tracing when it also has "chrome_trace": true.
+    """
+    tracer = Tracer(trace_name) if trace_name else None
+    try:
+        with ffmpeg_job(cancel=cancel, progress=progress), scratch_job(trace_name or "job"), \
+                (tracer.activate() if tracer else nullcontext()), encoding_profile(encoding):
+            target(*args)
+    finally:
+        config = load_config()
+        if tracer and config.get("timing_reports"):
+            try:
+                report_dir = config.get("reports_dir") or REPORTS_DIR
+                os.makedirs(report_dir, exist_ok=True)
+                report_path = tracer.write_report(os.path.join(report_dir, f"{trace_name}_report.json"))
+                if config.get("chrome_trace"):
+                    tracer.write_chrome_trace(os.path.join(report_dir, f"{trace_name}_trace.json"))
+                if logger:
+                    logger(f"Timing report: {report_path}")
+            except Exception as e:
+                print(f"Error writing timing report: {e}")
+
+def format_ffmpeg_progress(info):
+    """Short status text for a run_ffmpeg progress dict."""
+    parts = []
+    if info["percent"] is not None:
+        parts.append(f"{info['percent']:.0f}%")
+    elif info["time"] is not None:
+        parts.append(f"{info['time']:.1f}s")
+    if info["fps"]:
+        parts.append(f"{info['fps']:.0f} fps")
+    if info["speed"]:
+        parts.append(f"{info['speed']:.2f}x")
+    return "Rendering " + " · ".join(parts) if parts else ""
+
+# Imported on a background thread once the main window is up, so the first
+# transcription/export/API call does not pay for them
+DEFERRED_MODULES = ["faster_whisper", "requests", "ffmpeg"]
+
+def preload_modules(names):
+    for name in names:
+        try:
+            importlib.import_module(name)
+        except Exception as e:
+            print(f"Preload of {name} failed: {e}")
 
 SUPPORTED_LANGUAGES = {
     "English (US)": "en",
@@ -49,6 +170,13 @@ SUPPORTED_LANGUAGES = {
     "Vietnamese": "vi"
 }
 
+# Exported TTS audio is real AAC so merge_audio_video can stream-copy it into the MP4
+TTS_EXPORT_FORMAT = ".m4a"
+
+# Cover images: the extension picks the encoder (.jpg/.webp/.png), quality applies to JPEG/WebP
+COVER_EXPORT_FORMAT = ".jpg"
+COVER_EXPORT_QUALITY = 90
+
 class VideoEditorApp(ctk.CTk):
     def __init__(self):
         super().__init__()
@@ -64,6 +192,7 @@ class VideoEditorApp(ctk.CTk):
         self.image_folder_path = None  # For slideshow mode
         self.languages_data = {} # {lang_code: {text_widget, title_entry}}
         self.cover_settings = None # Stores settings from Cover Generator
+        self.cancel_token = CancelToken()
         
         # Load Settings
         self.settings = load_config()
@@ -80,6 +209,19 @@ class VideoEditorApp(ctk.CTk):
         # Bind close event to save settings
         self.protocol("WM_DELETE_WINDOW", self.on_close)
 
+        # Heavy modules load after the first frame is drawn
+        self.after(200, lambda: threading.Thread(target=preload_modules, args=(DEFERRED_MODULES,), daemon=True).start())
+
+    def _load_system_fonts(self):
+        fonts = refresh_system_fonts_cache()
+        self.after(0, lambda: self._apply_system_fonts(fonts))
+
+    def _apply_system_fonts(self, fonts):
+        self.system_fonts = fonts
+        self.font_name_entry.configure(values=fonts)
+        if self.font_name_var.get() not in fonts:
+            self.font_name_var.set("Arial")
+
     def on_close(self):
         self.save_current_settings()
         self.destroy()
@@ -127,7 +269,9 @@ class VideoEditorApp(ctk.CTk):
             "logo_enabled": self.logo_enabled_var.get(),
             "logo_path": self.logo_path,
             "logo_position": self.logo_position,
-            "logo_scale": self.logo_scale
+            "logo_scale": self.logo_scale,
+            "encoding_profile": self.encoding_profile_var.get(),
+            "loudness_target": self.loudness_var.get()
         }
         save_config(data)
 
@@ -272,11 +416,17 @@ class VideoEditorApp(ctk.CTk):
         self.settings_label.grid(row=17, column=0, padx=20, pady=(10, 5))
 
         # Font Selection Dropdown
-        self.system_fonts = get_system_fonts()
+        # fc-list is slow on large font sets: use the disk cache, else refresh in the background
         saved_font = self.settings.get("font_name", "Arial")
+        self.system_fonts = load_cached_system_fonts()
+        fonts_pending = self.system_fonts is None
+        if fonts_pending:
+            self.system_fonts = sorted(set(FALLBACK_FONTS) | {saved_font})
         self.font_name_var = ctk.StringVar(value=saved_font if saved_font in self.system_fonts else "Arial")
         self.font_name_entry = ctk.CTkComboBox(self.sidebar_frame, values=self.system_fonts, variable=self.font_name_var, width=180)
         self.font_name_entry.grid(row=18, column=0, padx=20, pady=5)
+        if fonts_pending:
+            threading.Thread(target=self._load_system_fonts, daemon=True).start()
 
         self.font_size_entry = ctk.CTkEntry(self.sidebar_frame, placeholder_text="Font Size")
         self.font_size_entry.insert(0, self.settings.get("font_size", "75"))
@@ -376,17 +526,36 @@ class VideoEditorApp(ctk.CTk):
         
         self.toggle_logo_options()  # Show/hide based on checkbox
 
+        # Encoding Profile (draft renders fast, auto picks the best preset this machine encodes in real time)
+        self.encoding_frame = ctk.CTkFrame(self.sidebar_frame, fg_color="transparent")
+        self.encoding_frame.grid(row=30, column=0, padx=20, pady=(10, 0), sticky="ew")
+
+        self.encoding_label = ctk.CTkLabel(self.encoding_frame, text="Encoding:", font=ctk.CTkFont(size=12))
+        self.encoding_label.grid(row=0, column=0, padx=(0, 5), pady=2, sticky="w")
+        self.encoding_profile_var = ctk.StringVar(value=self.settings.get("encoding_profile", DEFAULT_PROFILE))
+        self.encoding_dropdown = ctk.CTkOptionMenu(self.encoding_frame, variable=self.encoding_profile_var,
+                                                   values=list(ENCODING_PROFILES) + [AUTO_PROFILE], width=140)
+        self.encoding_dropdown.grid(row=0, column=1, pady=2, sticky="w")
+
+        # Loudness target of the speech; normalising re-encodes the speech track, so it is off by default
+        self.loudness_label = ctk.CTkLabel(self.encoding_frame, text="Loudness:", font=ctk.CTkFont(size=12))
+        self.loudness_label.grid(row=1, column=0, padx=(0, 5), pady=2, sticky="w")
+        self.loudness_var = ctk.StringVar(value=str(self.settings.get("loudness_target", DEFAULT_LOUDNESS_TARGET)))
+        self.loudness_dropdown = ctk.CTkOptionMenu(self.encoding_frame, variable=self.loudness_var,
+                                                   values=[LOUDNESS_OFF] + list(LOUDNESS_TARGETS), width=140)
+        self.loudness_dropdown.grid(row=1, column=1, pady=2, sticky="w")
+
         # Process Button
         self.process_btn = ctk.CTkButton(self.sidebar_frame, text="Generate & Export", command=self.start_processing, fg_color="green", hover_color="darkgreen")
-        self.process_btn.grid(row=30, column=0, padx=20, pady=20)
+        self.process_btn.grid(row=31, column=0, padx=20, pady=20)
 
         # Cover Generator Button
         self.cover_btn = ctk.CTkButton(self.sidebar_frame, text="Cover Generator", command=self.open_cover_generator, fg_color="purple", hover_color="#4a0072")
-        self.cover_btn.grid(row=31, column=0, padx=20, pady=10)
+        self.cover_btn.grid(row=32, column=0, padx=20, pady=10)
 
         # Images to Videos Button
         self.img_to_vid_btn = ctk.CTkButton(self.sidebar_frame, text="Images to Videos", command=self.start_images_to_videos, fg_color="orange", hover_color="#cc6600")
-        self.img_to_vid_btn.grid(row=32, column=0, padx=20, pady=10)
+        self.img_to_vid_btn.grid(row=33, column=0, padx=20, pady=10)
 
 
 
@@ -429,19 +598,20 @@ class VideoEditorApp(ctk.CTk):
         
         self.log_label = ctk.CTkLabel(self.log_frame, text="Process Logs", font=ctk.CTkFont(size=12, weight="bold"))
         self.log_label.grid(row=0, column=0, sticky="w", padx=5, pady=2)
+
+        self.render_progress_label = ctk.CTkLabel(self.log_frame, text="", font=ctk.CTkFont(size=11))
+        self.render_progress_label.grid(row=0, column=0, sticky="e", padx=5, pady=2)
         
         self.log_textbox = ctk.CTkTextbox(self.log_frame, height=150)
         self.log_textbox.grid(row=1, column=0, sticky="nsew", padx=5, pady=5)
         self.log_textbox.configure(state="disabled")
 
-    def log(self, message):
-        self.after(0, lambda: self._log_internal(message))
+        # Workers log into the bus from any thread; the textbox is updated in batches
+        self.log_bus = LogBus()
+        self.log_bus.start_pump(self, lambda records, dropped: append_log_records(self.log_textbox, records, dropped))
 
-    def _log_internal(self, message):
-        self.log_textbox.configure(state="normal")
-        self.log_textbox.insert("end", message + "\n")
-        self.log_textbox.see("end")
-        self.log_textbox.configure(state="disabled")
+    def log(self, message, level=None, channel="main"):
+        self.log_bus.emit(message, level=level, channel=channel)
 
     # ============== Preset Methods ==============
     
@@ -485,7 +655,9 @@ class VideoEditorApp(ctk.CTk):
             "bg_color": self.selected_bg_color,
             "logo_enabled": self.logo_enabled_var.get(),
             "logo_position": {"x": logo_x, "y": logo_y},
-            "logo_scale": logo_scale
+            "logo_scale": logo_scale,
+            "encoding_profile": self.encoding_profile_var.get(),
+            "loudness_target": self.loudness_var.get()
         }
     
     def apply_settings_from_preset(self, preset_data):
@@ -551,6 +723,12 @@ class VideoEditorApp(ctk.CTk):
             self.logo_scale = preset_data["logo_scale"]
             self.logo_scale_entry.delete(0, "end")
             self.logo_scale_entry.insert(0, str(int(preset_data["logo_scale"] * 100)))
+
+        # Encoding profile and loudness
+        if "encoding_profile" in preset_data:
+            self.encoding_profile_var.set(preset_data["encoding_profile"])
+        if "loudness_target" in preset_data:
+            self.loudness_var.set(str(preset_data["loudness_target"]))
     
     def load_preset(self, preset_name):
         """Load a preset by name."""
@@ -604,6 +782,8 @@ class VideoEditorApp(ctk.CTk):
         if path:
             self.source_video_path = path
             self.video_label.configure(text=os.path.basename(path))
+            # Build the preview proxy and thumbnails while the user sets up the job
+            get_preview_service().warm(path)
 
     def toggle_source_mode(self):
         """Toggle between video and image folder source modes."""
@@ -656,43 +836,43 @@ class VideoEditorApp(ctk.CTk):
             self.music_path = path
             self.music_label.configure(text=os.path.basename(path))
 
+    def _first_folder_image(self):
+        """First image (alphabetical) in the selected image folder, or None."""
+        import glob
+        for ext in ['*.jpg', '*.jpeg', '*.png', '*.webp', '*.JPG', '*.JPEG', '*.PNG', '*.WEBP']:
+            files = glob.glob(os.path.join(self.image_folder_path, ext))
+            if files:
+                return sorted(files)[0]
+        return None
+
+    def _preview_source_path(self):
+        """Source video, or the first folder image in image-folder mode, used for editor backgrounds."""
+        if self.source_mode_var.get() == "video" and self.source_video_path:
+            return self.source_video_path
+        if self.source_mode_var.get() == "image_folder" and self.image_folder_path:
+            return self._first_folder_image()
+        return None
+
+    def _logo_preview_background(self, source_path, width, height):
+        """Logo editor background: video frame at 1s letterboxed to 9:16, images stretched to fit."""
+        fit = "stretch" if source_path.lower().endswith(('.jpg', '.jpeg', '.png', '.webp')) else "pad"
+        return get_preview_service().get_canvas_frame(source_path, width, height, fit=fit, time=1.0)
+
     def open_position_editor(self):
         # Get source for background frame
         source_path = None
-        frame_path = "temp_frame.jpg"
         
         if self.source_mode_var.get() == "video" and self.source_video_path:
             source_path = self.source_video_path
-            # Extract frame from video
-            if not extract_frame(self.source_video_path, frame_path):
-                messagebox.showerror("Error", "Failed to extract frame from video.")
-                return
         elif self.source_mode_var.get() == "image_folder" and self.image_folder_path:
-            import glob
-            for ext in ['*.jpg', '*.jpeg', '*.png', '*.webp', '*.JPG', '*.JPEG', '*.PNG', '*.WEBP']:
-                files = glob.glob(os.path.join(self.image_folder_path, ext))
-                if files:
-                    source_path = sorted(files)[0]
-                    # Copy image to temp frame
-                    import shutil
-                    shutil.copy(source_path, frame_path)
-                    break
+            source_path = self._first_folder_image()
         
         if not source_path:
             messagebox.showerror("Error", "Please select a source video or image folder first.")
             return
-            
-        editor = ctk.CTkToplevel(self)
-        editor.title("Subtitle Position Editor")
-        editor.geometry("450x900")
-            
-        # Load image
-        pil_image = Image.open(frame_path)
-        # Get original dimensions
-        img_width, img_height = pil_image.size
         
-        # Scale to 1080x1920 first (video resolution), then resize for preview
-        pil_image = pil_image.resize((1080, 1920), Image.Resampling.LANCZOS)
+        # Scaled preview of the middle frame from the shared preview cache (proxy-backed once warm)
+        preview_service = get_preview_service()
         img_width, img_height = 1080, 1920
         
         # Preview dimensions (9:16 aspect ratio)
@@ -701,7 +881,15 @@ class VideoEditorApp(ctk.CTk):
         scale = preview_width / img_width  # Same as preview_height / img_height
         new_w, new_h = preview_width, preview_height
         
-        pil_image_resized = pil_image.resize((new_w, new_h), Image.Resampling.LANCZOS)
+        pil_image_resized = preview_service.get_canvas_frame(source_path, new_w, new_h, fit="stretch")
+        if pil_image_resized is None:
+            messagebox.showerror("Error", "Failed to extract frame from video.")
+            return
+            
+        editor = ctk.CTkToplevel(self)
+        editor.title("Subtitle Position Editor")
+        editor.geometry("450x900")
+        
         tk_image = ImageTk.PhotoImage(pil_image_resized)
         
         canvas = tk.Canvas(editor, width=new_w, height=new_h, bg="black")
@@ -788,12 +976,14 @@ class VideoEditorApp(ctk.CTk):
             original_margin = int(margin_px / scale)
             
             # 2. Create dummy subtitle
-            preview_srt = "preview.srt"
+            scratch = scratch_space("subtitle_preview")
+            preview_srt = scratch.path(".srt")
             with open(preview_srt, 'w', encoding='utf-8') as f:
                 f.write("1\n00:00:00,000 --> 00:00:10,000\nSubtitle Preview\n\n")
             
             # 3. Burn into image
-            preview_output = "preview_output.jpg"
+            frame_path = scratch.path(".jpg", prefix="frame")
+            preview_output = scratch.path(".jpg", prefix="preview")
             font_settings = {
                 "Fontname": self.font_name_entry.get(),
                 "Fontsize": self.font_size_entry.get(),
@@ -802,12 +992,22 @@ class VideoEditorApp(ctk.CTk):
             
             # We need to run burn on the ORIGINAL extracted frame to match resolution
             # Then resize back for display
-            burned_path = burn_subtitle_image(frame_path, preview_srt, font_settings, preview_output, margin_v=original_margin, logger=self.log)
+            try:
+                full_frame = preview_service.get_frame(source_path, full_res=True)
+                if full_frame is None:
+                    messagebox.showerror("Error", "Failed to extract frame from video.")
+                    return
+                full_frame.save(frame_path)
+                burned_path = burn_subtitle_image(frame_path, preview_srt, font_settings, preview_output, margin_v=original_margin, logger=self.log)
+                
+                # Load and resize before the scratch files are removed
+                p_img_resized = None
+                if burned_path and os.path.exists(burned_path):
+                    p_img_resized = Image.open(burned_path).resize((new_w, new_h))
+            finally:
+                scratch.cleanup()
             
-            if burned_path and os.path.exists(burned_path):
-                # Load and resize
-                p_img = Image.open(burned_path)
-                p_img_resized = p_img.resize((new_w, new_h))
+            if p_img_resized is not None:
                 p_tk_image = ImageTk.PhotoImage(p_img_resized)
                 
                 # Update canvas
@@ -889,16 +1089,7 @@ class VideoEditorApp(ctk.CTk):
             return
         
         # Get source for background frame
-        source_path = None
-        if self.source_mode_var.get() == "video" and self.source_video_path:
-            source_path = self.source_video_path
-        elif self.source_mode_var.get() == "image_folder" and self.image_folder_path:
-            import glob
-            for ext in ['*.jpg', '*.jpeg', '*.png', '*.webp', '*.JPG', '*.JPEG', '*.PNG', '*.WEBP']:
-                files = glob.glob(os.path.join(self.image_folder_path, ext))
-                if files:
-                    source_path = sorted(files)[0]
-                    break
+        source_path = self._preview_source_path()
         
         if not source_path:
             messagebox.showerror("Error", "Please select a source video or image folder first.")
@@ -916,26 +1107,6 @@ class VideoEditorApp(ctk.CTk):
         
         try:
             from PIL import Image, ImageTk
-            import subprocess
-            import tempfile
-            
-            # Extract frame from video or load image
-            is_video = source_path.lower().endswith(('.mp4', '.mov', '.avi', '.mkv'))
-            
-            if is_video:
-                temp_frame = tempfile.NamedTemporaryFile(suffix='.jpg', delete=False)
-                temp_frame.close()
-                cmd = ['ffmpeg', '-y', '-ss', '1', '-i', source_path, '-vframes', '1', 
-                       '-vf', 'scale=1080:1920:force_original_aspect_ratio=decrease,pad=1080:1920:(ow-iw)/2:(oh-ih)/2',
-                       temp_frame.name]
-                subprocess.run(cmd, capture_output=True)
-                bg_img = Image.open(temp_frame.name)
-                editor.temp_frame = temp_frame.name  # Store for cleanup
-            else:
-                bg_img = Image.open(source_path)
-                # Scale to 1080x1920
-                bg_img = bg_img.resize((1080, 1920), Image.Resampling.LANCZOS)
-                editor.temp_frame = None
             
             # Actual video dimensions (reference)
             actual_width = 1080
@@ -949,32 +1120,23 @@ class VideoEditorApp(ctk.CTk):
             scale_x = preview_width / actual_width
             scale_y = preview_height / actual_height
             
-            # Create background for preview
-            bg_preview = bg_img.resize((preview_width, preview_height), Image.Resampling.LANCZOS)
+            # Create background for preview (frame at 1s, letterboxed for video, stretched for images)
+            bg_preview = self._logo_preview_background(source_path, preview_width, preview_height)
+            if bg_preview is None:
+                raise Exception("Failed to extract frame from video")
             editor.bg_tk = ImageTk.PhotoImage(bg_preview)
             
-            # Load and scale logo according to logo_scale_entry
-            logo_original = Image.open(self.logo_path)
-            
             # Get logo scale from entry (percentage of video width)
             try:
                 logo_scale_percent = int(self.logo_scale_entry.get())
             except:
                 logo_scale_percent = 15
             
-            # Calculate actual logo width in video
+            # Calculate actual logo width in video, then scale for preview (aspect ratio kept, cached)
             actual_logo_width = int(actual_width * logo_scale_percent / 100)
-            # Maintain aspect ratio
-            logo_orig_w, logo_orig_h = logo_original.size
-            actual_logo_height = int(actual_logo_width * logo_orig_h / logo_orig_w)
+            preview_logo_width = max(1, int(actual_logo_width * scale_x))
             
-            # Scale logo for preview
-            preview_logo_width = int(actual_logo_width * scale_x)
-            preview_logo_height = int(actual_logo_height * scale_y)
-            preview_logo_width = max(1, preview_logo_width)
-            preview_logo_height = max(1, preview_logo_height)
-            
-            logo_preview = logo_original.resize((preview_logo_width, preview_logo_height), Image.Resampling.LANCZOS)
+            logo_preview = scale_logo(self.logo_path, preview_logo_width)
             editor.logo_tk = ImageTk.PhotoImage(logo_preview)
             
             # Create canvas
@@ -1061,11 +1223,6 @@ class VideoEditorApp(ctk.CTk):
                 cleanup_and_close()
             
             def cleanup_and_close():
-                if editor.temp_frame and os.path.exists(editor.temp_frame):
-                    try:
-                        os.remove(editor.temp_frame)
-                    except:
-                        pass
                 editor.destroy()
             
             btn_frame = ctk.CTkFrame(editor, fg_color="transparent")
@@ -1083,36 +1240,135 @@ class VideoEditorApp(ctk.CTk):
             messagebox.showerror("Error", f"Failed to load: {e}")
             editor.destroy()
 
+    def _logo_settings(self):
+        """Logo (x, y, scale percent) from the entry fields, falling back to the saved values."""
+        try:
+            x = int(self.logo_x_entry.get())
+        except:
+            x = self.logo_position.get("x", 50)
+        try:
+            y = int(self.logo_y_entry.get())
+        except:
+            y = self.logo_position.get("y", 50)
+        try:
+            scale_percent = int(self.logo_scale_entry.get())
+        except:
+            scale_percent = 15
+        return x, y, scale_percent
+
+    def _on_logo_entry_key(self, event=None):
+        refresh = getattr(self, "_logo_preview_refresh", None)
+        if refresh:
+            refresh()
+
     def preview_logo_position(self):
+        """
+        Live logo preview: the pre-scaled logo is composited onto a cached preview frame in memory,
+        refreshing on every drag and on every keystroke in the X/Y/Size fields.
+        "Exact Render" runs the ffmpeg check (render_logo_preview_exact).
+        """
+        if not self.logo_path or not os.path.exists(self.logo_path):
+            messagebox.showerror("Error", "Please select a logo image first.")
+            return
+        
+        source_path = self._preview_source_path()
+        if not source_path:
+            messagebox.showerror("Error", "Please select a source video or image folder first.")
+            return
+        
+        # Video resolution (reference) and preview size
+        actual_width, actual_height = 1080, 1920
+        preview_width, preview_height = 360, 640
+        factor = preview_width / actual_width
+        
+        background = get_preview_service().get_canvas_frame(source_path, preview_width, preview_height, fit="pad", time=1.0)
+        if background is None:
+            messagebox.showerror("Error", "Failed to extract frame from video.")
+            return
+        background = background.convert("RGBA")
+        
+        preview_window = ctk.CTkToplevel(self)
+        preview_window.title("Logo Preview")
+        preview_window.geometry("400x780")
+        preview_window.transient(self)
+        
+        img_label = tk.Label(preview_window, cursor="fleur")
+        img_label.pack(pady=10)
+        
+        pos_label = ctk.CTkLabel(preview_window, text="")
+        pos_label.pack(pady=5)
+        
+        def refresh(event=None):
+            if not preview_window.winfo_exists():
+                return
+            x, y, scale_percent = self._logo_settings()
+            logo = scale_logo(self.logo_path, max(1, int(actual_width * scale_percent / 100 * factor)))
+            frame = composite_logo(background, logo, x * factor, y * factor)
+            preview_window.preview_img = ImageTk.PhotoImage(frame)  # Keep reference
+            img_label.configure(image=preview_window.preview_img)
+            pos_label.configure(text=f"Logo Position: X={x}, Y={y}, Size={scale_percent}%")
+        
+        drag = {"x": 0, "y": 0}
+        
+        def on_drag_start(event):
+            drag["x"], drag["y"] = event.x, event.y
+        
+        def on_drag_motion(event):
+            x, y, _ = self._logo_settings()
+            x += int((event.x - drag["x"]) / factor)
+            y += int((event.y - drag["y"]) / factor)
+            drag["x"], drag["y"] = event.x, event.y
+            self.logo_position = {"x": x, "y": y}
+            self.logo_x_entry.delete(0, 'end')
+            self.logo_x_entry.insert(0, str(x))
+            self.logo_y_entry.delete(0, 'end')
+            self.logo_y_entry.insert(0, str(y))
+            refresh()
+        
+        img_label.bind("<Button-1>", on_drag_start)
+        img_label.bind("<B1-Motion>", on_drag_motion)
+        
+        # The X/Y/Size entries are bound once and call the refresh of the open preview, if any;
+        # closing the preview drops the refresh (and the background frame it holds)
+        self._logo_preview_refresh = refresh
+        if not getattr(self, "_logo_preview_keys_bound", False):
+            for entry in (self.logo_x_entry, self.logo_y_entry, self.logo_scale_entry):
+                entry.bind("<KeyRelease>", self._on_logo_entry_key, add="+")
+            self._logo_preview_keys_bound = True
+        
+        def on_destroy(event):
+            if event.widget is preview_window and self._logo_preview_refresh is refresh:
+                self._logo_preview_refresh = None
+        
+        preview_window.bind("<Destroy>", on_destroy, add="+")
+        
+        btn_frame = ctk.CTkFrame(preview_window, fg_color="transparent")
+        btn_frame.pack(pady=10)
+        
+        ctk.CTkButton(btn_frame, text="Exact Render (FFmpeg)", command=self.render_logo_preview_exact, fg_color="orange").pack(side="left", padx=5)
+        ctk.CTkButton(btn_frame, text="Close", command=preview_window.destroy).pack(side="left", padx=5)
+        
+        refresh()
+
+    def render_logo_preview_exact(self):
         """Generate FFmpeg preview of logo position on actual video frame."""
         if not self.logo_path or not os.path.exists(self.logo_path):
             messagebox.showerror("Error", "Please select a logo image first.")
             return
         
         # Get source for preview
-        source_path = None
-        if self.source_mode_var.get() == "video" and self.source_video_path:
-            source_path = self.source_video_path
-        elif self.source_mode_var.get() == "image_folder" and self.image_folder_path:
-            # Find first image in folder
-            import glob
-            for ext in ['*.jpg', '*.jpeg', '*.png', '*.webp', '*.JPG', '*.JPEG', '*.PNG', '*.WEBP']:
-                files = glob.glob(os.path.join(self.image_folder_path, ext))
-                if files:
-                    source_path = sorted(files)[0]
-                    break
+        source_path = self._preview_source_path()
         
         if not source_path:
             messagebox.showerror("Error", "Please select a source video or image folder first.")
             return
         
+        scratch = scratch_space("logo_preview")
         try:
             import subprocess
-            import tempfile
             
-            # Create temporary output file
-            temp_preview = tempfile.NamedTemporaryFile(suffix='.png', delete=False)
-            temp_preview.close()
+            # Temporary output file
+            temp_preview = scratch.path('.png', prefix="preview")
             
             # Read position from entry fields
             try:
@@ -1131,30 +1387,23 @@ class VideoEditorApp(ctk.CTk):
             except:
                 logo_width = 162  # Default ~15% of 1080
             
-            # Determine if source is video or image
-            is_video = source_path.lower().endswith(('.mp4', '.mov', '.avi', '.mkv'))
+            # Background: full-resolution 1080x1920 canvas frame (1s into a video) from the preview cache,
+            # so ffmpeg only composites the logo instead of seeking and scaling the source again
+            canvas_frame = get_preview_service().get_canvas_frame(source_path, 1080, 1920, fit="pad", time=1.0, full_res=True)
+            if canvas_frame is None:
+                messagebox.showerror("Error", "Failed to extract frame from video.")
+                return
+            temp_background = scratch.path('.bmp', prefix="background")
+            canvas_frame.save(temp_background)
             
-            if is_video:
-                # Extract frame and overlay logo
-                cmd = [
-                    'ffmpeg', '-y',
-                    '-ss', '1',  # Seek to 1 second
-                    '-i', source_path,
-                    '-i', self.logo_path,
-                    '-filter_complex', f'[0:v]scale=1080:1920:force_original_aspect_ratio=decrease,pad=1080:1920:(ow-iw)/2:(oh-ih)/2[bg];[1:v]scale={logo_width}:-1[logo];[bg][logo]overlay={x}:{y}',
-                    '-frames:v', '1',
-                    temp_preview.name
-                ]
-            else:
-                # Image source
-                cmd = [
-                    'ffmpeg', '-y',
-                    '-i', source_path,
-                    '-i', self.logo_path,
-                    '-filter_complex', f'[0:v]scale=1080:1920:force_original_aspect_ratio=decrease,pad=1080:1920:(ow-iw)/2:(oh-ih)/2[bg];[1:v]scale={logo_width}:-1[logo];[bg][logo]overlay={x}:{y}',
-                    '-frames:v', '1',
-                    temp_preview.name
-                ]
+            cmd = [
+                'ffmpeg', '-y',
+                '-i', temp_background,
+                '-i', self.logo_path,
+                '-filter_complex', f'[1:v]scale={logo_width}:-1[logo];[0:v][logo]overlay={x}:{y}',
+                '-frames:v', '1',
+                temp_preview
+            ]
             
             result = subprocess.run(cmd, capture_output=True, text=True)
             
@@ -1174,7 +1423,7 @@ class VideoEditorApp(ctk.CTk):
             
             # Load and display preview image
             from PIL import Image, ImageTk
-            preview_img = Image.open(temp_preview.name)
+            preview_img = Image.open(temp_preview)
             preview_img = preview_img.resize((360, 640), Image.Resampling.LANCZOS)
             preview_tk = ImageTk.PhotoImage(preview_img)
             
@@ -1189,18 +1438,10 @@ class VideoEditorApp(ctk.CTk):
             close_btn = ctk.CTkButton(preview_window, text="Close", command=preview_window.destroy)
             close_btn.pack(pady=10)
             
-            # Cleanup temp file after window closes
-            def on_close():
-                try:
-                    os.remove(temp_preview.name)
-                except:
-                    pass
-                preview_window.destroy()
-            
-            preview_window.protocol("WM_DELETE_WINDOW", on_close)
-            
         except Exception as e:
             messagebox.showerror("Error", f"Failed to generate preview: {e}")
+        finally:
+            scratch.cleanup()
 
     def add_language_dialog(self):
         dialog = ctk.CTkToplevel(self)
@@ -1321,232 +1562,66 @@ class VideoEditorApp(ctk.CTk):
         # Save settings before processing
         self.save_current_settings()
 
-        # Start thread
-        thread = threading.Thread(target=self.process_tasks, args=(tasks, export_dir, api_key))
+        # Start thread; the button cancels the export (and any running ffmpeg) until it finishes
+        self.cancel_token = CancelToken()
+        self.process_btn.configure(state="normal", text="Cancel Export", command=self.cancel_processing,
+                                   fg_color="darkred", hover_color="#5a0000")
+        thread = threading.Thread(target=run_job, args=(self.process_tasks, tasks, export_dir, api_key),
+                                  kwargs={"cancel": self.cancel_token, "progress": self.report_render_progress,
+                                          "trace_name": "export", "logger": self.log,
+                                          "encoding": self.encoding_profile_var.get()})
         thread.start()
 
+    def cancel_processing(self):
+        self.cancel_token.cancel()
+        self.log("Cancelling export...", level="WARNING")
+        self.process_btn.configure(state="disabled", text="Cancelling...")
+
+    def report_render_progress(self, info):
+        """ffmpeg progress callback (worker thread)."""
+        text = "" if info["done"] else format_ffmpeg_progress(info)
+        self.after(0, lambda: self.render_progress_label.configure(text=text))
+
     def process_tasks(self, tasks, export_dir, api_key):
         try:
             manifest_data = []
+            cover_jobs = []
+            source_mode = self.source_mode_var.get()
+            video_jobs = []
             
             for task in tasks:
-                lang_code = task["code"]
-                lang_name = task["name"]
-                script = task["script"]
-                title = task["title"]
-                
-                # Create language folder
-                lang_dir = os.path.join(export_dir, lang_name)
-                os.makedirs(lang_dir, exist_ok=True)
-                
-                # Generate random ID/Number
-                rand_num = random.randint(10000, 99999)
-                
-                # Sanitize title for filename
-                safe_title = "".join([c for c in title if c.isalpha() or c.isdigit() or c==' ']).rstrip()
-                safe_title = safe_title.replace(" ", "_")
-                
-                base_name = f"{safe_title}_{lang_name}_{rand_num}"
-                
-                # Paths
-                audio_path = os.path.join(lang_dir, f"{base_name}.mp3")
-                video_merged_path = os.path.join(lang_dir, f"{base_name}_merged.mp4")
-                srt_path = os.path.join(lang_dir, f"{base_name}.srt")
-                final_video_path = os.path.join(lang_dir, f"{base_name}.mp4") # Removed _final for cleaner name
-                
-                # Check if script is provided
-                has_script = script and script.strip()
-                audio_file = None
-                audio_duration = None
-                
-                if has_script:
-                    # 1. Generate Audio
-                    self.log(f"[{lang_name}] Generating audio...")
-                    speech_speed = SPEECH_SPEEDS.get(self.speech_speed_var.get(), 1.0)
-                    voice_prompt = self.voice_prompt_entry.get().strip()
-                    audio_file = generate_audio(
-                        script, 
-                        lang_code, 
-                        audio_path, 
-                        voice=self.voice_var.get(),
-                        api_key=api_key,
-                        speech_speed=speech_speed,
-                        voice_prompt=voice_prompt
-                    )
-                    if not audio_file:
-                        self.log(f"[{lang_name}] Failed to generate audio")
-                        continue
-                    audio_duration = get_audio_duration(audio_path)
-                else:
-                    self.log(f"[{lang_name}] No script provided, skipping audio generation...")
-                    # Get default duration from image duration setting
-                    try:
-                        audio_duration = float(self.image_duration_entry.get())
-                    except:
-                        audio_duration = 5.0
-                
-                # 2. Create/Merge Video based on source mode
-                source_mode = self.source_mode_var.get()
-                
-                if source_mode == "image_folder":
-                    # Create slideshow from images
-                    self.log(f"[{lang_name}] Creating slideshow from images...")
-                    if not audio_duration:
-                        self.log(f"[{lang_name}] Failed to get duration")
-                        continue
-                    
-                    slideshow_path = os.path.join(lang_dir, f"{base_name}_slideshow.mp4")
-                    # Get image duration setting
-                    try:
-                        image_duration_sec = float(self.image_duration_entry.get())
-                    except:
-                        image_duration_sec = 3.0
-                    
-                    slideshow_file = create_slideshow_video(
-                        self.image_folder_path,
-                        audio_duration,
-                        slideshow_path,
-                        transition_duration=0.5,
-                        image_duration=image_duration_sec
-                    )
-                    if not slideshow_file:
-                        self.log(f"[{lang_name}] Failed to create slideshow")
-                        continue
-                    
-                    if has_script and audio_file:
-                        # Merge slideshow with audio
-                        self.log(f"[{lang_name}] Merging slideshow with audio...")
-                        merged_file = merge_audio_video(
-                            slideshow_path, 
-                            audio_path, 
-                            video_merged_path,
-                            mode="trim",  # Always trim for slideshow since it's already exact length
-                            music_path=self.music_path if self.audio_mode_var.get() == "bg_music" else None
-                        )
-                        # Cleanup slideshow temp file
-                        if os.path.exists(slideshow_path):
-                            os.remove(slideshow_path)
-                    else:
-                        # No audio - just use slideshow as merged file
-                        merged_file = slideshow_path
-                        video_merged_path = slideshow_path
-                else:
-                    # Original video mode
-                    if has_script and audio_file:
-                        self.log(f"[{lang_name}] Merging video with audio...")
-                        merged_file = merge_audio_video(
-                            self.source_video_path, 
-                            audio_path, 
-                            video_merged_path,
-                            mode=self.audio_mode_var.get(),
-                            music_path=self.music_path
-                        )
-                    else:
-                        # No audio - just copy video
-                        self.log(f"[{lang_name}] Processing video (no audio)...")
-                        import subprocess
-                        cmd = [
-                            'ffmpeg', '-y',
-                            '-i', self.source_video_path,
-                            '-t', str(audio_duration),
-                            '-c:v', 'copy',
-                            '-an',  # No audio
-                            video_merged_path
-                        ]
-                        result = subprocess.run(cmd, capture_output=True, text=True)
-                        merged_file = video_merged_path if result.returncode == 0 else None
-                
-                if not merged_file:
-                    self.log(f"[{lang_name}] Failed to process video")
+                if self.cancel_token.cancelled:
+                    break
+                with span("prepare_language", language=task["name"]):
+                    job = self._prepare_language_job(task, export_dir, api_key)
+                if not job:
                     continue
-
-                # 3. Generate Subtitles (skip for Thai language or no audio)
-                if not has_script or not audio_file:
-                    self.log(f"[{lang_name}] Skipping subtitles (no script/audio)...")
-                    subtitled_file = merged_file
-                elif lang_code == 'th':
-                    self.log(f"[{lang_name}] Skipping subtitles for Thai language...")
-                    subtitled_file = merged_file  # Use merged file directly without subtitles
-                else:
-                    self.log(f"[{lang_name}] Generating subtitles...")
-                    subs = generate_subtitles(audio_path, language=lang_code, mode=self.sub_mode_var.get())
-                    save_srt(subs, srt_path)
-                    
-                    # 4. Burn Subtitles
-                    self.log(f"[{lang_name}] Burning subtitles...")
-                    font_settings = {
-                        "Fontname": self.font_name_entry.get(),
-                        "Fontsize": self.font_size_entry.get(),
-                        "PrimaryColour": self.selected_color,
-                        "BorderEnabled": self.border_enabled_var.get(),
-                        "BackgroundEnabled": self.bg_enabled_var.get(),
-                        "BackgroundColour": self.selected_bg_color
-                    }
-                    subtitle_output = os.path.join(lang_dir, f"{base_name}_subtitled.mp4")
-                    subtitled_file = burn_subtitles(merged_file, srt_path, font_settings, subtitle_output, margin_v=self.subtitle_margin_v, logger=self.log)
-                    
-                    # Cleanup intermediate merged file
-                    if os.path.exists(merged_file):
-                        os.remove(merged_file)
-                    
-                    if not subtitled_file:
-                        self.log(f"[{lang_name}] Failed to burn subtitles")
-                        continue
                 
-                # 5. Overlay Logo (if enabled)
-                if self.logo_enabled_var.get() and self.logo_path and os.path.exists(self.logo_path):
-                    self.log(f"[{lang_name}] Adding logo overlay...")
-                    final_file = overlay_logo(
-                        subtitled_file,
-                        self.logo_path,
-                        final_video_path,
-                        position=self.logo_position,
-                        logo_scale=self.logo_scale,
-                        logger=self.log
-                    )
-                    # Cleanup subtitled file
-                    if os.path.exists(subtitled_file):
-                        os.remove(subtitled_file)
+                if source_mode == "image_folder":
+                    with span("render_language", language=task["name"]):
+                        job["final_file"] = self._render_language_job(job)
+                    self._finish_language_job(job, manifest_data, cover_jobs)
                 else:
-                    # No logo, just rename/move subtitled file
-                    import shutil
-                    shutil.move(subtitled_file, final_video_path)
-                    final_file = final_video_path
-                
-                if final_file:
-                    self.log(f"[{lang_name}] Completed: {os.path.basename(final_file)}") 
-                    manifest_data.append({
-                        "id": rand_num,
-                        "language": lang_name,
-                        "title": title,
-                        "file_path": final_file
-                    })
-
-                    # 5. Generate Cover Image (if enabled)
-                    if self.cover_settings:
-                        self.log(f"[{lang_name}] Generating cover image...")
-                        try:
-                            # Translate Topic
-                            topic = self.cover_settings.get("topic", "")
-                            if topic:
-                                translated_topic = translate_text(topic, lang_code, api_key)
-                            else:
-                                translated_topic = title # Fallback to title if no topic
-                            
-                            cover_path = os.path.join(lang_dir, f"{base_name}.jpg")
-                            
-                            # Prepare Style
-                            style = self.cover_settings.get("style", {}).copy()
-                            # Ensure we use the saved frame
-                            base_image_path = self.cover_settings.get("image_path")
-                            
-                            if base_image_path and os.path.exists(base_image_path):
-                                draw_text_on_image(base_image_path, translated_topic, cover_path, style)
-                                self.log(f"[{lang_name}] Cover generated: {os.path.basename(cover_path)}")
-                            else:
-                                self.log(f"[{lang_name}] Cover generation failed: Base image not found")
-                        except Exception as e:
-                            self.log(f"[{lang_name}] Cover generation error: {e}")
+                    # Video mode: render every language from one decode of the source once all are prepared
+                    video_jobs.append(job)
+            
+            if video_jobs and not self.cancel_token.cancelled:
+                with span("render_languages", languages=len(video_jobs)):
+                    self._render_language_jobs_fanout(video_jobs)
+                for job in video_jobs:
+                    self._finish_language_job(job, manifest_data, cover_jobs)
+            
+            if self.cancel_token.cancelled:
+                self.log("Export cancelled.", level="WARNING")
+                return
+            
+            if cover_jobs:
+                try:
+                    with span("covers"):
+                        self._generate_covers(cover_jobs, api_key)
+                except Exception as e:
+                    self.log(f"Cover generation error: {e}")
+            
             create_manifest(export_dir, manifest_data)
             self.log("All tasks completed successfully!")
             
@@ -1557,7 +1632,329 @@ class VideoEditorApp(ctk.CTk):
             print(f"Error in processing: {e}")
             self.after(0, lambda: messagebox.showerror("Error", f"An error occurred: {e}"))
         finally:
-            self.after(0, lambda: self.process_btn.configure(state="normal", text="Generate & Export"))
+            self.after(0, lambda: self.render_progress_label.configure(text=""))
+            self.after(0, lambda: self.process_btn.configure(state="normal", text="Generate & Export", command=self.start_processing,
+                                                             fg_color="green", hover_color="darkgreen"))
+
+    def _prepare_language_job(self, task, export_dir, api_key):
+        """
+        Per-language work that does not touch the video: output names, TTS audio and subtitles.
+        Returns a job dict for _render_language_job / _render_language_jobs_fanout, or None on failure.
+        """
+        lang_code = task["code"]
+        lang_name = task["name"]
+        script = task["script"]
+        title = task["title"]
+        
+        # Create language folder
+        lang_dir = os.path.join(export_dir, lang_name)
+        os.makedirs(lang_dir, exist_ok=True)
+        
+        # Generate random ID/Number
+        rand_num = random.randint(10000, 99999)
+        
+        # Sanitize title for filename
+        safe_title = "".join([c for c in title if c.isalpha() or c.isdigit() or c==' ']).rstrip()
+        safe_title = safe_title.replace(" ", "_")
+        
+        base_name = f"{safe_title}_{lang_name}_{rand_num}"
+        # Intermediates (merged/subtitled video, ASS script) stay out of the export folder
+        scratch = scratch_space(base_name)
+        
+        job = {
+            "code": lang_code,
+            "name": lang_name,
+            "title": title,
+            "id": rand_num,
+            "lang_dir": lang_dir,
+            "base_name": base_name,
+            "scratch": scratch,
+            # Paths
+            "audio_path": os.path.join(lang_dir, f"{base_name}{TTS_EXPORT_FORMAT}"),
+            "video_merged_path": scratch.path(".mp4", large=True, prefix="merged"),
+            "srt_path": os.path.join(lang_dir, f"{base_name}.srt"),
+            "ass_path": None,
+            "final_video_path": os.path.join(lang_dir, f"{base_name}.mp4"), # Removed _final for cleaner name
+            "audio_file": None,
+            "audio_duration": None,
+            "final_file": None
+        }
+        
+        # Check if script is provided
+        has_script = script and script.strip()
+        
+        if has_script:
+            # 1. Generate Audio
+            self.log(f"[{lang_name}] Generating audio...")
+            speech_speed = SPEECH_SPEEDS.get(self.speech_speed_var.get(), 1.0)
+            voice_prompt = self.voice_prompt_entry.get().strip()
+            job["audio_file"] = generate_audio(
+                script, 
+                lang_code, 
+                job["audio_path"], 
+                voice=self.voice_var.get(),
+                api_key=api_key,
+                speech_speed=speech_speed,
+                voice_prompt=voice_prompt
+            )
+            if not job["audio_file"]:
+                self.log(f"[{lang_name}] Failed to generate audio")
+                return None
+            job["audio_duration"] = get_audio_duration(job["audio_path"])
+        else:
+            self.log(f"[{lang_name}] No script provided, skipping audio generation...")
+            # Get default duration from image duration setting
+            try:
+                job["audio_duration"] = float(self.image_duration_entry.get())
+            except:
+                job["audio_duration"] = 5.0
+        
+        # 2. Generate Subtitles (skip for Thai language or no audio)
+        if not has_script or not job["audio_file"]:
+            self.log(f"[{lang_name}] Skipping subtitles (no script/audio)...")
+        elif lang_code == 'th':
+            self.log(f"[{lang_name}] Skipping subtitles for Thai language...")
+        else:
+            self.log(f"[{lang_name}] Generating subtitles...")
+            sub_mode = self.sub_mode_var.get()
+            subs = generate_subtitles(job["audio_path"], language=lang_code, mode=sub_mode)
+            save_srt(subs, job["srt_path"])
+            
+            # Burn from a styled ASS script; word mode becomes karaoke lines instead of one event per word
+            job["ass_path"] = scratch.path(".ass", prefix="subtitles")
+            save_ass(subs, job["ass_path"], self._subtitle_font_settings(), margin_v=self.subtitle_margin_v,
+                     karaoke=(sub_mode == "word"), language=lang_code)
+        
+        return job
+
+    def _subtitle_font_settings(self):
+        return {
+            "Fontname": self.font_name_entry.get(),
+            "Fontsize": self.font_size_entry.get(),
+            "PrimaryColour": self.selected_color,
+            "BorderEnabled": self.border_enabled_var.get(),
+            "BackgroundEnabled": self.bg_enabled_var.get(),
+            "BackgroundColour": self.selected_bg_color
+        }
+
+    def _logo_enabled(self):
+        return self.logo_enabled_var.get() and self.logo_path and os.path.exists(self.logo_path)
+
+    def _render_language_job(self, job):
+        """Renders one prepared job step by step (merge, burn subtitles, logo). Returns the final file or None."""
+        lang_name = job["name"]
+        scratch = job["scratch"]
+        audio_path = job["audio_path"]
+        audio_file = job["audio_file"]
+        audio_duration = job["audio_duration"]
+        video_merged_path = job["video_merged_path"]
+        final_video_path = job["final_video_path"]
+        
+        # 3. Create/Merge Video based on source mode
+        source_mode = self.source_mode_var.get()
+        
+        if source_mode == "image_folder":
+            # Create slideshow from images
+            self.log(f"[{lang_name}] Creating slideshow from images...")
+            if not audio_duration:
+                self.log(f"[{lang_name}] Failed to get duration")
+                return None
+            
+            slideshow_path = scratch.path(".mp4", large=True, prefix="slideshow")
+            # Get image duration setting
+            try:
+                image_duration_sec = float(self.image_duration_entry.get())
+            except:
+                image_duration_sec = 3.0
+            
+            slideshow_file = create_slideshow_video(
+                self.image_folder_path,
+                audio_duration,
+                slideshow_path,
+                transition_duration=0.5,
+                image_duration=image_duration_sec
+            )
+            if not slideshow_file:
+                self.log(f"[{lang_name}] Failed to create slideshow")
+                return None
+            
+            if audio_file:
+                # Merge slideshow with audio
+                self.log(f"[{lang_name}] Merging slideshow with audio...")
+                merged_file = merge_audio_video(
+                    slideshow_path, 
+                    audio_path, 
+                    video_merged_path,
+                    mode="trim",  # Always trim for slideshow since it's already exact length
+                    music_path=self.music_path if self.audio_mode_var.get() == "bg_music" else None
+                )
+                # Cleanup slideshow temp file
+                if os.path.exists(slideshow_path):
+                    os.remove(slideshow_path)
+            else:
+                # No audio - just use slideshow as merged file
+                merged_file = slideshow_path
+        else:
+            # Original video mode
+            if audio_file:
+                self.log(f"[{lang_name}] Merging video with audio...")
+                merged_file = merge_audio_video(
+                    self.source_video_path, 
+                    audio_path, 
+                    video_merged_path,
+                    mode=self.audio_mode_var.get(),
+                    music_path=self.music_path
+                )
+            else:
+                # No audio - just copy video
+                self.log(f"[{lang_name}] Processing video (no audio)...")
+                import subprocess
+                cmd = [
+                    'ffmpeg', '-y',
+                    '-i', self.source_video_path,
+                    '-t', str(audio_duration),
+                    '-c:v', 'copy',
+                    '-an',  # No audio
+                    video_merged_path
+                ]
+                result = subprocess.run(cmd, capture_output=True, text=True)
+                merged_file = video_merged_path if result.returncode == 0 else None
+        
+        if not merged_file:
+            self.log(f"[{lang_name}] Failed to process video")
+            return None
+
+        # 4. Burn Subtitles
+        if job["ass_path"]:
+            self.log(f"[{lang_name}] Burning subtitles...")
+            subtitle_output = scratch.path(".mp4", large=True, prefix="subtitled")
+            subtitled_file = burn_subtitles(merged_file, job["ass_path"], self._subtitle_font_settings(), subtitle_output, logger=self.log_bus.logger(lang_name))
+            
+            # Cleanup intermediate merged file and ASS script
+            if os.path.exists(merged_file):
+                os.remove(merged_file)
+            if os.path.exists(job["ass_path"]):
+                os.remove(job["ass_path"])
+            
+            if not subtitled_file:
+                self.log(f"[{lang_name}] Failed to burn subtitles")
+                return None
+        else:
+            subtitled_file = merged_file
+        
+        # 5. Overlay Logo (if enabled)
+        if self._logo_enabled():
+            self.log(f"[{lang_name}] Adding logo overlay...")
+            final_file = overlay_logo(
+                subtitled_file,
+                self.logo_path,
+                final_video_path,
+                position=self.logo_position,
+                logo_scale=self.logo_scale,
+                logger=self.log_bus.logger(lang_name)
+            )
+            # Cleanup subtitled file
+            if os.path.exists(subtitled_file):
+                os.remove(subtitled_file)
+        else:
+            # No logo, just rename/move subtitled file
+            import shutil
+            shutil.move(subtitled_file, final_video_path)
+            final_file = final_video_path
+        
+        return final_file
+
+    def _render_language_jobs_fanout(self, jobs):
+        """
+        Video mode: renders all prepared jobs from a single decode of the source video
+        (see core.video.render_fanout). Jobs whose batch fails are retried one by one.
+        """
+        audio_mode = self.audio_mode_var.get()
+        branches = []
+        for job in jobs:
+            has_audio = bool(job["audio_file"])
+            branches.append({
+                "output_path": job["final_video_path"],
+                # trim: cut/loop to the speech; bg_music: keep the source length
+                "duration": job["audio_duration"] if (audio_mode != "bg_music" or not has_audio) else None,
+                "audio_path": job["audio_path"] if has_audio else None,
+                "music": audio_mode == "bg_music",
+                "subtitle_path": job["ass_path"]
+            })
+        
+        self.log(f"Rendering {len(jobs)} language(s) from one decode of the source video...")
+        results = render_fanout(
+            self.source_video_path,
+            branches,
+            logo_path=self.logo_path if self._logo_enabled() else None,
+            logo_position=self.logo_position,
+            logo_scale=self.logo_scale,
+            music_path=self.music_path,
+            logger=self.log
+        )
+        
+        for job, result in zip(jobs, results):
+            if result:
+                job["final_file"] = result
+            elif self.cancel_token.cancelled:
+                job["final_file"] = None
+            else:
+                self.log(f"[{job['name']}] Fan-out render failed, rendering separately...")
+                job["final_file"] = self._render_language_job(job)
+            if job["ass_path"] and os.path.exists(job["ass_path"]):
+                os.remove(job["ass_path"])
+
+    def _finish_language_job(self, job, manifest_data, cover_jobs):
+        """Records a rendered job in the manifest and queues its cover image."""
+        lang_name = job["name"]
+        final_file = job["final_file"]
+        job["scratch"].cleanup()
+        
+        if final_file:
+            self.log(f"[{lang_name}] Completed: {os.path.basename(final_file)}") 
+            manifest_data.append({
+                "id": job["id"],
+                "language": lang_name,
+                "title": job["title"],
+                "file_path": final_file
+            })
+            
+            if self.cover_settings:
+                cover_jobs.append(job)
+
+    def _generate_covers(self, jobs, api_key):
+        """6. Generate Cover Images: translate the topic per language, then render all covers from one decode of the base frame."""
+        # Ensure we use the saved frame
+        base_image_path = self.cover_settings.get("image_path")
+        if not base_image_path or not os.path.exists(base_image_path):
+            self.log("Cover generation failed: Base image not found")
+            return
+        
+        self.log(f"Generating {len(jobs)} cover image(s)...")
+        topic = self.cover_settings.get("topic", "")
+        # Translate Topic into every language at once (memoised, so a prefetch from the cover dialog is reused)
+        translated_topics = translate_texts(topic, [job["code"] for job in jobs], api_key) if topic else {}
+        texts = {}
+        output_paths = {}
+        for job in jobs:
+            if topic:
+                translated_topic = translated_topics.get(job["code"])
+            else:
+                translated_topic = job["title"] # Fallback to title if no topic
+            if not translated_topic:
+                self.log(f"[{job['name']}] Cover generation error: translation failed")
+                continue
+            texts[job["name"]] = translated_topic
+            output_paths[job["name"]] = os.path.join(job["lang_dir"], f"{job['base_name']}{COVER_EXPORT_FORMAT}")
+        
+        # Prepare Style
+        style = self.cover_settings.get("style", {}).copy()
+        results = draw_text_on_images(base_image_path, texts, output_paths, style, quality=COVER_EXPORT_QUALITY)
+        for lang_name, cover_path in results.items():
+            if cover_path:
+                self.log(f"[{lang_name}] Cover generated: {os.path.basename(cover_path)}")
+            else:
+                self.log(f"[{lang_name}] Cover generation failed")
 
     def open_cover_generator(self):
         if not self.source_video_path:
@@ -1584,6 +1981,14 @@ class VideoEditorApp(ctk.CTk):
         except:
             duration = 5.0
         
+        # Re-running over the same folders only converts new or changed images if the user agrees
+        skip_existing = False
+        if any(name.lower().endswith('.mp4') for name in os.listdir(output_folder)):
+            skip_existing = messagebox.askyesno(
+                "Existing Videos",
+                "The output folder already contains videos.\n\nSkip images whose video is newer than the image?"
+            )
+        
         self.img_to_vid_btn.configure(state="disabled", text="Processing...")
         
         # Start processing in thread
@@ -1594,7 +1999,8 @@ class VideoEditorApp(ctk.CTk):
                     input_folder, 
                     output_folder, 
                     duration=duration,
-                    logger=self.log
+                    logger=self.log,
+                    skip_existing=skip_existing
                 )
                 
                 if created:
@@ -1609,7 +2015,7 @@ class VideoEditorApp(ctk.CTk):
             finally:
                 self.after(0, lambda: self.img_to_vid_btn.configure(state="normal", text="Images to Videos"))
         
-        thread = threading.Thread(target=process)
+        thread = threading.Thread(target=run_job, args=(process,), kwargs={"encoding": self.encoding_profile_var.get()})
         thread.start()
 
     def open_news_anchor_generator(self):
@@ -1632,7 +2038,8 @@ class VideoTranslationWindow(ctk.CTkToplevel):
     def __init__(self, parent):
         super().__init__(parent)
         self.parent = parent
-        self.source_video = None
+        self.source_video = None  # first selected video, used for the preview
+        self.source_videos = []
         self.output_folder = None
 
         # Load saved settings
@@ -1733,17 +2140,20 @@ class VideoTranslationWindow(ctk.CTkToplevel):
                                             variable=self.mode_var, command=self.toggle_dubbing_options)
         mode_menu.pack(fill="x", pady=(3, 0))
 
-        # Language Selection
-        lang_container = ctk.CTkFrame(mode_lang_row, fg_color="transparent")
-        lang_container.pack(side="right", padx=(20, 0))
+        # Language Selection (several languages are translated in one batch)
+        lang_container = ctk.CTkFrame(settings_frame, fg_color="transparent")
+        lang_container.pack(fill="x", padx=15, pady=5)
 
-        lang_label = ctk.CTkLabel(lang_container, text="Target Language:", font=ctk.CTkFont(size=12))
-        lang_label.pack(anchor="w")
+        lang_label = ctk.CTkLabel(lang_container, text="Target Languages:", font=ctk.CTkFont(size=12))
+        lang_label.grid(row=0, column=0, columnspan=4, sticky="w")
 
-        self.target_lang_var = ctk.StringVar(value="English")
-        self.lang_dropdown = ctk.CTkOptionMenu(lang_container, variable=self.target_lang_var,
-                                                values=list(SUPPORTED_LANGUAGES.keys()), width=150)
-        self.lang_dropdown.pack(pady=(3, 0))
+        saved_languages = self.config.get("translate_target_languages", ["English (US)"])
+        self.lang_vars = {}
+        for i, lang_name in enumerate(SUPPORTED_LANGUAGES):
+            var = ctk.BooleanVar(value=lang_name in saved_languages)
+            ctk.CTkCheckBox(lang_container, text=lang_name, variable=var, width=160).grid(
+                row=1 + i // 4, column=i % 4, sticky="w", pady=2)
+            self.lang_vars[lang_name] = var
 
         # === Dubbing Options Frame (collapsible) ===
         self.dubbing_frame = ctk.CTkFrame(main_container)
@@ -1867,6 +2277,8 @@ class VideoTranslationWindow(ctk.CTkToplevel):
 
         self.log_text = ctk.CTkTextbox(log_frame, height=100)
         self.log_text.pack(fill="both", expand=True, padx=15, pady=(0, 10))
+        self.log_bus = LogBus()
+        self.log_bus.start_pump(self, lambda records, dropped: append_log_records(self.log_text, records, dropped, readonly=False))
 
         # === Action Button ===
         self.translate_btn = ctk.CTkButton(main_container, text="Start Translation",
@@ -1885,18 +2297,19 @@ class VideoTranslationWindow(ctk.CTkToplevel):
             self.output_folder = folder
             self.output_label.configure(text=os.path.basename(folder), text_color="white")
 
-    def log(self, message):
-        self.after(0, lambda: self._log(message))
-
-    def _log(self, message):
-        self.log_text.insert("end", message + "\n")
-        self.log_text.see("end")
+    def log(self, message, level=None, channel="main"):
+        self.log_bus.emit(message, level=level, channel=channel)
 
     def select_video(self):
-        path = filedialog.askopenfilename(filetypes=[("Video Files", "*.mp4 *.mov *.avi *.mkv")])
-        if path:
-            self.source_video = path
-            self.video_label.configure(text=os.path.basename(path), text_color="white")
+        paths = filedialog.askopenfilenames(filetypes=[("Video Files", "*.mp4 *.mov *.avi *.mkv")])
+        if paths:
+            self.source_videos = list(paths)
+            self.source_video = self.source_videos[0]
+            label = os.path.basename(self.source_video)
+            if len(self.source_videos) > 1:
+                label += f" (+{len(self.source_videos) - 1} more)"
+            self.video_label.configure(text=label, text_color="white")
+            get_preview_service().warm(self.source_video)
 
     def toggle_dubbing_options(self, value=None):
         if self.mode_var.get() == "dubbing":
@@ -1910,6 +2323,7 @@ class VideoTranslationWindow(ctk.CTkToplevel):
         self.config["translate_font_size"] = self.font_size_entry.get()
         self.config["translate_margin_v"] = self.margin_entry.get()
         self.config["translate_sub_color"] = self.sub_color
+        self.config["translate_target_languages"] = [name for name, var in self.lang_vars.items() if var.get()]
         save_config(self.config)
 
     def _update_color_btn(self):
@@ -1948,90 +2362,54 @@ class VideoTranslationWindow(ctk.CTkToplevel):
             self.preview_btn.configure(text="Hide")
             self.update_preview()
 
+    def _font_settings(self):
+        """Subtitle settings shared by the preview and the render (Pillow renderer, so they match)."""
+        return {
+            'Fontname': 'Arial',
+            'Fontsize': self.font_size_entry.get(),
+            'PrimaryColour': self.sub_color,
+            'Renderer': 'pillow'
+        }
+
     def update_preview(self):
-        """Update the preview canvas with current settings using ffmpeg."""
+        """Update the preview canvas using the same Pillow compositor as the render."""
         try:
             from PIL import Image, ImageTk, ImageDraw, ImageFont
-            import subprocess
-            import tempfile
 
             # Clear previous preview
             if self.preview_canvas:
                 self.preview_canvas.destroy()
                 self.preview_canvas = None
 
-            # Extract first frame using ffmpeg
-            with tempfile.NamedTemporaryFile(suffix='.png', delete=False) as tmp:
-                tmp_path = tmp.name
-
-            cmd = [
-                'ffmpeg', '-y', '-i', self.source_video,
-                '-vframes', '1', '-q:v', '2', tmp_path
-            ]
-            result = subprocess.run(cmd, capture_output=True, text=True)
-
-            if result.returncode != 0 or not os.path.exists(tmp_path):
+            # First frame at full resolution from the shared preview cache (decoded once per video)
+            img = get_preview_service().get_frame(self.source_video, time=0, full_res=True)
+            if img is None:
                 raise Exception("Failed to extract frame from video")
-
-            # Load image
-            img = Image.open(tmp_path)
             orig_w, orig_h = img.size
 
-            # Resize for preview (max width 650)
-            preview_w = 650
-            preview_h = int(orig_h * (preview_w / orig_w))
-            img = img.resize((preview_w, preview_h), Image.Resampling.LANCZOS)
-
-            # Draw subtitle preview
-            draw = ImageDraw.Draw(img)
-
-            try:
-                font_size = int(self.font_size_entry.get())
-            except:
-                font_size = 48
-
-            # Scale font size for preview
-            scaled_font_size = max(12, int(font_size * (preview_w / orig_w)))
-
-            try:
-                font = ImageFont.truetype("/System/Library/Fonts/Helvetica.ttc", scaled_font_size)
-            except:
-                try:
-                    font = ImageFont.truetype("/System/Library/Fonts/Arial.ttf", scaled_font_size)
-                except:
-                    font = ImageFont.load_default()
-
             # Sample text based on mode
             if self.sub_mode_var.get() == "word":
                 sample_text = "Sample"
             else:
                 sample_text = "Sample subtitle text here"
 
-            # Calculate position
             try:
                 margin_v = int(self.margin_entry.get())
             except:
                 margin_v = 50
 
-            scaled_margin = int(margin_v * (preview_h / orig_h))
-
-            # Get text bounding box
-            bbox = draw.textbbox((0, 0), sample_text, font=font)
-            text_w = bbox[2] - bbox[0]
-            text_h = bbox[3] - bbox[1]
-
-            x = (preview_w - text_w) // 2
-            y = preview_h - scaled_margin - text_h
-
-            # Draw text with outline
-            outline_color = "#000000"
-            for dx in [-2, -1, 0, 1, 2]:
-                for dy in [-2, -1, 0, 1, 2]:
-                    draw.text((x + dx, y + dy), sample_text, font=font, fill=outline_color)
+            # Composite at full resolution, exactly like burn_subtitles_pillow, then scale down
+            img = render_subtitle_frame(img, sample_text, self._font_settings(), margin_v=margin_v)
 
-            draw.text((x, y), sample_text, font=font, fill=self.sub_color)
+            # Resize for preview (max width 650)
+            preview_w = 650
+            preview_h = int(orig_h * (preview_w / orig_w))
+            img = img.resize((preview_w, preview_h), Image.Resampling.LANCZOS)
 
             # Draw margin indicator line
+            draw = ImageDraw.Draw(img)
+            margin_px = margin_v * orig_h / LIBASS_PLAY_RES_Y
+            scaled_margin = int(margin_px * (preview_h / orig_h))
             draw.line([(0, preview_h - scaled_margin), (preview_w, preview_h - scaled_margin)],
                       fill="#FF0000", width=1)
             draw.text((5, preview_h - scaled_margin - 15), f"Margin V: {margin_v}",
@@ -2045,9 +2423,6 @@ class VideoTranslationWindow(ctk.CTkToplevel):
             self.preview_canvas.image = photo
             self.preview_canvas.pack(pady=5)
 
-            # Cleanup temp file
-            os.remove(tmp_path)
-
         except Exception as e:
             print(f"Preview error: {e}")
             if self.preview_canvas:
@@ -2062,10 +2437,15 @@ class VideoTranslationWindow(ctk.CTkToplevel):
             messagebox.showerror("Error", "Please enter a Gemini API Key.")
             return
 
-        if not self.source_video:
+        if not self.source_videos:
             messagebox.showerror("Error", "Please select a source video.")
             return
 
+        target_langs = [name for name, var in self.lang_vars.items() if var.get()]
+        if not target_langs:
+            messagebox.showerror("Error", "Please select at least one target language.")
+            return
+
         # Save all settings for next time
         self.config["translate_api_key"] = api_key
         self.save_settings()
@@ -2075,14 +2455,10 @@ class VideoTranslationWindow(ctk.CTkToplevel):
         def process():
             try:
                 mode = self.mode_var.get()
-                target_lang_name = self.target_lang_var.get()
-                target_lang_code = SUPPORTED_LANGUAGES.get(target_lang_name, "en")
+                target_codes = [SUPPORTED_LANGUAGES[name] for name in target_langs]
+                lang_names = {SUPPORTED_LANGUAGES[name]: name for name in target_langs}
 
-                font_settings = {
-                    'Fontname': 'Arial',
-                    'Fontsize': self.font_size_entry.get(),
-                    'PrimaryColour': self.sub_color
-                }
+                font_settings = self._font_settings()
 
                 # Get subtitle mode
                 sub_mode = self.sub_mode_var.get()
@@ -2092,51 +2468,39 @@ class VideoTranslationWindow(ctk.CTkToplevel):
                 except:
                     margin_v = 50
 
-                # Determine output path
-                base_name = os.path.splitext(os.path.basename(self.source_video))[0]
-                suffix = "subtitled" if mode == "subtitle" else "dubbed"
-                output_filename = f"{base_name}_{suffix}_{target_lang_code}.mp4"
-
-                if self.output_folder:
-                    output_video_path = os.path.join(self.output_folder, output_filename)
-                else:
-                    output_video_path = os.path.join(os.path.dirname(self.source_video), output_filename)
-
-                self.log(f"Starting {mode} translation to {target_lang_name}...")
-                self.log(f"Output: {output_video_path}")
-
-                if mode == "subtitle":
-                    result = translate_video(
-                        self.source_video,
-                        target_lang_code,
-                        api_key,
-                        mode="subtitle",
-                        output_video_path=output_video_path,
-                        font_settings=font_settings,
-                        margin_v=margin_v,
-                        sub_mode=sub_mode,
-                        logger=self.log
-                    )
-                else:
-                    speech_speed = SPEECH_SPEEDS.get(self.speed_var.get(), 1.0)
-                    result = translate_video(
-                        self.source_video,
-                        target_lang_code,
-                        api_key,
-                        mode="dubbing",
-                        output_video_path=output_video_path,
+                options = {"font_settings": font_settings, "margin_v": margin_v, "sub_mode": sub_mode}
+                if mode == "dubbing":
+                    options.update(
                         voice=self.voice_var.get(),
-                        speech_speed=speech_speed,
-                        add_subtitles=self.add_subs_var.get(),
-                        font_settings=font_settings,
-                        margin_v=margin_v,
-                        sub_mode=sub_mode,
-                        logger=self.log
+                        speech_speed=SPEECH_SPEEDS.get(self.speed_var.get(), 1.0),
+                        add_subtitles=self.add_subs_var.get()
                     )
 
-                if result:
-                    self.log(f"Translation completed: {result}")
-                    self.after(0, lambda: messagebox.showinfo("Success", f"Video translated successfully!\n\n{result}"))
+                self.log(f"Starting {mode} translation of {len(self.source_videos)} video(s) to {', '.join(target_langs)}...")
+
+                results = translate_video_batch(
+                    self.source_videos,
+                    target_codes,
+                    api_key,
+                    mode=mode,
+                    output_dir=self.output_folder,
+                    logger=self.log,
+                    target_logger=lambda code: self.log_bus.logger(lang_names[code]),
+                    **options
+                )
+
+                outputs = [path for path in results.values() if path]
+                failed = [f"{os.path.basename(video)} ({lang_names[code]})"
+                          for (video, code), path in results.items() if not path]
+                if outputs and not failed:
+                    self.log(f"Translation completed: {len(outputs)} video(s)")
+                    summary = "\n".join(outputs)
+                    self.after(0, lambda: messagebox.showinfo("Success", f"Videos translated successfully!\n\n{summary}"))
+                elif outputs:
+                    self.log(f"Translation finished with failures: {', '.join(failed)}")
+                    summary = "\n".join(failed)
+                    self.after(0, lambda: messagebox.showwarning(
+                        "Partially completed", f"{len(outputs)} video(s) translated, failed:\n\n{summary}"))
                 else:
                     self.log("Translation failed")
                     self.after(0, lambda: messagebox.showerror("Error", "Translation failed. Check logs for details."))
@@ -2147,7 +2511,8 @@ class VideoTranslationWindow(ctk.CTkToplevel):
             finally:
                 self.after(0, lambda: self.translate_btn.configure(state="normal", text="Start Translation"))
 
-        thread = threading.Thread(target=process)
+        thread = threading.Thread(target=run_job, args=(process,),
+                                  kwargs={"trace_name": "translation", "logger": self.log})
         thread.start()
 
 
@@ -2172,6 +2537,7 @@ class NewsAnchorGeneratorWindow(ctk.CTkToplevel):
         self.grid_rowconfigure(1, weight=1)
         
         self.is_generating = False
+        self.cancel_token = CancelToken()
         self.generated_videos = []
         self.last_video_uri = None
         self.last_output_folder = None
@@ -2454,6 +2820,8 @@ class NewsAnchorGeneratorWindow(ctk.CTkToplevel):
         self.log_textbox = ctk.CTkTextbox(right_frame, height=100)
         self.log_textbox.grid(row=4, column=0, padx=10, pady=(3, 5), sticky="nsew")
         self.log_textbox.configure(state="disabled")
+        self.log_bus = LogBus()
+        self.log_bus.start_pump(self, lambda records, dropped: append_log_records(self.log_textbox, records, dropped))
         
         # Progress Bar
         self.progress_bar = ctk.CTkProgressBar(right_frame)
@@ -2482,13 +2850,9 @@ class NewsAnchorGeneratorWindow(ctk.CTkToplevel):
                                         fg_color="gray", width=90, height=38)
         self.cancel_btn.pack(side="left", padx=8)
     
-    def log(self, message):
-        """Log a message to the textbox."""
-        self.log_textbox.configure(state="normal")
-        self.log_textbox.insert("end", message + "\n")
-        self.log_textbox.see("end")
-        self.log_textbox.configure(state="disabled")
-        self.update_idletasks()
+    def log(self, message, level=None, channel="main"):
+        """Queues a message for the log textbox (safe from any thread)."""
+        self.log_bus.emit(message, level=level, channel=channel)
     
     def browse_output(self):
         path = filedialog.askdirectory(title="Select Output Folder")
@@ -2657,21 +3021,20 @@ class NewsAnchorGeneratorWindow(ctk.CTkToplevel):
         
         def check_thread():
             try:
-                import requests
-                url = f"https://generativelanguage.googleapis.com/v1beta/models?key={api_key}"
-                response = requests.get(url, timeout=10)
+                url = f"{gemini_base_url()}/models?key={api_key}"
+                response = api_request("GET", url, timeout=10)
                 
                 if response.status_code == 200:
-                    self.after(0, lambda: self.log("✅ API key is valid!"))
+                    self.log("✅ API key is valid!")
                     self.after(0, lambda: messagebox.showinfo("Success", "API key is valid!"))
                 elif response.status_code == 401:
-                    self.after(0, lambda: self.log("❌ Invalid API key"))
+                    self.log("❌ Invalid API key")
                     self.after(0, lambda: messagebox.showerror("Error", "Invalid API key"))
                 else:
-                    self.after(0, lambda c=response.status_code: self.log(f"⚠️ API check: status {c}"))
+                    self.log(f"⚠️ API check: status {response.status_code}")
                     self.after(0, lambda c=response.status_code: messagebox.showwarning("Warning", f"Status: {c}"))
             except Exception as e:
-                self.after(0, lambda err=str(e): self.log(f"Error: {err}"))
+                self.log(f"Error: {e}")
                 self.after(0, lambda err=str(e): messagebox.showerror("Error", f"Connection error: {err}"))
         
         threading.Thread(target=check_thread).start()
@@ -2688,7 +3051,6 @@ class NewsAnchorGeneratorWindow(ctk.CTkToplevel):
     def preview_subtitle(self):
         """Preview subtitle appearance using ffmpeg with actual position."""
         import subprocess
-        import tempfile
         
         try:
             margin = int(self.subtitle_margin_var.get() or 200)
@@ -2715,7 +3077,8 @@ class NewsAnchorGeneratorWindow(ctk.CTkToplevel):
         self.log(f"Color: {color}")
         
         try:
-            preview_path = tempfile.NamedTemporaryFile(suffix='.png', delete=False).name
+            # Opened by an external viewer, so kept until the app exits
+            preview_path = get_session_scratch().path('.png', prefix="subtitle_preview")
             
             # Create preview with:
             # - Black background (simulating video)
@@ -2755,6 +3118,7 @@ class NewsAnchorGeneratorWindow(ctk.CTkToplevel):
     
     def cancel_generation(self):
         self.is_generating = False
+        self.cancel_token.cancel()
         self.update_status("Cancelled")
         self.generate_btn.configure(state="normal", text="🎬 Generate Video")
         self.extend_btn.configure(state="normal" if self.last_video_uri else "disabled", text="➕ Extend (Manual)")
@@ -2815,26 +3179,29 @@ class NewsAnchorGeneratorWindow(ctk.CTkToplevel):
         self.last_aspect_ratio = aspect_ratio
         
         # Start in thread
-        threading.Thread(target=self._generate_with_auto_extend, 
-                        args=(language_code, aspect_ratio, output_folder, reference_image, auto_extend)).start()
+        self.cancel_token = CancelToken()
+        threading.Thread(target=run_job,
+                        args=(self._generate_with_auto_extend, language_code, aspect_ratio, output_folder, reference_image, auto_extend),
+                        kwargs={"cancel": self.cancel_token, "trace_name": "news_anchor",
+                                "logger": self.log}).start()
     
     def _generate_with_auto_extend(self, language_code, aspect_ratio, output_folder, reference_image, auto_extend):
         """Generate video with optional auto-extend."""
         try:
             total_segments = len(self.script_segments)
-            self.after(0, lambda: self.log(f"Script แบ่งเป็น {total_segments} ส่วน"))
+            self.log(f"Script แบ่งเป็น {total_segments} ส่วน")
             self.after(0, lambda: self.segment_progress_label.configure(text=f"ส่วนที่ 1/{total_segments}"))
             
             # Generate first segment
             first_segment = self.script_segments[0]
             self.after(0, lambda: self.update_status(f"กำลังสร้างส่วนที่ 1/{total_segments}..."))
-            self.after(0, lambda: self.log(f"[1/{total_segments}] {first_segment[:50]}..."))
+            self.log(f"[1/{total_segments}] {first_segment[:50]}...")
             
             # Rate limiting: wait if needed
             elapsed = time.time() - self.last_api_call
             if elapsed < self.API_DELAY_SECONDS and self.last_api_call > 0:
                 wait_time = int(self.API_DELAY_SECONDS - elapsed)
-                self.after(0, lambda w=wait_time: self.log(f"⏳ Rate limit: waiting {w}s before API call..."))
+                self.log(f"⏳ Rate limit: waiting {wait_time}s before API call...")
                 for i in range(wait_time, 0, -1):
                     if not self.is_generating:
                         return
@@ -2851,7 +3218,7 @@ class NewsAnchorGeneratorWindow(ctk.CTkToplevel):
                 language_code=language_code,
                 api_key=self.api_key,
                 output_path=output_path,
-                logger=lambda msg: self.after(0, lambda m=msg: self.log(m)),
+                logger=self.log,
                 reference_image=reference_image
             )
             
@@ -2875,7 +3242,7 @@ class NewsAnchorGeneratorWindow(ctk.CTkToplevel):
                     segment = self.script_segments[i]
                     self.after(0, lambda idx=i+1, t=total_segments: self.segment_progress_label.configure(text=f"ส่วนที่ {idx}/{t}"))
                     self.after(0, lambda idx=i+1, t=total_segments: self.update_status(f"กำลัง Extend ส่วนที่ {idx}/{t}..."))
-                    self.after(0, lambda idx=i+1, t=total_segments, s=segment: self.log(f"[{idx}/{t}] {s[:50]}..."))
+                    self.log(f"[{i+1}/{total_segments}] {segment[:50]}...")
                     
                     prompt = generate_news_anchor_prompt(segment, language_code)
                     ext_timestamp = int(time.time())
@@ -2885,7 +3252,7 @@ class NewsAnchorGeneratorWindow(ctk.CTkToplevel):
                     elapsed = time.time() - self.last_api_call
                     if elapsed < self.API_DELAY_SECONDS:
                         wait_time = int(self.API_DELAY_SECONDS - elapsed)
-                        self.after(0, lambda w=wait_time: self.log(f"⏳ Rate limit: waiting {w}s..."))
+                        self.log(f"⏳ Rate limit: waiting {wait_time}s...")
                         for sec in range(wait_time, 0, -1):
                             if not self.is_generating:
                                 return
@@ -2896,7 +3263,7 @@ class NewsAnchorGeneratorWindow(ctk.CTkToplevel):
                     ext_result = None
                     max_retries = 2
                     for attempt in range(max_retries):
-                        self.after(0, lambda a=attempt+1: self.log(f"Extension attempt {a}/{max_retries}..."))
+                        self.log(f"Extension attempt {attempt+1}/{max_retries}...")
                         self.last_api_call = time.time()  # Mark API call time
                         ext_result = extend_video(
                             video_uri=self.last_video_uri,
@@ -2904,30 +3271,30 @@ class NewsAnchorGeneratorWindow(ctk.CTkToplevel):
                             aspect_ratio=aspect_ratio,
                             api_key=self.api_key,
                             output_path=ext_output_path,
-                            logger=lambda msg: self.after(0, lambda m=msg: self.log(m))
+                            logger=self.log
                         )
                         if ext_result:
                             break
                         if attempt < max_retries - 1:
-                            self.after(0, lambda: self.log("⚠️ Retrying extension..."))
+                            self.log("⚠️ Retrying extension...")
                             time.sleep(2)
                     
                     if not ext_result:
-                        self.after(0, lambda idx=i+1: self.log(f"❌ Extension {idx} failed after {max_retries} attempts"))
-                        self.after(0, lambda: self.log("⚠️ Continuing with available segments..."))
+                        self.log(f"❌ Extension {i+1} failed after {max_retries} attempts")
+                        self.log("⚠️ Continuing with available segments...")
                         break
                     
                     self.last_video_uri = ext_result.get("video_uri")
                     self.generated_videos.append(ext_result.get("output_path"))
                     progress = (i + 1) / total_segments
                     self.after(0, lambda p=progress: self.update_progress(p))
-                    self.after(0, lambda idx=i+1: self.log(f"✅ Segment {idx} completed"))
+                    self.log(f"✅ Segment {i+1} completed")
             # Post-processing on final video
             final_video = self.generated_videos[-1] if self.generated_videos else output_path
             
             # Calculate and display cost
             self.total_cost = len(self.generated_videos) * self.VEO_COST_PER_VIDEO
-            self.after(0, lambda: self.log(f"💰 Total cost: ${self.total_cost:.2f} USD"))
+            self.log(f"💰 Total cost: ${self.total_cost:.2f} USD")
             
             # Insert overlay media FIRST (so subtitles appear on top)
             if self.overlay_media_list:
@@ -2936,7 +3303,7 @@ class NewsAnchorGeneratorWindow(ctk.CTkToplevel):
 
                 # Insert ALL overlays in ONE pass using user-defined timing
                 total_overlays = len(self.overlay_media_list)
-                self.after(0, lambda n=total_overlays: self.log(f"📎 Inserting {n} media files with custom timing..."))
+                self.log(f"📎 Inserting {total_overlays} media files with custom timing...")
 
                 # Build overlay schedule from user input (already has path, start, duration)
                 overlay_schedule = []
@@ -2956,14 +3323,14 @@ class NewsAnchorGeneratorWindow(ctk.CTkToplevel):
                     overlay_schedule=overlay_schedule,
                     output_path=overlay_output,
                     fade_duration=0.0,  # No fade - instant appear/disappear
-                    logger=lambda msg: self.after(0, lambda m=msg: self.log(m))
+                    logger=self.log
                 )
 
                 if overlay_result:
                     final_video = overlay_result
-                    self.after(0, lambda n=total_overlays: self.log(f"✅ All {n} overlays inserted successfully"))
+                    self.log(f"✅ All {total_overlays} overlays inserted successfully")
                 else:
-                    self.after(0, lambda: self.log("⚠️ Failed to insert overlays, using original video"))
+                    self.log("⚠️ Failed to insert overlays, using original video")
             
             # Apply subtitles LAST (so they appear on top of overlays)
             if self.subtitle_enabled_var.get():
@@ -2983,11 +3350,11 @@ class NewsAnchorGeneratorWindow(ctk.CTkToplevel):
                     margin=subtitle_margin,
                     color=subtitle_color,
                     fontsize=subtitle_fontsize,
-                    logger=lambda msg: self.after(0, lambda m=msg: self.log(m))
+                    logger=self.log
                 )
                 if sub_result:
                     final_video = sub_result
-                    self.after(0, lambda: self.log("✅ Subtitles added"))
+                    self.log("✅ Subtitles added")
             
             # Rename final video with FINAL prefix for easy identification
             final_dir = os.path.dirname(final_video)
@@ -2997,10 +3364,10 @@ class NewsAnchorGeneratorWindow(ctk.CTkToplevel):
             try:
                 import shutil
                 shutil.copy2(final_video, final_output)
-                self.after(0, lambda: self.log(f"📁 Final video: {final_name}"))
+                self.log(f"📁 Final video: {final_name}")
                 final_video = final_output
             except Exception as e:
-                self.after(0, lambda err=str(e): self.log(f"Note: Could not rename final: {err}"))
+                self.log(f"Note: Could not rename final: {e}")
             
             # Done
             self.after(0, lambda: self.update_status("✅ Generation Complete!"))
@@ -3014,7 +3381,7 @@ class NewsAnchorGeneratorWindow(ctk.CTkToplevel):
         except Exception as e:
             error_msg = str(e)
             self.after(0, lambda: self.update_status("Error occurred"))
-            self.after(0, lambda msg=error_msg: self.log(f"Error: {msg}"))
+            self.log(f"Error: {error_msg}", level="ERROR")
             self.after(0, lambda msg=error_msg: messagebox.showerror("Error", f"An error occurred: {msg}"))
         finally:
             self.is_generating = False
@@ -3041,7 +3408,10 @@ class NewsAnchorGeneratorWindow(ctk.CTkToplevel):
         language_name = self.language_var.get()
         language_code = SUPPORTED_LANGUAGES.get(language_name, "en")
         
-        threading.Thread(target=self._extend_video_manual, args=(extension_script, language_code)).start()
+        self.cancel_token = CancelToken()
+        threading.Thread(target=run_job, args=(self._extend_video_manual, extension_script, language_code),
+                         kwargs={"cancel": self.cancel_token, "trace_name": "news_anchor_extension",
+                                 "logger": self.log}).start()
     
     def _extend_video_manual(self, script, language_code):
         """Manual extend in background."""
@@ -3061,7 +3431,7 @@ class NewsAnchorGeneratorWindow(ctk.CTkToplevel):
                 aspect_ratio=self.last_aspect_ratio,
                 api_key=self.api_key,
                 output_path=output_path,
-                logger=lambda msg: self.after(0, lambda m=msg: self.log(m))
+                logger=self.log
             )
             
             if result:
@@ -3076,7 +3446,7 @@ class NewsAnchorGeneratorWindow(ctk.CTkToplevel):
             
         except Exception as e:
             error_msg = str(e)
-            self.after(0, lambda msg=error_msg: self.log(f"Error: {msg}"))
+            self.log(f"Error: {error_msg}", level="ERROR")
         finally:
             self.is_generating = False
             self.after(0, lambda: self.generate_btn.configure(state="normal", text="🎬 Generate Video"))
@@ -3108,7 +3478,7 @@ class CoverGeneratorWindow(ctk.CTkToplevel):
         self.create_preview_ui()
         
         # State
-        self.current_frame_path = "temp_cover_frame.jpg"
+        self.current_frame_path = get_session_scratch().path(".jpg", prefix="cover_frame")
         self.preview_image = None
         self.text_pos = (0.5, 0.5) # Normalized coordinates (0-1)
         
@@ -3189,8 +3559,8 @@ class CoverGeneratorWindow(ctk.CTkToplevel):
         except:
             border_width = 4
 
-        # Save the current frame to a persistent temp location
-        persistent_frame_path = "cover_base_frame.jpg"
+        # Copy the current frame so later frame changes do not alter the saved cover
+        persistent_frame_path = get_session_scratch().path(".jpg", prefix="cover_base_frame")
         if os.path.exists(self.current_frame_path):
             shutil.copy(self.current_frame_path, persistent_frame_path)
 
@@ -3206,6 +3576,13 @@ class CoverGeneratorWindow(ctk.CTkToplevel):
                 "anchor": "mm" # Default anchor
             }
         }
+        # Warm the translation memo for the export's languages while the user carries on
+        topic = self.parent.cover_settings["topic"]
+        api_key = self.parent.api_key_entry.get().strip()
+        codes = [data["code"] for data in self.parent.languages_data.values()]
+        if topic.strip() and api_key and codes:
+            threading.Thread(target=translate_texts, args=(topic, codes, api_key), daemon=True).start()
+
         messagebox.showinfo("Success", "Cover settings saved! Covers will be generated during export.")
         self.destroy()
 
@@ -3214,6 +3591,11 @@ class CoverGeneratorWindow(ctk.CTkToplevel):
         pass
 
     def create_preview_ui(self):
+        # Keyframe thumbnail strip (filled once the preview service has indexed the video)
+        self.thumb_strip = ctk.CTkScrollableFrame(self.preview_frame, orientation="horizontal", height=100)
+        self.thumb_strip.pack(side="bottom", fill="x", pady=(5, 0))
+        self.thumb_images = []
+        
         self.canvas = tk.Canvas(self.preview_frame, bg="black")
         self.canvas.pack(fill="both", expand=True)
         
@@ -3223,6 +3605,29 @@ class CoverGeneratorWindow(ctk.CTkToplevel):
         # Dragging
         self.canvas.bind("<Button-1>", self.on_drag_start)
         self.canvas.bind("<B1-Motion>", self.on_drag)
+        
+        warm = get_preview_service().warm(self.parent.source_video_path)
+        if warm:
+            warm.add_done_callback(lambda _: self.after(0, self.fill_thumbnail_strip))
+
+    def fill_thumbnail_strip(self):
+        if not self.winfo_exists():
+            return
+        for t, thumb in get_preview_service().thumbnails(self.parent.source_video_path):
+            tk_thumb = ImageTk.PhotoImage(thumb.resize((max(1, thumb.width * 90 // thumb.height), 90)))
+            self.thumb_images.append(tk_thumb)
+            tk.Button(self.thumb_strip, image=tk_thumb, bd=0,
+                      command=lambda t=t: self.select_frame_at(t)).pack(side="left", padx=2)
+
+    def select_frame_at(self, time):
+        """Uses the frame at time (a keyframe from the strip) as the cover base."""
+        frame = get_preview_service().get_frame(self.parent.source_video_path, time=time, full_res=True)
+        if frame is None:
+            return
+        frame.save(self.current_frame_path)
+        self.original_pil = frame
+        self._scaled_preview = None
+        self.update_preview()
 
     def pick_text_color(self):
         color = colorchooser.askcolor(title="Choose Text Color", color=self.text_color)
@@ -3242,12 +3647,23 @@ class CoverGeneratorWindow(ctk.CTkToplevel):
         if not self.parent.source_video_path:
             return
             
-        ratio = random.random()
-        extract_frame(self.parent.source_video_path, self.current_frame_path, time_ratio=ratio)
+        # Random keyframe once the preview service has indexed the video (decodes no extra frames),
+        # otherwise a random point in the video
+        preview_service = get_preview_service()
+        video_path = self.parent.source_video_path
+        keyframes = preview_service.keyframe_times(video_path)
+        if keyframes:
+            frame = preview_service.get_frame(video_path, time=random.choice(keyframes), full_res=True)
+        else:
+            frame = preview_service.get_frame(video_path, time_ratio=random.random(), full_res=True)
         
         # Load image
         try:
-            self.original_pil = Image.open(self.current_frame_path)
+            if frame is None:
+                raise Exception("Failed to extract frame from video")
+            frame.save(self.current_frame_path)
+            self.original_pil = frame
+            self._scaled_preview = None
             self.update_preview()
         except Exception as e:
             print(f"Error loading frame: {e}")
@@ -3270,8 +3686,10 @@ class CoverGeneratorWindow(ctk.CTkToplevel):
         scale = min(canvas_width/img_w, canvas_height/img_h)
         new_w, new_h = int(img_w * scale), int(img_h * scale)
         
-        resized = self.original_pil.resize((new_w, new_h))
-        self.tk_image = ImageTk.PhotoImage(resized)
+        # Re-scale the frame only when the canvas size changes; text edits reuse it
+        if getattr(self, '_scaled_preview', None) is None or self._scaled_preview[0] != (new_w, new_h):
+            self._scaled_preview = ((new_w, new_h), ImageTk.PhotoImage(self.original_pil.resize((new_w, new_h))))
+        self.tk_image = self._scaled_preview[1]
         
         self.canvas.delete("all")
         # Center image
@@ -3454,12 +3872,13 @@ class CoverGeneratorWindow(ctk.CTkToplevel):
             # Add original language too if needed, or just use topic
             # Let's assume user wants translated versions.
             
+            print(f"Translating to {len(languages)} language(s)...")
+            translated_by_code = translate_texts(topic, languages, api_key)
             for lang_code in languages:
                 # Find lang name
                 lang_name = next((k for k, v in SUPPORTED_LANGUAGES.items() if v == lang_code), lang_code)
                 
-                print(f"Translating to {lang_name}...")
-                translated = translate_text(topic, lang_code, api_key)
+                translated = translated_by_code.get(lang_code)
                 if translated:
                     translations[lang_name] = translated
                 else:
@@ -3491,11 +3910,11 @@ class CoverGeneratorWindow(ctk.CTkToplevel):
                 "anchor": "mm" # Middle-Middle
             }
             
-            for lang, text in translations.items():
-                out_name = f"cover_{lang}_{topic[:10]}.jpg".replace(" ", "_")
-                out_path = os.path.join(export_dir, out_name)
-                
-                draw_text_on_image(self.current_frame_path, text, out_path, style)
+            output_paths = {
+                lang: os.path.join(export_dir, f"cover_{lang}_{topic[:10]}{COVER_EXPORT_FORMAT}".replace(" ", "_"))
+                for lang in translations
+            }
+            draw_text_on_images(self.current_frame_path, translations, output_paths, style, quality=COVER_EXPORT_QUALITY)
                 
             self.parent.after(0, lambda: messagebox.showinfo("Success", f"Generated {len(translations)} covers!"))
             